@@ -0,0 +1,139 @@
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from urbanopt_ditto_reader.urbanopt_ditto_reader import UrbanoptDittoReader
+
+examples_dir = Path(__file__).parent.parent.parent / "example"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def example_opendss(tmp_path_factory):
+    """Get a copy of the OpenDSS model and results of the example as they were before any test ran.
+
+    The command line tests rewrite the opendss folder of the example in place,
+    so the tests that compare runs of the example model use this copy instead.
+    """
+    source = examples_dir / "run" / "baseline_scenario" / "opendss"
+    opendss_folder = tmp_path_factory.mktemp("example") / "opendss"
+    for folder in ("dss_files", "profiles", "results"):
+        shutil.copytree(source / folder, opendss_folder / folder)
+    return opendss_folder
+
+
+@pytest.fixture()
+def run_example(tmp_path, example_opendss):
+    """Get a function that simulates the OpenDSS model of the example in a copy of its opendss folder.
+
+    The function takes the name of the copy and any configuration variables to
+    be changed and returns the path to the results folder of the copy. Copies
+    with the same name are reused so that a run can be continued.
+    """
+    source = example_opendss
+    example_config = json.loads((examples_dir / "example_config.json").read_text())
+
+    def run(name, **config):
+        opendss_folder = tmp_path / name
+        if not opendss_folder.exists():
+            shutil.copytree(source / "dss_files", opendss_folder / "dss_files")
+            shutil.copytree(source / "profiles", opendss_folder / "profiles")
+        config_data = {
+            **example_config,
+            "urbanopt_scenario_file": str(examples_dir / example_config["urbanopt_scenario_file"]),
+            "urbanopt_geojson_file": str(examples_dir / example_config["urbanopt_geojson_file"]),
+            "equipment_file": str(examples_dir / example_config["equipment_file"]),
+            "opendss_folder": str(opendss_folder),
+            **config,
+        }
+        UrbanoptDittoReader(config_data).run(None)
+        return opendss_folder / "results"
+
+    return run
+
+
+@pytest.fixture(scope="session")
+def example_scenario(tmp_path_factory, example_opendss):
+    """Get the path to the scenario CSV of a copy of the example scenario with feature report CSVs.
+
+    The feature report CSVs are not part of the example, so they are written
+    from the load profiles of its OpenDSS model.
+    """
+    scenario_folder = tmp_path_factory.mktemp("scenario")
+    profiles = example_opendss / "profiles"
+    timestamps = (profiles / "timestamps.csv").read_text().splitlines()[1:]
+    source = examples_dir / "run" / "baseline_scenario"
+    for feature_reports in sorted(source.glob("*/feature_reports")):
+        feature_id = feature_reports.parent.name
+        report_folder = scenario_folder / "run" / "baseline_scenario" / feature_id / "feature_reports"
+        shutil.copytree(feature_reports, report_folder)
+        load_profile = profiles / f"load_{feature_id}.csv"
+        if not load_profile.is_file():  # feature without a load (eg. a transformer)
+            continue
+        loads = load_profile.read_text().splitlines()
+        rows = [f"{t},{load}" for t, load in zip(timestamps, loads)]
+        (report_folder / "default_feature_report.csv").write_text("\n".join(["Datetime,Net Power(kW)", *rows, ""]))
+    scenario_file = scenario_folder / "baseline_scenario.csv"
+    shutil.copy(examples_dir / "baseline_scenario.csv", scenario_file)
+    return scenario_file
+
+
+@pytest.fixture()
+def run_example_model(tmp_path, example_scenario):
+    """Get a function that writes the OpenDSS model of the example from its GeoJSON and simulates it.
+
+    The function takes the name of the opendss folder and any configuration
+    variables to be changed and returns the path to the results folder. Folders
+    with the same name are reused so that a model can be written over a previous one.
+    """
+    example_config = json.loads((examples_dir / "example_config.json").read_text())
+
+    def run(name, **config):
+        opendss_folder = tmp_path / name
+        config_data = {
+            **example_config,
+            "urbanopt_scenario_file": str(example_scenario),
+            "urbanopt_geojson_file": str(examples_dir / example_config["urbanopt_geojson_file"]),
+            "equipment_file": str(examples_dir / example_config["equipment_file"]),
+            "opendss_folder": str(opendss_folder),
+            **config,
+        }
+        UrbanoptDittoReader(config_data).run_urbanopt_geojson()
+        return opendss_folder / "results"
+
+    return run
+
+
+def _read_result_files(results_folder, pattern="*/*.csv"):
+    """Get a dictionary mapping the paths of result files (relative to their folder) to their content."""
+    return {str(f.relative_to(results_folder)): f.read_bytes() for f in sorted(results_folder.glob(pattern))}
+
+
+def _assert_results_close(results_folder, expected_folder, tolerance):
+    """Check that the CSV results of two runs have the same rows, flags and values within a tolerance."""
+    results = _read_result_files(results_folder)
+    expected = _read_result_files(expected_folder)
+    assert sorted(results) == sorted(expected)
+    for name, content in expected.items():
+        expected_rows = [row.split(",") for row in content.decode().splitlines()]
+        rows = [row.split(",") for row in results[name].decode().splitlines()]
+        assert len(rows) == len(expected_rows)
+        assert rows[0] == expected_rows[0]
+        for row, expected_row in zip(rows[1:], expected_rows[1:]):
+            assert row[0] == expected_row[0]
+            assert row[2:] == expected_row[2:]
+            np.testing.assert_allclose(float(row[1]), float(expected_row[1]), rtol=0, atol=tolerance)
+
+
+@pytest.fixture()
+def read_result_files():
+    """Get a function that reads the result files of a results folder into a dictionary."""
+    return _read_result_files
+
+
+@pytest.fixture()
+def assert_results_close():
+    """Get a function that checks that the CSV results of two runs match within a tolerance."""
+    return _assert_results_close
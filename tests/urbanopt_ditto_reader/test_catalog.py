@@ -0,0 +1,95 @@
+import json
+import os
+
+import pytest
+
+from urbanopt_ditto_reader.reader import catalog as catalog_module
+from urbanopt_ditto_reader.reader.catalog import EquipmentCatalog
+
+EQUIPMENT_DATA = {
+    "LINES": [{"Urban": [{"Name": "L1", "Ampacity": 100}]}, {"Interurban": [{"Name": "L1", "Ampacity": 200}]}],
+    "SUBSTATIONS AND DISTRIBUTION TRANSFORMERS": [{"Urban": [{"Name": "T1", "Installed Power(kVA)": 50}]}],
+    "WIRES": {"WIRES CATALOG": [{"nameclass": "W1", "diameter": 0.01}]},
+}
+
+
+@pytest.fixture()
+def catalog_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "user_cache"))
+    monkeypatch.delenv("LOCALAPPDATA", raising=False)
+    monkeypatch.setattr(catalog_module, "_CATALOG_CACHE", {})
+    catalog_folder = tmp_path / "catalog"
+    catalog_folder.mkdir()
+    equipment_file = catalog_folder / "catalog.json"
+    equipment_file.write_text(json.dumps(EQUIPMENT_DATA))
+    return equipment_file
+
+
+def _load_without_process_cache(equipment_file, **kwargs):
+    catalog_module._CATALOG_CACHE.clear()
+    return EquipmentCatalog.from_file(str(equipment_file), **kwargs)
+
+
+def _fail_parse(monkeypatch):
+    def fail(*_):
+        raise AssertionError("the catalog was parsed instead of read from the cache")
+
+    monkeypatch.setattr(EquipmentCatalog, "__init__", fail)
+
+
+def test_cache_hit(catalog_file, monkeypatch):
+    catalog = _load_without_process_cache(catalog_file)
+    cache_file = catalog_file.parent / ".catalog.json.cache.json"
+    assert cache_file.is_file()
+    json.loads(cache_file.read_text())  # the cache is plain JSON
+    assert catalog.lines["L1"]["Ampacity"] == 100
+
+    _fail_parse(monkeypatch)
+    cached = _load_without_process_cache(catalog_file)
+    assert cached.lines == catalog.lines
+    assert cached.transformers == catalog.transformers
+    assert cached.wires == catalog.wires
+
+    # a touched catalog with the same content still uses the cache through its hash
+    os.utime(catalog_file, ns=(0, 0))
+    assert _load_without_process_cache(catalog_file).lines == catalog.lines
+
+
+def test_cache_invalidation(catalog_file):
+    _load_without_process_cache(catalog_file)
+    changed_data = dict(EQUIPMENT_DATA, LINES=[{"Urban": [{"Name": "L2", "Ampacity": 300}]}])
+    catalog_file.write_text(json.dumps(changed_data))
+    catalog = _load_without_process_cache(catalog_file)
+    assert list(catalog.lines) == ["L2"]
+    cache = json.loads((catalog_file.parent / ".catalog.json.cache.json").read_text())
+    assert list(cache["lines"]) == ["L2"]
+
+
+def test_invalid_cache_is_ignored(catalog_file):
+    cache_file = catalog_file.parent / ".catalog.json.cache.json"
+    cache_file.write_bytes(b"\x80\x04not json")
+    assert list(_load_without_process_cache(catalog_file).lines) == ["L1"]
+    stat = catalog_file.stat()
+    cache_file.write_text(
+        json.dumps({"version": 2, "file_key": [stat.st_mtime_ns, stat.st_size], "lines": [], "transformers": {}})
+    )
+    assert list(_load_without_process_cache(catalog_file).lines) == ["L1"]
+
+
+def test_unwritable_folder_uses_user_cache(catalog_file, tmp_path, monkeypatch):
+    # a folder in place of the cache file makes the catalog folder cache unwritable
+    (catalog_file.parent / ".catalog.json.cache.json").mkdir()
+    _load_without_process_cache(catalog_file)
+    user_caches = list((tmp_path / "user_cache" / "urbanopt_ditto_reader").glob("catalog.json.*.cache.json"))
+    assert len(user_caches) == 1
+    assert sorted(os.listdir(catalog_file.parent)) == [".catalog.json.cache.json", "catalog.json"]
+
+    _fail_parse(monkeypatch)
+    assert list(_load_without_process_cache(catalog_file).lines) == ["L1"]
+
+
+def test_cache_opt_out(catalog_file, tmp_path):
+    catalog = _load_without_process_cache(catalog_file, use_cache=False)
+    assert list(catalog.lines) == ["L1"]
+    assert os.listdir(catalog_file.parent) == ["catalog.json"]
+    assert not (tmp_path / "user_cache").exists()
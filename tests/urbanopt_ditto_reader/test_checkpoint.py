@@ -0,0 +1,56 @@
+import pytest
+
+from urbanopt_ditto_reader.urbanopt_ditto_reader import UrbanoptDittoReader
+
+# OpenDSS convergence tolerance within which a resumed run matches an uninterrupted one
+TOLERANCE = 1e-4
+
+
+def _interrupt_after(monkeypatch, step_count):
+    """Make the loop engine raise an error after it has recorded a number of timesteps."""
+    record_results = UrbanoptDittoReader._record_results
+    recorded = []
+
+    def interrupted_record_results(*args):
+        if len(recorded) == step_count:
+            raise RuntimeError("interrupted")
+        recorded.append(args[0])
+        record_results(*args)
+
+    monkeypatch.setattr(UrbanoptDittoReader, "_record_results", staticmethod(interrupted_record_results))
+
+
+def test_resume_after_interruption(run_example, assert_results_close, tmp_path, monkeypatch, capsys):
+    expected = run_example("uninterrupted")
+
+    with monkeypatch.context() as m:
+        _interrupt_after(m, 5)
+        with pytest.raises(RuntimeError, match="interrupted"):
+            run_example("resumed", checkpoint_interval=2)
+    checkpoints_folder = tmp_path / "resumed" / "results" / "checkpoints"
+    assert len(list(checkpoints_folder.glob("*.npz"))) == 1
+
+    capsys.readouterr()
+    results = run_example("resumed", checkpoint_interval=2, resume=True)
+    output = capsys.readouterr().out
+    assert "Resuming after 4 of 12 timesteps" in output
+    assert output.count("Timepoint:") == 8
+    assert_results_close(results, expected, TOLERANCE)
+    assert not checkpoints_folder.exists()
+
+
+def test_checkpoint_of_changed_model_is_not_resumed(run_example, tmp_path, monkeypatch, capsys):
+    with monkeypatch.context() as m:
+        _interrupt_after(m, 5)
+        with pytest.raises(RuntimeError, match="interrupted"):
+            run_example("changed", checkpoint_interval=2)
+
+    # change a load profile of the model without changing the timesteps
+    profile = tmp_path / "changed" / "profiles" / "load_1_pu.csv"
+    profile.write_text(profile.read_text().replace("\n", "0\n", 1))
+
+    capsys.readouterr()
+    run_example("changed", checkpoint_interval=2, resume=True)
+    output = capsys.readouterr().out
+    assert "Resuming after" not in output
+    assert output.count("Timepoint:") == 12
@@ -97,3 +97,255 @@ def test_timestep(capfd):
     )
     captured = capfd.readouterr()
     assert "timestep: 120" in captured.out
+
+
+def test_result_format_npz(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--result_format",
+            "npz",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    results_file = examples_dir / "run" / "baseline_scenario" / "opendss" / "results" / "results.npz"
+    assert results_file.exists()
+    subprocess.run(
+        ["ditto_reader_cli", "export-csv", "--results_file", str(results_file)],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "result files written" in captured.out
+    results_file.unlink()
+
+
+def test_workers(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--workers",
+            "2",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "across 2 worker processes" in captured.out
+    assert "Timepoint: 2017/01/15 23:00:00" in captured.out
+    assert "Done. Results located in" in captured.out
+
+
+def test_monitors_engine(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--engine",
+            "monitors",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "in a single OpenDSS solve" in captured.out
+    assert "with the monitors engine" in captured.out
+    assert "Done. Results located in" in captured.out
+
+
+def test_screening(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--screen_top_k",
+            "3",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "Screening kept 3 of" in captured.out
+    assert "Done. Results located in" in captured.out
+
+
+def test_binary_profiles(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--profile_format",
+            "sng",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "profile_format: sng" in captured.out
+    assert "Done. Results located in" in captured.out
+
+
+def test_deduplicate_profiles(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--deduplicate_profiles",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "unique loadshapes" in captured.out
+    assert "Done. Results located in" in captured.out
+
+
+def test_stream_geojson(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--stream_geojson",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "Done. Results located in" in captured.out
+
+
+def test_reuse_model(capfd):
+    for _ in range(2):
+        subprocess.run(
+            [
+                "ditto_reader_cli",
+                "run-opendss",
+                "--config",
+                "example_config.json",
+                "--reuse_model",
+            ],
+            cwd=examples_dir,
+            check=True,
+        )
+    captured = capfd.readouterr()
+    assert "REUSING MODEL" in captured.out
+    assert "Done. Results located in" in captured.out
+
+
+def test_skip_json(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--skip_json",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "Done. Results located in" in captured.out
+
+
+def test_partition_feeders(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--partition_feeders",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "single feeder" in captured.out
+    assert "Done. Results located in" in captured.out
+
+
+def test_checkpoint_resume(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--checkpoint_interval",
+            "2",
+            "--resume",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "Done. Results located in" in captured.out
+    assert not (examples_dir / "run" / "baseline_scenario" / "opendss" / "results" / "checkpoints").exists()
+
+
+def test_stream_results(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--stream_results",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "Done. Results located in" in captured.out
+
+
+def test_summary_only(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--summary_only",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "Summary of the results written to" in captured.out
+    assert "Done. Results located in" in captured.out
+
+
+def test_sparse_violations(capfd):
+    subprocess.run(
+        [
+            "ditto_reader_cli",
+            "run-opendss",
+            "--config",
+            "example_config.json",
+            "--sparse_violations",
+        ],
+        cwd=examples_dir,
+        check=True,
+    )
+    captured = capfd.readouterr()
+    assert "Violation events written to" in captured.out
+    assert "Done. Results located in" in captured.out
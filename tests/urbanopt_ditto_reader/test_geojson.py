@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from urbanopt_ditto_reader.reader.geojson import iter_features
+
+examples_dir = Path(__file__).parent.parent.parent / "example"
+
+GEOJSON = {
+    "type": "FeatureCollection",
+    "a": 1e5,
+    "b": 12.5,
+    "c": -0.000125,
+    "d": [1, 22, 333, 4.5e-3, True, False, None],
+    "name": 'quoted "text" with \u00e9 and , : { } [ ]',
+    "features": [
+        {"type": "Feature", "properties": {"id": "1", "type": "Building", "area": 12345.678}, "geometry": None},
+        {
+            "type": "Feature",
+            "properties": {"id": "j1", "type": "ElectricalJunction", "buildingId": "1"},
+            "geometry": {"type": "Point", "coordinates": [-105.17, 39.74]},
+        },
+        {
+            "type": "Feature",
+            "properties": {"id": "2", "type": "Building", "floors": 10, "height": 1e2, "name": "Z\u00fcrich"},
+            "geometry": {"type": "Polygon", "coordinates": [[[1.5, 2.25], [3.125, 4.0625], [1.5, 2.25]]]},
+        },
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": [0, 0]}},
+    ],
+    "project": {"id": 7, "weights": [1e-7, 1e7, 123456789]},
+}
+
+
+def _slim(feature):
+    slim_feature = {}
+    if "properties" in feature:
+        slim_feature["properties"] = feature["properties"]
+    if isinstance(feature.get("geometry"), dict) and feature["geometry"]["type"] == "Point":
+        slim_feature["geometry"] = feature["geometry"]
+    return slim_feature
+
+
+def _expected_features(geojson_file):
+    with open(geojson_file) as f:
+        return [_slim(feature) for feature in json.load(f)["features"]]
+
+
+@pytest.mark.parametrize("separators", [(",", ":"), (", ", ": ")], ids=["compact", "spaced"])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 7, 11, 13, 64, 1048576])
+def test_iter_features_matches_json_load(tmp_path, chunk_size, separators):
+    geojson_file = tmp_path / "features.json"
+    geojson_file.write_text(json.dumps(GEOJSON, separators=separators))
+    assert list(iter_features(geojson_file, chunk_size)) == _expected_features(geojson_file)
+
+
+def test_numbers_straddling_chunks(tmp_path):
+    # every split point of each number falls on a chunk boundary for some chunk size
+    geojson_file = tmp_path / "features.json"
+    geojson_file.write_text('{"a":1e5,"b":12.5,"c":-3.25E-2,"features":[{"properties":{"v":987654.25}}],"z":7}')
+    for chunk_size in range(1, 40):
+        assert list(iter_features(geojson_file, chunk_size)) == [{"properties": {"v": 987654.25}}]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, 4096])
+def test_iter_features_of_example(chunk_size):
+    geojson_file = examples_dir / "example_project_with_electric_network.json"
+    assert list(iter_features(geojson_file, chunk_size)) == _expected_features(geojson_file)
+
+
+@pytest.mark.parametrize("text", ['{"features": [1, }', '{"a": 1e5', '{"features": [{"a": tru}]}', "[]"])
+def test_invalid_json(tmp_path, text):
+    geojson_file = tmp_path / "features.json"
+    geojson_file.write_text(text)
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_features(geojson_file, 2))
+
+
+def test_streamed_model_matches_loaded_model(run_example_model, read_result_files):
+    expected_folder = run_example_model("loaded")
+    results_folder = run_example_model("streamed", stream_geojson=True)
+    dss_files = read_result_files(results_folder.parent / "dss_files", "*.dss")
+    assert len(dss_files) > 0
+    assert dss_files == read_result_files(expected_folder.parent / "dss_files", "*.dss")
+    assert read_result_files(results_folder) == read_result_files(expected_folder)
@@ -0,0 +1,144 @@
+import math
+from contextlib import suppress
+from pathlib import Path
+
+import numpy as np
+import opendssdirect as dss
+import pytest
+
+from urbanopt_ditto_reader.urbanopt_ditto_reader import UrbanoptDittoReader
+
+scenario_dir = Path(__file__).parent.parent.parent / "example" / "run" / "baseline_scenario"
+ditto_master = scenario_dir / "opendss" / "dss_files" / "Master.dss"
+rnm_master = scenario_dir / "rnm-us" / "results" / "OpenDSS" / "dss_files" / "Master.dss"
+
+
+def _redirect_state(master_dss):
+    dss.Text.Command("Clear")
+    dss.Text.Command(f'Redirect "{master_dss}"')
+    return dss.Circuit.AllBusNames(), dss.Loads.AllNames(), dss.Circuit.AllBusMagPu()
+
+
+def _commands_state(master_dss):
+    dss.Text.Command("Clear")
+    dss.Text.Commands(UrbanoptDittoReader._read_dss_commands(str(master_dss)))
+    return dss.Circuit.AllBusNames(), dss.Loads.AllNames(), dss.Circuit.AllBusMagPu()
+
+
+@pytest.mark.parametrize("master_dss", [ditto_master, rnm_master], ids=["ditto", "rnm"])
+def test_read_commands_match_redirect(master_dss):
+    bus_names, load_names, voltages = _redirect_state(master_dss)
+    command_bus_names, command_load_names, command_voltages = _commands_state(master_dss)
+    assert command_bus_names == bus_names
+    assert command_load_names == load_names
+    # the solves of the master file are kept, so the initial solution is the same
+    assert command_voltages == voltages
+
+
+def test_extensionless_redirects():
+    commands = UrbanoptDittoReader._read_dss_commands(str(rnm_master))
+    # "Redirect LoadsShapes" and "Redirect Loads" are inlined from their .dss files
+    assert any(c.lower().startswith("new loadshape.") for c in commands)
+    assert any(c.lower().startswith("new load.") for c in commands)
+    assert not any(c.lower().startswith("redirect") for c in commands)
+    _commands_state(rnm_master)
+    assert len(dss.Circuit.AllBusNames()) == 45
+    assert dss.Loads.Count() == 13
+
+
+def test_bus_voltages_match_per_bus_readings():
+    UrbanoptDittoReader._load_circuit(ditto_master)
+    bus_names, node_bus_index = UrbanoptDittoReader._get_bus_node_index()
+    voltages = UrbanoptDittoReader._get_all_voltages(bus_names, node_bus_index)
+
+    # average of the per-unit voltage magnitudes of the nodes of each bus, read one bus at a time
+    expected = []
+    for bus_name in dss.Circuit.AllBusNames():
+        dss.Circuit.SetActiveBus(bus_name)
+        magnitudes = dss.Bus.puVmagAngle()[::2]
+        expected.append(sum(magnitudes) / len(magnitudes) if len(magnitudes) > 0 else 0)
+    assert bus_names == dss.Circuit.AllBusNames()
+    np.testing.assert_allclose(voltages, expected, rtol=1e-12, atol=0)
+
+
+def _element_loading(element_class, get_loading):
+    """Read the loading of each element of a class one element at a time."""
+    loading = {}
+    dss.Circuit.SetActiveClass(element_class)
+    flag = dss.ActiveClass.First()
+    while flag > 0:
+        if dss.CktElement.Enabled():
+            loading[dss.CktElement.Name()] = get_loading()
+        flag = dss.ActiveClass.Next()
+    return loading
+
+
+def _line_loading():
+    currents = dss.CktElement.Currents()
+    current_mags = [math.sqrt(currents[2 * ii] ** 2 + currents[2 * ii + 1] ** 2) for ii in range(len(currents) // 2)]
+    return max(current_mags) / dss.CktElement.NormalAmps()
+
+
+def _xfmr_loading():
+    hs_kv = float(dss.Properties.Value("kVs").split("[")[1].split(",")[0])
+    kva = float(dss.Properties.Value("kVA"))
+    n_phases = dss.CktElement.NumPhases()
+    limit = kva / (hs_kv * math.sqrt(3)) if n_phases > 1 else kva / hs_kv
+    return max(dss.CktElement.CurrentsMagAng()[: 2 * n_phases][::2]) / limit
+
+
+@pytest.mark.parametrize(
+    ("element_class", "get_ratings", "get_loading"),
+    [
+        ("Line", UrbanoptDittoReader._get_line_ratings, _line_loading),
+        ("Transformer", UrbanoptDittoReader._get_xfmr_ratings, _xfmr_loading),
+    ],
+    ids=["lines", "transformers"],
+)
+def test_element_loading_matches_per_element_readings(element_class, get_ratings, get_loading):
+    UrbanoptDittoReader._load_circuit(ditto_master)
+    ratings = get_ratings()
+    current_mags = UrbanoptDittoReader._get_pd_current_magnitudes()
+    loading = UrbanoptDittoReader._get_element_loading(current_mags, ratings)
+
+    expected = _element_loading(element_class, get_loading)
+    assert len(expected) > 0
+    assert ratings[0] == list(expected)
+    np.testing.assert_allclose(loading, list(expected.values()), rtol=1e-12, atol=0)
+
+
+def _building_voltages(bus_names, voltages, building_map):
+    """Collect the voltage of each building one bus at a time."""
+    building_voltages = {}
+    for element, volt_val in zip(bus_names, voltages):
+        with suppress(KeyError):  # element is not a building
+            building_voltages.setdefault(building_map[element.replace("_", "-")], []).append(volt_val)
+    return building_voltages
+
+
+def test_building_bus_index_matches_per_bus_lookup():
+    bus_names = ["sourcebus", "p1_ulv", "junction_1", "p2_ulv", "junction_2", "junction_3"]
+    building_map = {"junction-1": "building_a", "junction-2": "building_b", "junction-3": "building_c"}
+    voltages = np.array([1.0, 0.99, 0.98, 0.97, 0.96, 0.95])
+    bldg_names, bldg_bus_index = UrbanoptDittoReader._get_building_bus_index(bus_names, building_map)
+
+    expected = _building_voltages(bus_names, voltages, building_map)
+    assert bldg_names == list(expected)
+    assert voltages[bldg_bus_index].tolist() == [values[0] for values in expected.values()]
+
+
+def test_building_bus_index_uses_last_of_duplicate_buses():
+    bus_names = ["junction_1", "junction_2", "junction_3", "p1_ulv"]
+    building_map = {"junction-1": "building_a", "junction-2": "building_b", "junction-3": "building_a"}
+    voltages = np.array([0.98, 0.97, 0.96, 0.95])
+    bldg_names, bldg_bus_index = UrbanoptDittoReader._get_building_bus_index(bus_names, building_map)
+
+    expected = _building_voltages(bus_names, voltages, building_map)
+    assert bldg_names == list(expected) == ["building_a", "building_b"]
+    assert voltages[bldg_bus_index].tolist() == [values[-1] for values in expected.values()]
+
+
+def test_building_bus_index_without_buildings():
+    bldg_names, bldg_bus_index = UrbanoptDittoReader._get_building_bus_index(["sourcebus", "p1_ulv"], {})
+    assert bldg_names == []
+    assert np.zeros(2)[bldg_bus_index].shape == (0,)
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from urbanopt_ditto_reader.reader.manifest import ProfileManifest
+from urbanopt_ditto_reader.reader.read import Reader
+
+DATA = [1.0, 2.0, 4.0]
+
+
+@pytest.fixture()
+def profiles(tmp_path):
+    profiles_folder = tmp_path / "profiles"
+    profiles_folder.mkdir()
+    report = tmp_path / "default_feature_report.csv"
+    report.write_text("Datetime,Net Power(kW)\n")
+    return profiles_folder, report
+
+
+def _write_profiles(profiles_folder, report, column="Net Power(kW)", multiplier=1000, data=DATA):
+    """Write the load_1 profile with a fresh Reader as parse_loads does and return the manifest."""
+    reader = Reader(
+        geojson_file="features.json",
+        equipment_file="catalog.json",
+        load_folder="scenario",
+        is_timeseries=True,
+        timeseries_location=str(profiles_folder),
+        relative_timeseries_location="profiles",
+    )
+    reader.timeline_mismatches, reader.shared_profiles, reader.profile_aliases = [], {}, {}
+    reader.profile_manifest = ProfileManifest(str(profiles_folder))
+    data_pu = [v / max(data) for v in data]
+    reader._write_profile("load_1", list(data), data_pu, str(report), column, multiplier)
+    reader.profile_manifest.write()
+    return reader.profile_manifest
+
+
+def _mark_files(profiles_folder):
+    """Overwrite the profile files with a marker so that rewritten files can be detected."""
+    for name in ("load_1.csv", "load_1_pu.csv"):
+        (profiles_folder / name).write_text("marker\n")
+
+
+def _rewritten(profiles_folder):
+    return all((profiles_folder / name).read_text() != "marker\n" for name in ("load_1.csv", "load_1_pu.csv"))
+
+
+def test_unchanged_rerun_reuses_profiles(profiles):
+    profiles_folder, report = profiles
+    manifest = _write_profiles(profiles_folder, report)
+    assert manifest.reused == 0
+    assert (profiles_folder / "load_1_pu.csv").read_text() == "0.25\n0.5\n1.0\n"
+    entries = json.loads((profiles_folder / ProfileManifest.FILE_NAME).read_text())["profiles"]
+    assert entries["load_1"]["files"] == ["load_1.csv", "load_1_pu.csv"]
+
+    _mark_files(profiles_folder)
+    manifest = _write_profiles(profiles_folder, report)
+    assert manifest.reused == 1
+    assert not _rewritten(profiles_folder)
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [{"column": "Net Power(W)"}, {"multiplier": 1}, {"data": [1.0, 2.0, 5.0]}],
+    ids=["column", "multiplier", "data"],
+)
+def test_changed_inputs_rewrite_profiles(profiles, changes):
+    profiles_folder, report = profiles
+    _write_profiles(profiles_folder, report)
+    _mark_files(profiles_folder)
+    manifest = _write_profiles(profiles_folder, report, **changes)
+    assert manifest.reused == 0
+    assert _rewritten(profiles_folder)
+
+    # the new inputs are recorded so the next run reuses the rewritten files
+    assert _write_profiles(profiles_folder, report, **changes).reused == 1
+
+
+def test_deleted_file_rewrites_profile(profiles):
+    profiles_folder, report = profiles
+    _write_profiles(profiles_folder, report)
+    (profiles_folder / "load_1_pu.csv").unlink()
+    manifest = _write_profiles(profiles_folder, report)
+    assert manifest.reused == 0
+    assert (profiles_folder / "load_1_pu.csv").read_text() == "0.25\n0.5\n1.0\n"
+
+
+def test_invalid_manifest_is_ignored(profiles):
+    profiles_folder, report = profiles
+    _write_profiles(profiles_folder, report)
+    (profiles_folder / ProfileManifest.FILE_NAME).write_text("{not json")
+    assert ProfileManifest(str(profiles_folder)).entries == {}
+    assert _write_profiles(profiles_folder, report).reused == 0
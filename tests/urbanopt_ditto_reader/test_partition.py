@@ -0,0 +1,128 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import opendssdirect as dss
+import pytest
+
+from urbanopt_ditto_reader.urbanopt_ditto_reader import UrbanoptDittoReader
+
+examples_dir = Path(__file__).parent.parent.parent / "example"
+
+# a circuit with a feeder of two lines and a load and a feeder with a line, a
+# transformer and a load, where the meters and controls of each feeder are
+# defined after all of the elements of both feeders
+two_feeder_master = """Clear
+New Circuit.two_feeders basekv=12.47 bus1=sourcebus pu=1.0 MVAsc3=1000000 MVAsc1=1000000
+New Linecode.lc nphases=3 r1=0.3 x1=0.6 r0=0.6 x0=1.2 units=km
+New Loadshape.daily npts=24 interval=1
+~ mult=(0.4 0.35 0.3 0.3 0.35 0.5 0.7 0.9 1.0 0.95 0.9 0.85 0.8 0.8 0.85 0.9 1.0 1.1 1.2 1.1 0.9 0.7 0.5 0.45)
+New Line.f1a bus1=sourcebus bus2=b1 linecode=lc length=1 units=km
+New Line.f1b bus1=b1 bus2=bldg_1 linecode=lc length=1 units=km
+New Line.f2a bus1=sourcebus bus2=c1 linecode=lc length=2 units=km
+New Transformer.t2 buses=[c1 bldg_2] conns=[wye wye] kvs=[12.47 0.48] kvas=[1000 1000] %rs=[0.5 0.5] xhl=2
+Redirect Loads.dss
+New EnergyMeter.m2 element=Line.f2a terminal=1
+New Monitor.mon1 element=Line.f1b terminal=2
+New RegControl.r2 transformer=t2 winding=2 vreg=120 ptratio=2.4
+Edit Load.l2 kw=600
+~ kvar=150
+Load.l1.kvar=200
+Set voltagebases=[12.47 0.48]
+CalcVoltageBases
+"""
+two_feeder_loads = """New Load.l1 bus1=bldg_1 kv=12.47 kw=1500 pf=0.95 yearly=daily
+New Load.l2 bus1=bldg_2 kv=0.48 kw=500 pf=0.9 yearly=daily
+"""
+building_map = {"bldg-1": "1", "bldg-2": "2"}
+
+
+@pytest.fixture()
+def two_feeder_reader(tmp_path):
+    dss_folder = tmp_path / "dss_files"
+    dss_folder.mkdir()
+    (dss_folder / "Master.dss").write_text(two_feeder_master)
+    (dss_folder / "Loads.dss").write_text(two_feeder_loads)
+    example_config = json.loads((examples_dir / "example_config.json").read_text())
+    config_data = {
+        **example_config,
+        "urbanopt_scenario_file": str(examples_dir / example_config["urbanopt_scenario_file"]),
+        "urbanopt_geojson_file": str(examples_dir / example_config["urbanopt_geojson_file"]),
+        "equipment_file": str(examples_dir / example_config["equipment_file"]),
+        "opendss_folder": str(tmp_path),
+        "timestep": 60,
+        "partition_feeders": True,
+    }
+    return UrbanoptDittoReader(config_data), str(dss_folder / "Master.dss")
+
+
+def test_feeder_partitions(two_feeder_reader):
+    _, master_dss = two_feeder_reader
+    UrbanoptDittoReader._load_circuit(master_dss)
+    feeder_heads, element_feeders = UrbanoptDittoReader._get_feeder_partitions()
+    assert feeder_heads == ["Line.f1a", "Line.f2a"]
+    assert element_feeders == {
+        "line.f1a": 0,
+        "line.f1b": 0,
+        "line.f2a": 1,
+        "transformer.t2": 1,
+        "load.l1": 0,
+        "load.l2": 1,
+        # meters and controls are on the feeder of the element that they act on
+        "energymeter.m2": 1,
+        "monitor.mon1": 0,
+        "regcontrol.r2": 1,
+    }
+
+
+def test_feeder_masters(two_feeder_reader, tmp_path):
+    _, master_dss = two_feeder_reader
+    UrbanoptDittoReader._load_circuit(master_dss)
+    feeder_heads, element_feeders = UrbanoptDittoReader._get_feeder_partitions()
+    commands = UrbanoptDittoReader._read_dss_commands(master_dss)
+    feeder_masters = UrbanoptDittoReader._write_feeder_masters(
+        commands, element_feeders, len(feeder_heads), str(tmp_path / "feeders")
+    )
+    assert [os.path.basename(m) for m in feeder_masters] == ["feeder_1.dss", "feeder_2.dss"]
+
+    feeder_1 = Path(feeder_masters[0]).read_text()
+    assert "Load.l1.kvar=200" in feeder_1
+    assert "Loadshape.daily" in feeder_1
+    for dropped in ("Line.f2a", "Transformer.t2", "Load.l2", "EnergyMeter.m2", "RegControl.r2", "kvar=150"):
+        assert dropped not in feeder_1
+    feeder_2 = Path(feeder_masters[1]).read_text()
+    assert "Edit Load.l2 kw=600\n~ kvar=150" in feeder_2
+    assert "Loadshape.daily" in feeder_2
+    for dropped in ("Line.f1a", "Line.f1b", "Load.l1", "Monitor.mon1"):
+        assert dropped not in feeder_2
+
+    # each master loads into OpenDSS without errors and has the elements of its feeder
+    expected_elements = [
+        ["Line.f1a", "Line.f1b", "Load.l1", "Monitor.mon1"],
+        ["Line.f2a", "Transformer.t2", "Load.l2", "EnergyMeter.m2", "RegControl.r2"],
+    ]
+    for feeder_master, elements in zip(feeder_masters, expected_elements):
+        UrbanoptDittoReader._load_circuit(feeder_master)
+        assert sorted(dss.Circuit.AllElementNames()) == sorted(["Vsource.source", *elements])
+        dss.Solution.Solve()
+        assert dss.Solution.Converged()
+
+
+def test_partitioned_results_match_full_solve(two_feeder_reader):
+    reader, master_dss = two_feeder_reader
+    ts = [f"2017/01/01 {hour:02d}:00:00" for hour in range(24)]
+    sim_steps = list(range(24))
+    expected = reader._solve_timesteps(master_dss, sim_steps, ts, building_map, "loop")
+    results = reader._solve_feeders_parallel(master_dss, ts, sim_steps, building_map, "loop")
+    assert list(results) == list(expected)
+    for group, store in results.items():
+        expected_store = expected[group]
+        assert sorted(store.element_names) == sorted(expected_store.element_names)
+        assert len(store.element_names) > 0
+        expected_rows = [expected_store.element_names.index(name) for name in store.element_names]
+        assert store.timestamps == expected_store.timestamps
+        # the source is stiff, so the feeders barely affect each other
+        expected_values = expected_store.values[expected_rows]  # noqa: PD011
+        np.testing.assert_allclose(store.values, expected_values, rtol=0, atol=1e-4)
+        np.testing.assert_array_equal(store.flags, expected_store.flags[:, expected_rows])
@@ -0,0 +1,59 @@
+import shutil
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize(("profile_format", "dtype"), [("sng", np.float32), ("dbl", np.float64)])
+def test_binary_profiles_match_csv_profiles(
+    run_example_model, read_result_files, assert_results_close, profile_format, dtype
+):
+    expected_folder = run_example_model("csv")
+    results_folder = run_example_model(profile_format, profile_format=profile_format)
+
+    # the binary profiles hold the values of the CSV profiles
+    csv_profiles = sorted((expected_folder.parent / "profiles").glob("*_pu.csv"))
+    assert len(csv_profiles) == 13
+    for csv_profile in csv_profiles:
+        binary_profile = results_folder.parent / "profiles" / f"{csv_profile.stem}.{profile_format}"
+        np.testing.assert_array_equal(np.fromfile(binary_profile, dtype=dtype), np.loadtxt(csv_profile).astype(dtype))
+    load_shapes = (results_folder.parent / "dss_files" / "LoadShapes.dss").read_text()
+    assert load_shapes.count(f"{profile_format}file=") == 13
+
+    if profile_format == "dbl":
+        assert read_result_files(results_folder) == read_result_files(expected_folder)
+    else:  # single-precision multipliers only change the solution within the OpenDSS convergence tolerance
+        assert_results_close(results_folder, expected_folder, 1e-4)
+
+
+def test_deduplicated_profiles_share_loadshapes(
+    run_example_model, read_result_files, example_scenario, tmp_path, capfd
+):
+    # give building 2 the load profile of building 1 scaled by two so that their per-unit profiles are identical
+    scenario_folder = tmp_path / "scenario"
+    shutil.copytree(example_scenario.parent, scenario_folder)
+    reports = scenario_folder / "run" / "baseline_scenario"
+    report_1 = (reports / "1" / "feature_reports" / "default_feature_report.csv").read_text().splitlines()
+    rows = [row.split(",") for row in report_1[1:]]
+    report_2 = [report_1[0], *(f"{t},{float(load) * 2!r}" for t, load in rows), ""]
+    (reports / "2" / "feature_reports" / "default_feature_report.csv").write_text("\n".join(report_2))
+    scenario_file = str(scenario_folder / example_scenario.name)
+
+    expected_folder = run_example_model("separate", urbanopt_scenario_file=scenario_file)
+    results_folder = run_example_model("shared", urbanopt_scenario_file=scenario_file, deduplicate_profiles=True)
+    assert "Collapsed 1 of 13 per-unit profiles into 12 unique loadshapes" in capfd.readouterr().out
+
+    profiles = results_folder.parent / "profiles"
+    assert (profiles / "shared_profiles.csv").read_text().splitlines() == [
+        "profile,shared profile file",
+        "load_2,load_1_pu.csv",
+    ]
+    assert not (profiles / "load_2_pu.csv").exists()
+    load_shapes = (results_folder.parent / "dss_files" / "LoadShapes.dss").read_text()
+    assert load_shapes.count("New Loadshape.") == 12
+    assert load_shapes.count("load_1_pu.csv") == 1
+    assert "load_2_pu.csv" not in load_shapes
+    expected_shapes = (expected_folder.parent / "dss_files" / "LoadShapes.dss").read_text()
+    assert expected_shapes.count("New Loadshape.") == 13
+
+    assert read_result_files(results_folder) == read_result_files(expected_folder)
@@ -0,0 +1,219 @@
+import csv
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from urbanopt_ditto_reader import urbanopt_ditto_reader
+from urbanopt_ditto_reader.ditto_reader_cli import cli
+from urbanopt_ditto_reader.results import ResultSummary, StreamingResultStore, read_results_npz
+
+
+class SmallChunkStreamingResultStore(StreamingResultStore):
+    """StreamingResultStore with chunks of a few timesteps so that a short run spans several chunks."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs["chunk_size"] = 5
+        super().__init__(*args, **kwargs)
+
+
+def test_streamed_results_match_buffered(run_example, read_result_files, monkeypatch):
+    expected = read_result_files(run_example("buffered"))
+    monkeypatch.setattr(urbanopt_ditto_reader, "StreamingResultStore", SmallChunkStreamingResultStore)
+    results = read_result_files(run_example("streamed", stream_results=True))
+    assert len(expected) == 39
+    assert results == expected
+
+
+def test_results_match_committed_example(run_example, example_opendss, read_result_files):
+    results = read_result_files(run_example("default"))
+    expected_folder = example_opendss / "results"
+    assert len(results) == 39
+    assert results == {name: (expected_folder / name).read_bytes() for name in results}
+
+
+def test_npz_results_match_csv_results(run_example, read_result_files):
+    expected = read_result_files(run_example("csv"))
+    results_folder = run_example("npz", result_format="npz")
+    assert read_result_files(results_folder) == {}
+
+    stores = read_results_npz(results_folder / "results.npz")
+    assert list(stores) == ["Features", "Lines", "Transformers"]
+    for group, store in stores.items():
+        assert sorted(f"{group}/{name}.csv" for name in store.file_names) == sorted(
+            name for name in expected if name.startswith(f"{group}/")
+        )
+    export_folder = results_folder.parent / "exported"
+    export_args = ["--results_file", str(results_folder / "results.npz"), "--output_folder", str(export_folder)]
+    result = CliRunner().invoke(cli, ["export-csv", *export_args])
+    assert result.exit_code == 0, result.output
+    assert "39 result files written" in result.output
+    assert read_result_files(export_folder) == expected
+
+
+def test_worker_results_match_serial_results(run_example, read_result_files, assert_results_close, capsys):
+    expected_folder = run_example("serial")
+    results_folder = run_example("workers", workers=2)
+    assert "across 2 worker processes" in capsys.readouterr().out
+    assert len(read_result_files(results_folder)) == 39
+    assert_results_close(results_folder, expected_folder, 1e-4)
+
+
+def test_monitor_results_match_loop_results(run_example, read_result_files, assert_results_close, capsys):
+    expected_folder = run_example("loop")
+    results_folder = run_example("monitors", engine="monitors")
+    assert "in a single OpenDSS solve" in capsys.readouterr().out
+    assert len(read_result_files(results_folder)) == 39
+    # monitor results can differ from the loop results within the OpenDSS convergence tolerance
+    assert_results_close(results_folder, expected_folder, 1e-4)
+
+
+@pytest.mark.parametrize(
+    ("config", "engine"),
+    [
+        ({"end_time": "2017/01/15 01:00:00"}, "monitors"),
+        ({"end_time": "2017/01/15 05:00:00", "workers": 3}, "monitors"),
+        ({"screen_top_k": 4}, "loop"),
+    ],
+    ids=["single_timestep", "single_timestep_chunks", "screened"],
+)
+def test_monitors_engine_messages(run_example, assert_results_close, capsys, config, engine):
+    expected_folder = run_example("loop", **config)
+    capsys.readouterr()
+    results_folder = run_example("monitors", engine="monitors", **config)
+    output = capsys.readouterr().out
+    assert f"timesteps with the {engine} engine" in output
+    assert ("not evenly spaced" in output) == (engine == "loop")
+    assert_results_close(results_folder, expected_folder, 1e-4)
+
+
+def test_screening_solves_peak_timesteps(run_example, example_opendss, read_result_files):
+    expected = read_result_files(run_example("all_timesteps"))
+    results_folder = run_example("screened", screen_top_k=4)
+
+    # the feeder load of the simulated timesteps (every 2 hours on 2017/01/15) from the building profiles,
+    # where OpenDSS solves timestep i at hour (i + 1) * timestep / 60 since the yearly solve advances the
+    # time by a step before solving, which is the 1-based point (i + 1) * 2 of the hourly loadshapes
+    profiles = example_opendss / "profiles"
+    timestamps = (profiles / "timestamps.csv").read_text().splitlines()[1:]
+    sim_steps = list(range(timestamps.index("2017/01/15 01:00:00"), timestamps.index("2017/01/15 23:00:00") + 1, 2))
+    solve_rows = [(i + 1) * 2 - 1 for i in sim_steps]
+    feeder_load = np.zeros(len(sim_steps))
+    for load_profile in profiles.glob("load_*.csv"):
+        if not load_profile.stem.endswith("_pu"):
+            feeder_load += np.loadtxt(load_profile)[solve_rows]
+    peak_times = sorted(timestamps[sim_steps[step]] for step in np.argsort(-feeder_load)[:4])
+
+    with open(results_folder / "screening_report.csv") as csv_file:
+        report = list(csv.DictReader(csv_file))
+    assert [row["Datetime"] for row in report] == [timestamps[i] for i in sim_steps]
+    assert [row["Datetime"] for row in report if row["solved"] == "True"] == peak_times
+    np.testing.assert_allclose(
+        [float(row["estimated loading"]) for row in report], feeder_load / feeder_load.max(), rtol=0, atol=1e-5
+    )
+
+    # the screened results are the rows of the peak timesteps in the results of all timesteps
+    results = read_result_files(results_folder)
+    assert sorted(results) == sorted(expected)
+    for name, content in results.items():
+        expected_rows = expected[name].decode().splitlines()
+        expected_rows = expected_rows[:1] + [row for row in expected_rows[1:] if row.split(",")[0] in peak_times]
+        assert content.decode().splitlines() == expected_rows
+
+
+def test_summary_only_matches_full_run(run_example, read_result_files):
+    expected_folder = run_example("default")
+    results_folder = run_example("summary_only", summary_only=True)
+    assert read_result_files(results_folder) == {}
+    assert [f.name for f in results_folder.iterdir() if f.is_dir()] == []
+    summaries = read_result_files(results_folder, "*.*")
+    assert sorted(summaries) == ["summary.csv", "summary.json", "violations.csv"]
+    assert summaries == read_result_files(expected_folder, "*.*")
+
+
+def _flag_events(results_folder):
+    """Get the violation events of the flag columns of the CSV results of a run as rows of a violations.csv."""
+    events = []
+    for csv_path in sorted(results_folder.glob("*/*.csv")):
+        with open(csv_path) as csv_file:
+            reader = csv.reader(csv_file)
+            header = next(reader)
+            rows = list(reader)
+        for column, label in enumerate(header[2:], 2):
+            peak_func = min if label in ResultSummary.LOW_FLAGS else max
+            event = []
+            for row in [*rows, None]:
+                if row is not None and row[column] == "True":
+                    event.append(row)
+                elif event:
+                    peak = peak_func(float(r[1]) for r in event)
+                    events.append(
+                        [csv_path.parent.name, csv_path.stem, label, event[0][0], event[-1][0], len(event), peak]
+                    )
+                    event = []
+    return events
+
+
+def _read_violations(results_folder):
+    with open(results_folder / "violations.csv") as csv_file:
+        rows = list(csv.reader(csv_file))[1:]
+    return [[*row[:5], int(row[5]), float(row[6])] for row in rows]
+
+
+def test_sparse_violations_match_flags(run_example, read_result_files, monkeypatch):
+    expected_folder = run_example("default")
+    expected = read_result_files(expected_folder)
+    # stream the results in chunks of a few timesteps so that the events span several chunks
+    monkeypatch.setattr(urbanopt_ditto_reader, "StreamingResultStore", SmallChunkStreamingResultStore)
+    results_folder = run_example("sparse", stream_results=True, sparse_violations=True)
+    results = read_result_files(results_folder)
+    assert sorted(results) == sorted(expected)
+    for name, content in results.items():
+        expected_rows = [row.split(",")[:2] for row in expected[name].decode().splitlines()]
+        assert [row.split(",") for row in content.decode().splitlines()] == expected_rows
+
+    violations = _read_violations(results_folder)
+    assert len(violations) > 0
+    assert sorted(violations) == sorted(_flag_events(expected_folder))
+    assert violations == _read_violations(expected_folder)
+
+
+# two elements with overvoltage and undervoltage flags over ten timesteps
+summary_values = np.array(
+    [
+        [1.0, 1.06, 1.08, 1.07, 1.0, 0.94, 0.93, 0.96, 1.06, 1.06],
+        [0.94, 0.92, 0.93, 0.9, 0.94, 0.91, 1.0, 1.0, 1.0, 0.94],
+    ]
+)
+summary_events = [
+    (0, 0, 1, "t1", "t3", 3, 1.08),
+    (0, 0, 8, "t8", "t9", 2, 1.06),
+    (1, 0, 5, "t5", "t6", 2, 0.93),
+    (1, 1, 0, "t0", "t5", 6, 0.9),
+    (1, 1, 9, "t9", "t9", 1, 0.94),
+]
+
+
+@pytest.mark.parametrize("block_sizes", [[10], [3, 7], [4, 4, 2], [2] * 5, [1] * 10])
+def test_summary_events_span_blocks(block_sizes):
+    timestamps = [f"t{i}" for i in range(10)]
+    flag_bits = np.array([summary_values > 1.05, summary_values < 0.95])
+    result_summary = ResultSummary(["bus_1", "bus_2"], "p.u. voltage", ["overvoltage", "undervoltage"])
+    start = 0
+    for block_size in block_sizes:
+        end = start + block_size
+        block_flags = np.packbits(flag_bits[:, :, start:end], axis=2)
+        result_summary.update(timestamps[start:end], summary_values[:, start:end], block_flags)
+        start = end
+    assert result_summary.step_count == 10
+    assert result_summary.flag_counts.tolist() == [[5, 0], [2, 7]]
+    assert result_summary.violation_events() == summary_events
+
+
+@pytest.mark.parametrize(("flag_label", "peak"), [("undervoltage", 0.9), ("overvoltage", 0.94), ("overloaded", 0.94)])
+def test_summary_event_peak(flag_label, peak):
+    values = np.array([[0.94, 0.9, 0.92]])
+    result_summary = ResultSummary(["bus_1"], "p.u. voltage", [flag_label])
+    result_summary._update_events(0, ["t0", "t1"], values[:, :2], np.ones((1, 2), dtype=bool))
+    result_summary._update_events(0, ["t2"], values[:, 2:], np.ones((1, 1), dtype=bool))
+    assert result_summary.violation_events() == [(0, 0, 0, "t0", "t2", 3, peak)]
@@ -0,0 +1,14 @@
+def test_model_written_without_reuse_is_not_reused(run_example_model, read_result_files, capsys):
+    expected = read_result_files(run_example_model("csv", reuse_model=True))
+    results_folder = run_example_model("model", reuse_model=True)
+    # writing the model without reuse_model replaces the fingerprint of the model it overwrites
+    run_example_model("model", profile_format="sng")
+    capsys.readouterr()
+    run_example_model("model", reuse_model=True)
+    assert "REUSING MODEL" not in capsys.readouterr().out
+    assert "sngfile" not in (results_folder.parent / "dss_files" / "LoadShapes.dss").read_text()
+    assert read_result_files(results_folder) == expected
+
+    run_example_model("model", reuse_model=True)
+    assert "REUSING MODEL" in capsys.readouterr().out
+    assert read_result_files(results_folder) == expected
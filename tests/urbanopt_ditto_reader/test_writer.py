@@ -0,0 +1,17 @@
+import pytest
+from ditto.models.timeseries import Timeseries
+from ditto.store import Store
+
+from urbanopt_ditto_reader.writer.write import Writer
+
+
+@pytest.mark.parametrize("option", ["separate_feeders", "separate_substations"])
+def test_binary_loadshapes_cannot_be_separated(tmp_path, option):
+    model = Store()
+    timeseries = Timeseries(model)
+    timeseries.data_location = "load_1_pu.sng"
+    timeseries.data_label = "feature_1"
+    writer = Writer(output_path=str(tmp_path))
+    with pytest.raises(ValueError, match="binary loadshapes"):
+        writer.write(model, **{option: True})
+    assert list(tmp_path.iterdir()) == []
@@ -47,6 +47,7 @@ from pathlib import Path
 
 import click
 
+from urbanopt_ditto_reader.results import explode_results_npz
 from urbanopt_ditto_reader.urbanopt_ditto_reader import UrbanoptDittoReader
 
 CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
@@ -139,7 +140,136 @@ def cli():
     "running OpenDSS. Note that this will only upgrade the size of transformers "
     "that are smaller than the sum of the peak loads that they serve.",
 )
-def run_opendss(  # noqa: PLR0912
+@click.option(
+    "--result_format",
+    type=click.Choice(UrbanoptDittoReader.RESULT_FORMATS),
+    default=None,
+    help="Format of the simulation results. csv writes one CSV file per building, line and "
+    "transformer. npz writes all results into a single compressed results.npz file, which "
+    "can be converted to the CSV files with the export-csv command. Default: csv.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes across which the simulated timesteps are split. "
+    "Each worker solves a contiguous chunk of timesteps with its own OpenDSS instance. "
+    "This assumes that the loads only depend on their loadshapes (no time-coupled "
+    "controls or storage). Default: 1.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(UrbanoptDittoReader.ENGINES),
+    default=None,
+    help="Engine used to step through the timesteps. loop solves each timestep with a "
+    "separate OpenDSS solve and reads the results after each one. monitors places "
+    "OpenDSS monitors on the buildings, lines and transformers, solves all timesteps "
+    "with a single OpenDSS solve and reads the monitors afterwards. Default: loop.",
+)
+@click.option(
+    "--screen_top_k",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Screen the timesteps before running OpenDSS and only simulate the timesteps with the "
+    "highest estimated transformer and feeder loading. The estimate is aggregated from the "
+    "load and PV profiles without solving the power flow. The skipped timesteps are listed "
+    "in the screening_report.csv of the results folder.",
+)
+@click.option(
+    "--screen_threshold",
+    type=float,
+    default=None,
+    help="Screen the timesteps before running OpenDSS and only simulate the timesteps with an "
+    "estimated transformer or feeder loading at or above this value (in p.u.). The feeder "
+    "loading is relative to the peak feeder load. Can be combined with --screen_top_k.",
+)
+@click.option(
+    "--profile_format",
+    type=click.Choice(UrbanoptDittoReader.PROFILE_FORMATS),
+    default=None,
+    help="Format of the per-unit load profiles that OpenDSS reads. csv writes one value "
+    "per line. sng and dbl write binary float32 and float64 files, which are smaller and "
+    "faster to write and load. Default: csv.",
+)
+@click.option(
+    "--write_kw_profiles",
+    is_flag=True,
+    help="Flag to also write the load profiles in physical units (eg. kW) as CSV files "
+    "when the --profile_format is sng or dbl. These are always written for csv profiles.",
+)
+@click.option(
+    "--deduplicate_profiles",
+    is_flag=True,
+    help="Flag to write a single per-unit profile file and OpenDSS loadshape for buildings "
+    "with identical per-unit profiles, which is common when many buildings use the same "
+    "prototype. The collapsed profiles are listed in profiles/shared_profiles.csv.",
+)
+@click.option(
+    "--stream_geojson",
+    is_flag=True,
+    help="Flag to read the feature file one feature at a time, keeping only the feature "
+    "properties and point coordinates. Use this to reduce memory for very large feature files.",
+)
+@click.option(
+    "--reuse_model",
+    is_flag=True,
+    help="Flag to reuse the OpenDSS files written by a previous run if the feature file, "
+    "equipment file, feature reports and model options have not changed since. This skips "
+    "building and checking the model, which is useful when only the start time, end time "
+    "or timestep change between runs.",
+)
+@click.option(
+    "--skip_json",
+    is_flag=True,
+    help="Flag to skip writing the JSON representation of the model to the json_files "
+    "folder, which is not used by the simulation.",
+)
+@click.option(
+    "--no_catalog_cache",
+    is_flag=True,
+    help="Flag to parse the equipment file on every run instead of reading and writing a "
+    "hidden cache file next to it (or in the user cache folder).",
+)
+@click.option(
+    "--partition_feeders",
+    is_flag=True,
+    help="Flag to split the circuit into the feeders connected to the source bus and solve "
+    "each feeder in a separate process. The results of all feeders are merged into the "
+    "usual results folder.",
+)
+@click.option(
+    "--checkpoint_interval",
+    type=click.IntRange(min=1),
+    help="Number of solved timesteps between checkpoints of the partial results, which are "
+    "written to results/checkpoints and removed once all timesteps are solved. Use with "
+    "--resume to continue a run that was interrupted.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Flag to continue an interrupted run from its last checkpoint instead of solving "
+    "the timesteps that were already solved.",
+)
+@click.option(
+    "--stream_results",
+    is_flag=True,
+    help="Flag to write the CSV results in chunks of timesteps as they are solved instead of "
+    "holding all of them in memory until the end of the simulation. Use this to keep memory "
+    "flat for long sub-hourly simulations.",
+)
+@click.option(
+    "--summary_only",
+    is_flag=True,
+    help="Flag to only write the summary of the results (results/summary.json and "
+    "results/summary.csv) and skip the CSV file of each building, line and transformer.",
+)
+@click.option(
+    "--sparse_violations",
+    is_flag=True,
+    help="Flag to leave the violation flag columns out of the CSV file of each building, "
+    "line and transformer. The violations are always logged as events in results/violations.csv.",
+)
+def run_opendss(  # noqa: PLR0912, PLR0915
     scenario_file,
     feature_file,
     equipment,
@@ -152,6 +282,24 @@ def run_opendss(  # noqa: PLR0912
     rnm,
     config,
     upgrade,
+    result_format,
+    workers,
+    engine,
+    screen_top_k,
+    screen_threshold,
+    profile_format,
+    write_kw_profiles,
+    deduplicate_profiles,
+    stream_geojson,
+    reuse_model,
+    skip_json,
+    no_catalog_cache,
+    partition_feeders,
+    checkpoint_interval,
+    resume,
+    stream_results,
+    summary_only,
+    sparse_violations,
 ):
     """Run OpenDSS on an URBANopt GeoJSON containing detailed electrical grid objects.
 
@@ -210,6 +358,60 @@ def run_opendss(  # noqa: PLR0912
         if equipment:
             config_dict["equipment_file"] = equipment
 
+        if result_format:
+            config_dict["result_format"] = result_format
+
+        if workers:
+            config_dict["workers"] = workers
+
+        if engine:
+            config_dict["engine"] = engine
+
+        if screen_top_k is not None:
+            config_dict["screen_top_k"] = screen_top_k
+
+        if screen_threshold is not None:
+            config_dict["screen_threshold"] = screen_threshold
+
+        if profile_format:
+            config_dict["profile_format"] = profile_format
+
+        if write_kw_profiles:
+            config_dict["write_kw_profiles"] = write_kw_profiles
+
+        if deduplicate_profiles:
+            config_dict["deduplicate_profiles"] = deduplicate_profiles
+
+        if stream_geojson:
+            config_dict["stream_geojson"] = stream_geojson
+
+        if reuse_model:
+            config_dict["reuse_model"] = reuse_model
+
+        if skip_json:
+            config_dict["export_json"] = False
+
+        if no_catalog_cache:
+            config_dict["cache_catalog"] = False
+
+        if partition_feeders:
+            config_dict["partition_feeders"] = partition_feeders
+
+        if checkpoint_interval is not None:
+            config_dict["checkpoint_interval"] = checkpoint_interval
+
+        if resume:
+            config_dict["resume"] = resume
+
+        if stream_results:
+            config_dict["stream_results"] = stream_results
+
+        if summary_only:
+            config_dict["summary_only"] = summary_only
+
+        if sparse_violations:
+            config_dict["sparse_violations"] = sparse_violations
+
         ditto = UrbanoptDittoReader(config_dict)
 
         # rnm has it's own run method, separate from run_urbanopt_geojson
@@ -226,3 +428,30 @@ def run_opendss(  # noqa: PLR0912
     else:
         print(f"\nDone. Results located in {config_dict['opendss_folder']}\n")
         sys.exit(0)
+
+
+@cli.command(short_help="Convert a results.npz file into per-element CSV result files.")
+@click.option(
+    "-r",
+    "--results_file",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, resolve_path=True),
+    required=True,
+    help="Path to a results.npz file written using --result_format npz",
+)
+@click.option(
+    "-o",
+    "--output_folder",
+    type=click.Path(file_okay=False, dir_okay=True, resolve_path=True),
+    default=None,
+    help="Path to the folder into which the Features, Lines and Transformers CSV folders "
+    "will be written. If unspecified, the folder containing the results file is used.",
+)
+def export_csv(results_file, output_folder):
+    """Convert a consolidated results.npz file into the per-element CSV result files.
+
+    \b
+    The CSV files have the same layout as those written by run-opendss when using
+    the default csv result format.
+    """
+    csv_paths = explode_results_npz(results_file, output_folder)
+    print(f"\nDone. {len(csv_paths)} result files written.\n")
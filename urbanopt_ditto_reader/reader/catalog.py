@@ -0,0 +1,239 @@
+"""
+*****************************************************************************************
+URBANopt™, Copyright (c) 2019-2022, Alliance for Sustainable Energy, LLC, and other
+contributors. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright notice, this list
+of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright notice, this
+list of conditions and the following disclaimer in the documentation and/or other
+materials provided with the distribution.
+
+Neither the name of the copyright holder nor the names of its contributors may be
+used to endorse or promote products derived from this software without specific
+prior written permission.
+
+Redistribution of this software, without modification, must refer to the software
+by the same designation. Redistribution of a modified version of this software
+(i) may not refer to the modified version by the same designation, or by any
+confusingly similar designation, and (ii) must refer to the underlying software
+originally provided by Alliance as “URBANopt”. Except to comply with the foregoing,
+the term “URBANopt”, or any confusingly similar designation may not be used to
+refer to any modified version of this software or any modified version of the
+underlying software originally provided by Alliance without the prior written
+consent of Alliance.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+*****************************************************************************************
+"""
+import hashlib
+import json
+import os
+import sys
+
+# cache of the catalogs that have been loaded in this process, keyed by absolute path
+_CATALOG_CACHE = {}
+
+
+class EquipmentCatalog:
+    """Index of the lines, transformers and wires of an equipment catalog.
+
+    The catalog JSON lists lines and transformers under zones (eg. Urban,
+    Interurban) and the same equipment name can appear in several zones. The
+    index maps each name to the first entry found for it, which is the entry that
+    was used when the zones were scanned in order.
+
+    Args:
+        equipment_data: Dictionary of the content of an equipment catalog JSON
+            file (eg. extended_catalog.json).
+
+    Properties:
+        * lines: Dictionary mapping line names to their catalog entries.
+        * transformers: Dictionary mapping transformer names to their catalog entries.
+        * wires: Dictionary mapping wire names (nameclass) to their catalog entries.
+    """
+
+    LINES_KEY = "LINES"
+    TRANSFORMERS_KEY = "SUBSTATIONS AND DISTRIBUTION TRANSFORMERS"
+    WIRES_KEY = "WIRES"
+    CACHE_VERSION = 2
+
+    def __init__(self, equipment_data):
+        self.lines = self._index_zones(equipment_data[self.LINES_KEY])
+        self.transformers = self._index_zones(equipment_data[self.TRANSFORMERS_KEY])
+        self.wires = {}
+        for wire in equipment_data[self.WIRES_KEY]["WIRES CATALOG"]:
+            self.wires[wire["nameclass"]] = wire
+
+    @classmethod
+    def from_index(cls, lines, transformers, wires):
+        """Create an EquipmentCatalog from dictionaries that have already been indexed.
+
+        Args:
+            lines: Dictionary mapping line names to their catalog entries.
+            transformers: Dictionary mapping transformer names to their catalog entries.
+            wires: Dictionary mapping wire names (nameclass) to their catalog entries.
+        """
+        catalog = cls.__new__(cls)
+        catalog.lines = lines
+        catalog.transformers = transformers
+        catalog.wires = wires
+        return catalog
+
+    @classmethod
+    def from_file(cls, equipment_file, use_cache=True):
+        """Get the EquipmentCatalog of an equipment catalog JSON file.
+
+        Catalogs are cached for the life of the process so that running several
+        simulations with the same catalog only parses and indexes it once. The
+        cached catalog is reloaded if the modification time or size of the file
+        changes.
+
+        Between processes, the index is cached in a JSON file that holds only
+        the lines, transformers and wires of the catalog. The cache is written
+        next to the catalog (as a hidden .<catalog name>.cache.json file) or, if
+        that folder is not writable, in the user cache folder. The cache is used
+        if it matches the modification time and size of the catalog file or,
+        failing that, the SHA-256 hash of its content.
+
+        Args:
+            equipment_file: Path to an equipment catalog JSON file.
+            use_cache: Boolean to note whether the cache file of the catalog should
+                be read and written. If False, the catalog is parsed from the JSON
+                file and nothing is written to disk. (Default: True).
+        """
+        catalog_path = os.path.abspath(equipment_file)
+        try:
+            file_stat = os.stat(catalog_path)
+        except FileNotFoundError:
+            raise SystemExit(f"ERROR: Datafile {equipment_file} could not be found.")
+        file_key = (file_stat.st_mtime_ns, file_stat.st_size)
+        if catalog_path in _CATALOG_CACHE and _CATALOG_CACHE[catalog_path][0] == file_key:
+            return _CATALOG_CACHE[catalog_path][1]
+
+        catalog = cls._read_cache(catalog_path, file_key) if use_cache else None
+        if catalog is None:
+            with open(catalog_path, "rb") as f:
+                content = f.read()
+            digest = hashlib.sha256(content).hexdigest()
+            catalog = cls._read_cache(catalog_path, file_key, digest) if use_cache else None
+            if catalog is None:
+                try:
+                    equipment_data = json.loads(content)
+                except (TypeError, ValueError):
+                    raise SystemExit(f"ERROR: Problem trying to read json from file {equipment_file}.")
+                catalog = cls(equipment_data)
+            if use_cache:
+                catalog._write_cache(catalog_path, file_key, digest)
+        _CATALOG_CACHE[catalog_path] = (file_key, catalog)
+        return catalog
+
+    @classmethod
+    def _read_cache(cls, catalog_path, file_key, digest=None):
+        """Get an EquipmentCatalog from a cache file of a catalog if the cache is valid.
+
+        Args:
+            catalog_path: Absolute path to the equipment catalog JSON file.
+            file_key: A tuple of the modification time (in ns) and size of the catalog file.
+            digest: An optional SHA-256 hex digest of the catalog file. If None,
+                the cache is valid if it matches file_key. Otherwise, it is valid
+                if it matches the digest. (Default: None).
+
+        Returns:
+            An EquipmentCatalog or None if no valid cache was found.
+        """
+        for cache_path in cls._cache_paths(catalog_path):
+            try:
+                with open(cache_path) as f:
+                    cache = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(cache, dict) or cache.get("version") != cls.CACHE_VERSION:
+                continue
+            if not all(isinstance(cache.get(key), dict) for key in ("lines", "transformers", "wires")):
+                continue
+            if (digest is None and cache.get("file_key") == list(file_key)) or (
+                digest is not None and cache.get("sha256") == digest
+            ):
+                return cls.from_index(cache["lines"], cache["transformers"], cache["wires"])
+        return None
+
+    def _write_cache(self, catalog_path, file_key, digest):
+        """Write this EquipmentCatalog into the cache file of a catalog.
+
+        The cache is written to the first of the cache locations that is writable.
+        Nothing is written if none of them are.
+
+        Args:
+            catalog_path: Absolute path to the equipment catalog JSON file.
+            file_key: A tuple of the modification time (in ns) and size of the catalog file.
+            digest: The SHA-256 hex digest of the catalog file.
+        """
+        cache = {
+            "version": self.CACHE_VERSION,
+            "file_key": list(file_key),
+            "sha256": digest,
+            "lines": self.lines,
+            "transformers": self.transformers,
+            "wires": self.wires,
+        }
+        for cache_path in self._cache_paths(catalog_path):
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                with open(temp_path, "w") as f:
+                    json.dump(cache, f)
+                os.replace(temp_path, cache_path)  # replace atomically for concurrent runs
+                return
+            except OSError:
+                if os.path.isfile(temp_path):
+                    os.remove(temp_path)
+
+    @staticmethod
+    def _cache_paths(catalog_path):
+        """Get a list of the paths where the cache of a catalog can be stored, in order of preference.
+
+        Args:
+            catalog_path: Absolute path to the equipment catalog JSON file.
+        """
+        catalog_folder, catalog_name = os.path.split(catalog_path)
+        if sys.platform == "win32" and "LOCALAPPDATA" in os.environ:
+            user_cache = os.environ["LOCALAPPDATA"]
+        else:
+            user_cache = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+        path_hash = hashlib.sha256(catalog_path.encode("utf-8")).hexdigest()[:16]
+        return [
+            os.path.join(catalog_folder, f".{catalog_name}.cache.json"),
+            os.path.join(user_cache, "urbanopt_ditto_reader", f"{catalog_name}.{path_hash}.cache.json"),
+        ]
+
+    @staticmethod
+    def _index_zones(zone_list):
+        """Get a dictionary mapping equipment names to the first catalog entry with that name.
+
+        Args:
+            zone_list: A list of dictionaries, each of which maps zone names to
+                lists of equipment entries. Entries that are not dictionaries
+                (eg. comments) are ignored.
+        """
+        index = {}
+        for all_zone in zone_list:
+            if not isinstance(all_zone, dict):
+                continue
+            for zone in all_zone:
+                for equipment in all_zone[zone]:
+                    index.setdefault(equipment["Name"], equipment)
+        return index
@@ -0,0 +1,184 @@
+"""
+*****************************************************************************************
+URBANopt™, Copyright (c) 2019-2022, Alliance for Sustainable Energy, LLC, and other
+contributors. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright notice, this list
+of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright notice, this
+list of conditions and the following disclaimer in the documentation and/or other
+materials provided with the distribution.
+
+Neither the name of the copyright holder nor the names of its contributors may be
+used to endorse or promote products derived from this software without specific
+prior written permission.
+
+Redistribution of this software, without modification, must refer to the software
+by the same designation. Redistribution of a modified version of this software
+(i) may not refer to the modified version by the same designation, or by any
+confusingly similar designation, and (ii) must refer to the underlying software
+originally provided by Alliance as “URBANopt”. Except to comply with the foregoing,
+the term “URBANopt”, or any confusingly similar designation may not be used to
+refer to any modified version of this software or any modified version of the
+underlying software originally provided by Alliance without the prior written
+consent of Alliance.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+*****************************************************************************************
+"""
+import json
+import re
+
+# whitespace that is allowed between JSON tokens
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# characters that can be part of a JSON number
+_NUMBER = re.compile(r"[-+0-9.eE]*")
+
+
+class _JsonStream:
+    """Reader of the values of a JSON text file, a few chunks of the file at a time.
+
+    Args:
+        file: A file object opened in text mode.
+        chunk_size: Number of characters to read from the file at a time.
+    """
+
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.at_end = False
+        self.decoder = json.JSONDecoder()
+
+    def _read_chunk(self):
+        """Append the next chunk of the file to the unread part of the buffer.
+
+        The chunk is at least as long as the unread buffer so that a value spanning
+        many chunks is decoded after a number of reads that is logarithmic in its size.
+
+        Returns:
+            True if anything was read. False if the end of the file was reached.
+        """
+        if self.at_end:
+            return False
+        chunk = self.file.read(max(self.chunk_size, len(self.buffer) - self.position))
+        if not chunk:
+            self.at_end = True
+            return False
+        self.buffer = self.buffer[self.position :] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        """Skip any whitespace and get the next character without consuming it.
+
+        Returns:
+            The next character or an empty string at the end of the file.
+        """
+        while True:
+            self.position = _WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._read_chunk():
+                return ""
+
+    def expect(self, characters):
+        """Consume the next character, which must be one of the input characters.
+
+        Args:
+            characters: Text of the characters that are allowed next (eg. ",]").
+
+        Returns:
+            The character that was consumed.
+        """
+        char = self.peek()
+        if char == "" or char not in characters:
+            raise json.JSONDecodeError(f"Expecting one of {characters!r}", self.buffer, self.position)
+        self.position += 1
+        return char
+
+    def value(self):
+        """Consume and decode the next JSON value."""
+        char = self.peek()
+        if char != "" and char in "-0123456789":
+            # a number is only complete once a character that cannot be part of it follows
+            while _NUMBER.match(self.buffer, self.position).end() == len(self.buffer) and self._read_chunk():
+                pass
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                self.position = end
+                return value
+            except json.JSONDecodeError:
+                if not self._read_chunk():
+                    raise
+
+
+def _slim_feature(feature):
+    """Get a copy of a GeoJSON feature with only the keys used by the reader.
+
+    The properties of the feature are kept along with its geometry if it is
+    a Point. Other geometries (eg. building footprint polygons) are dropped.
+    """
+    slim_feature = {}
+    if "properties" in feature:
+        slim_feature["properties"] = feature["properties"]
+    geometry = feature.get("geometry")
+    if isinstance(geometry, dict) and geometry.get("type") == "Point":
+        slim_feature["geometry"] = geometry
+    return slim_feature
+
+
+def iter_features(geojson_file, chunk_size=1048576):
+    """Iterate over the features of a GeoJSON file without loading the whole file.
+
+    The file is read in chunks and only one feature is decoded at a time. Each
+    feature is yielded with its properties and, for Point features (eg. electrical
+    junctions), its geometry. So the memory that is used is proportional to the
+    size of the properties rather than the size of the file.
+
+    Args:
+        geojson_file: Path to a GeoJSON file following the URBANopt schema.
+        chunk_size: Number of characters to read from the file at a time.
+            (Default: 1048576).
+
+    Raises:
+        json.JSONDecodeError: If the file is not a valid JSON object.
+    """
+    with open(geojson_file) as f:
+        stream = _JsonStream(f, chunk_size)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "features" and stream.peek() == "[":
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.expect("]")
+                else:
+                    while True:
+                        feature = stream.value()
+                        if isinstance(feature, dict):
+                            yield _slim_feature(feature)
+                        if stream.expect(",]") == "]":
+                            break
+            else:
+                stream.value()  # the other members (eg. project) are not used
+            if stream.expect(",}") == "}":
+                return
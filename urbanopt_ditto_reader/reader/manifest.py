@@ -0,0 +1,137 @@
+"""
+*****************************************************************************************
+URBANopt™, Copyright (c) 2019-2022, Alliance for Sustainable Energy, LLC, and other
+contributors. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright notice, this list
+of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright notice, this
+list of conditions and the following disclaimer in the documentation and/or other
+materials provided with the distribution.
+
+Neither the name of the copyright holder nor the names of its contributors may be
+used to endorse or promote products derived from this software without specific
+prior written permission.
+
+Redistribution of this software, without modification, must refer to the software
+by the same designation. Redistribution of a modified version of this software
+(i) may not refer to the modified version by the same designation, or by any
+confusingly similar designation, and (ii) must refer to the underlying software
+originally provided by Alliance as “URBANopt”. Except to comply with the foregoing,
+the term “URBANopt”, or any confusingly similar designation may not be used to
+refer to any modified version of this software or any modified version of the
+underlying software originally provided by Alliance without the prior written
+consent of Alliance.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+*****************************************************************************************
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+class ProfileManifest:
+    """Record of the profile files in a profiles folder and the inputs they were written from.
+
+    Each entry of the manifest describes one profile (eg. load_1) with the path
+    and modification time of the report it was read from, the column and
+    multiplier used to read it, the format in which it was written, a hash of its
+    data and the files that were written for it. A profile only needs to be
+    written again if any of these (other than the modification time) changed or
+    if any of its files are missing.
+
+    Args:
+        folder: Path to the profiles folder in which the manifest is stored.
+
+    Properties:
+        * folder
+        * manifest_path
+        * entries
+        * reused
+    """
+
+    FILE_NAME = "profile_manifest.json"
+    VERSION = 1
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.manifest_path = os.path.join(folder, self.FILE_NAME)
+        self.entries = {}
+        self.reused = 0
+        if os.path.isfile(self.manifest_path):
+            try:
+                with open(self.manifest_path) as f:
+                    manifest = json.load(f)
+                if manifest.get("version") == self.VERSION:
+                    self.entries = manifest["profiles"]
+            except (ValueError, KeyError, AttributeError):
+                self.entries = {}  # the manifest is invalid and all profiles are written
+
+    @staticmethod
+    def profile_entry(source, column, multiplier, profile_format, data, files):
+        """Get a dictionary describing a profile and the inputs it is written from.
+
+        Args:
+            source: Path to the report from which the profile was read.
+            column: Name of the column of the report that holds the profile.
+            multiplier: Number by which the values of the profile are scaled.
+            profile_format: The format in which the per-unit profile is written.
+            data: A list or array of the values of the profile in physical units.
+            files: A list of the names of the files written for the profile.
+        """
+        data_bytes = np.ascontiguousarray(data, dtype="<f8").tobytes()
+        return {
+            "source": os.path.abspath(source),
+            "source_mtime": os.path.getmtime(source),
+            "column": column,
+            "multiplier": multiplier,
+            "format": profile_format,
+            "sha256": hashlib.sha256(data_bytes).hexdigest(),
+            "files": sorted(files),
+        }
+
+    def is_current(self, profile_name, entry):
+        """Check whether the files of a profile were already written from the same inputs.
+
+        Args:
+            profile_name: Text for the name of the profile (eg. load_1).
+            entry: A dictionary from profile_entry describing the profile to be written.
+        """
+        if profile_name not in self.entries:
+            return False
+        recorded = self.entries[profile_name]
+        for key, value in entry.items():
+            if key != "source_mtime" and recorded.get(key) != value:
+                return False
+        return all(os.path.isfile(os.path.join(self.folder, f)) for f in entry["files"])
+
+    def update(self, profile_name, entry):
+        """Record the entry of a profile in the manifest.
+
+        Args:
+            profile_name: Text for the name of the profile (eg. load_1).
+            entry: A dictionary from profile_entry describing the profile.
+        """
+        self.entries[profile_name] = entry
+
+    def write(self):
+        """Write the manifest into the profiles folder."""
+        with open(self.manifest_path, "w") as f:
+            json.dump({"version": self.VERSION, "profiles": self.entries}, f, indent=2)
+        return self.manifest_path
@@ -39,10 +39,12 @@ OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISE
 OF THE POSSIBILITY OF SUCH DAMAGE.
 *****************************************************************************************
 """
+import hashlib
 import json
 import os
-from datetime import datetime
+from collections import deque
 
+import numpy as np
 from ditto.models.base import Unicode
 from ditto.models.feeder_metadata import Feeder_metadata
 from ditto.models.line import Line
@@ -60,6 +62,11 @@ from ditto.models.wire import Wire
 from ditto.network.network import Network
 from ditto.readers.abstract_reader import AbstractReader
 
+from urbanopt_ditto_reader.reader.catalog import EquipmentCatalog
+from urbanopt_ditto_reader.reader.geojson import iter_features
+from urbanopt_ditto_reader.reader.manifest import ProfileManifest
+from urbanopt_ditto_reader.timeline import Timeline
+
 
 class Reader(AbstractReader):
     """Object to translate URBANopt GeoJSON files and scenario results to OpenDSS.
@@ -79,6 +86,22 @@ class Reader(AbstractReader):
         relative_timeseries_location (str): Relative path to where the timeseries
             load profiles should be written in CSV format (relative to
             the timeseries_location).
+        profile_format (str): Format of the per-unit timeseries load profiles.
+            Choose from csv, sng (binary float32) or dbl (binary float64).
+            (Default: csv).
+        write_kw_profiles (bool): Boolean to note whether the timeseries load
+            profiles in physical units (eg. kW) should also be written as CSV
+            files alongside the per-unit profiles. (Default: True).
+        deduplicate_profiles (bool): Boolean to note whether identical per-unit
+            profiles should share a single file and OpenDSS loadshape.
+            (Default: False).
+        stream_geojson (bool): Boolean to note whether the GeoJSON should be read
+            one feature at a time, keeping only the feature properties and point
+            coordinates. This uses much less memory for GeoJSON files with
+            many building footprints. (Default: False).
+        cache_catalog (bool): Boolean to note whether the index of the equipment
+            file should be read from and written to a cache file so that later
+            runs do not need to parse the whole file again. (Default: True).
     """
 
     # register_names = ["geojson", "GeoJson"] # Deprecated Aug 21 by NM
@@ -93,7 +116,7 @@ class Reader(AbstractReader):
             raise ValueError("No geojson_file parameter provided")
         if "equipment_file" in kwargs:
             self.equipment_file = kwargs["equipment_file"]
-            self.equipment_data = None
+            self.catalog = None
         else:
             raise ValueError("No equipment_file parameter provided")
         if "load_folder" in kwargs:
@@ -108,6 +131,7 @@ class Reader(AbstractReader):
             print("Warning - using default urbanopt configuration")
 
         self.is_timeseries = False
+        self.timeline = None
         self.timeseries_location = None
         self.relative_timeseries_location = None
         if "is_timeseries" in kwargs:
@@ -116,6 +140,21 @@ class Reader(AbstractReader):
                 self.timeseries_location = kwargs["timeseries_location"]
             if "relative_timeseries_location" in kwargs:
                 self.relative_timeseries_location = kwargs["relative_timeseries_location"]
+        self.profile_format = "csv"
+        if "profile_format" in kwargs:
+            self.profile_format = kwargs["profile_format"]
+        self.write_kw_profiles = True
+        if "write_kw_profiles" in kwargs:
+            self.write_kw_profiles = kwargs["write_kw_profiles"]
+        self.deduplicate_profiles = False
+        if "deduplicate_profiles" in kwargs:
+            self.deduplicate_profiles = kwargs["deduplicate_profiles"]
+        self.stream_geojson = False
+        if "stream_geojson" in kwargs:
+            self.stream_geojson = kwargs["stream_geojson"]
+        self.cache_catalog = True
+        if "cache_catalog" in kwargs:
+            self.cache_catalog = kwargs["cache_catalog"]
 
     def get_json_data(self, filename):
         """Helper method to load the json data in a JSON file.
@@ -133,6 +172,23 @@ class Reader(AbstractReader):
             raise SystemExit(f"ERROR: Problem trying to read json from file {filename}.")
         return content
 
+    def stream_features(self, filename):
+        """Helper method to iterate over the features of a GeoJSON file without loading the whole file.
+
+        Args:
+            filename: Path to a GeoJSON file.
+
+        Returns:
+            A generator of the features of the GeoJSON with only their properties
+            and the geometry of Point features.
+        """
+        try:
+            yield from iter_features(filename)
+        except FileNotFoundError:
+            raise SystemExit(f"ERROR: Datafile {filename} could not be found.")
+        except ValueError:
+            raise SystemExit(f"ERROR: Problem trying to read json from file {filename}.")
+
     def parse(self, model, **kwargs):
         """Parse all of the data from the GeoJSON, Equipment, and load profile files.
 
@@ -148,13 +204,155 @@ class Reader(AbstractReader):
         Returns:
             An integer. 1 for success, -1 for failure.
         """
-        self.geojson_content = self.get_json_data(self.geojson_file)
-        self.equipment_data = self.get_json_data(self.equipment_file)
+        if self.stream_geojson:  # features are indexed as they are read
+            self.geojson_content = None
+            features = self.stream_features(self.geojson_file)
+        else:
+            self.geojson_content = self.get_json_data(self.geojson_file)
+            features = self.geojson_content["features"]
+        self.catalog = EquipmentCatalog.from_file(self.equipment_file, self.cache_catalog)
+        self._index_features(features)
+        self.upstream_transformers = None
+        self.timeline = None
+        self.timeline_mismatches = []
+        self.shared_profiles = {}
+        self.profile_aliases = {}
+        self.profile_manifest = None
+        if self.timeseries_location is not None:
+            self.profile_manifest = ProfileManifest(self.timeseries_location)
 
         # Call parse from abstract reader class
         super().parse(model, **kwargs)
+
+        # write the time axis shared by all of the profiles and the profile manifest
+        if self.timeline is not None and self.timeseries_location is not None:
+            self.timeline.write_csv(os.path.join(self.timeseries_location, "timestamps.csv"))
+            manifest_path = self.profile_manifest.write()
+            if self.profile_manifest.reused > 0:
+                print(
+                    f"Reused {self.profile_manifest.reused} unchanged profiles recorded in {manifest_path}",
+                    flush=True,
+                )
+            if self.deduplicate_profiles:
+                self._report_shared_profiles()
+        if len(self.timeline_mismatches) > 0:
+            print(
+                "Warning - the timestamps of the following profiles do not match those in timestamps.csv:\n{}".format(
+                    ",".join(self.timeline_mismatches)
+                ),
+                flush=True,
+            )
         return 1
 
+    def _report_shared_profiles(self):
+        """Report how many per-unit profiles were collapsed into shared loadshapes.
+
+        The profiles that use the file of another profile are written to a
+        shared_profiles.csv in the timeseries_location.
+        """
+        profile_count = len(self.shared_profiles) + len(self.profile_aliases)
+        print(
+            f"Collapsed {len(self.profile_aliases)} of {profile_count} per-unit profiles into "
+            f"{len(self.shared_profiles)} unique loadshapes",
+            flush=True,
+        )
+        shared_csv = os.path.join(self.timeseries_location, "shared_profiles.csv")
+        with open(shared_csv, "w") as csv_data_file:
+            csv_data_file.write("profile,shared profile file\n")
+            for profile_name, pu_file in self.profile_aliases.items():
+                csv_data_file.write(f"{profile_name},{pu_file}\n")
+        return shared_csv
+
+    def _check_timeline(self, profile_name, timestamps):
+        """Check the timestamps of a load profile against the timeline of the parsed profiles.
+
+        The first profile that is checked sets the timeline. The names of profiles
+        that do not match it are collected in the timeline_mismatches property so
+        that they can be reported together.
+
+        Args:
+            profile_name: Text for the name of the profile (eg. load_1).
+            timestamps: A list of the timestamps of the profile.
+
+        Returns:
+            The interval between the timestamps of the profile in hours.
+        """
+        if self.timeline is None:
+            self.timeline = Timeline(timestamps)
+        elif not self.timeline.matches(timestamps):
+            self.timeline_mismatches.append(profile_name)
+            return Timeline(timestamps).interval
+        return self.timeline.interval
+
+    def _index_features(self, features):
+        """Index the features of the GeoJSON in a single pass over them.
+
+        The sub-parsers use the following properties instead of scanning all of
+        the GeoJSON features again. Features that are not indexed are not kept.
+
+        Args:
+            features: An iterable of the features of the GeoJSON.
+
+        Properties:
+            * features_by_type: Dictionary of the features for each type.
+            * features_by_system_type: Dictionary of the features for each
+                district_system_type.
+            * ds_junctions: Dictionary of the IDs of the junctions on each district
+                system (DSId), in the order they appear in the GeoJSON.
+            * building_map: Dictionary mapping building IDs to electrical junction IDs.
+            * substations: Set of the IDs of junctions connected to a substation.
+        """
+        self.features_by_type = {}
+        self.features_by_system_type = {}
+        self.ds_junctions = {}
+        self.building_map = {}
+        for element in features:
+            if "properties" not in element:
+                continue
+            props = element["properties"]
+            if "type" in props:
+                self.features_by_type.setdefault(props["type"], []).append(element)
+                if props["type"] == "ElectricalJunction" and "buildingId" in props:
+                    self.building_map[props["buildingId"]] = props["id"]
+            if "district_system_type" in props:
+                self.features_by_system_type.setdefault(props["district_system_type"], []).append(element)
+            if "DSId" in props and "id" in props:
+                self.ds_junctions.setdefault(props["DSId"], []).append(props["id"])
+
+        # Assume one substation per feeder with a single junction
+        self.substations = set()
+        for element in self.features_by_system_type.get("Electrical Substation", []):
+            self.substations.update(self.ds_junctions.get(element["properties"]["id"], []))
+
+    def _get_upstream_transformers(self, model):
+        """Get a dictionary mapping each node of the network to its nearest upstream transformer.
+
+        The network is built from the source the first time this method is called
+        during a parse and all of its nodes are labeled in a single breadth-first
+        traversal. Nodes that are not downstream of any transformer are mapped to
+        None and nodes that are not connected to the source are not in the dictionary.
+
+        Args:
+            model (DiTTo model): A DiTTo model object assigned to the reader.
+        """
+        if self.upstream_transformers is None:
+            model.set_names()
+            network = Network()
+            network.build(model, source="source")
+            upstream = {"source": None}
+            queue = deque(["source"])
+            while queue:
+                node = queue.popleft()
+                for child in network.digraph.successors(node):
+                    edge = network.digraph[node][child]
+                    if edge.get("equipment") == "PowerTransformer":
+                        upstream[child] = edge["equipment_name"]
+                    else:
+                        upstream[child] = upstream[node]
+                    queue.append(child)
+            self.upstream_transformers = upstream
+        return self.upstream_transformers
+
     def parse_lines(self, model, **kwargs):
         """Parse the lines of the GeoJSON and equipment files.
 
@@ -164,62 +362,47 @@ class Reader(AbstractReader):
         Returns:
             An integer. 1 for success, -1 for failure.
         """
-        wire_map = {}
-        for wire in self.equipment_data["WIRES"]["WIRES CATALOG"]:
-            wire_map[wire["nameclass"]] = wire
+        wire_map = self.catalog.wires
 
         bad_lines = []
-        for element in self.geojson_content["features"]:
-            if (
-                "properties" in element
-                and "type" in element["properties"]
-                and element["properties"]["type"] == "ElectricalConnector"
-            ):
-                line = Line(model)
-                line.name = element["properties"]["id"]
-                if element["properties"]["startJunctionId"] in self.substations:
-                    line.from_element = "source"
-                else:
-                    line.from_element = element["properties"]["startJunctionId"]
-                if element["properties"]["endJunctionId"] in self.substations:
-                    line.to_element = "source"
-                else:
-                    line.to_element = element["properties"]["endJunctionId"]
-                line.length = element["properties"]["total_length"] * 0.3048  # ft to m
-                all_wires = []
-                if "electrical_catalog_name" in element["properties"]:
-                    catalog_name = element["properties"]["electrical_catalog_name"]
-                    found_line = False
-                    for all_zone in self.equipment_data["LINES"]:  # Look in all zones.
-                        if not isinstance(all_zone, dict):
-                            continue
-                        for zone in all_zone:  # TODO: consider using a single zone?
-                            for db_line in all_zone[zone]:
-                                if found_line:
-                                    break
-                                if catalog_name == db_line["Name"]:
-                                    found_line = True
-                                    for db_wire in db_line["Line geometry"]:
-                                        wire = Wire(model)
-                                        wire_type = db_wire["wire"]
-                                        wire.nameclass = wire_type.replace(" ", "_").replace("/", "-")
-                                        wire.phase = db_wire["phase"]
-                                        wire.X = db_wire["x (m)"]
-                                        wire.Y = db_wire["height (m)"]
-                                        self._assign_wire_properties(wire, wire_map[wire_type])
-                                        if "OH" in wire_map[wire_type]["type"]:
-                                            line.line_type = "overhead"
-                                        elif "UG" in wire_map[wire_type]["type"]:
-                                            line.line_type = "underground"
-
-                                        all_wires.append(wire)
-                    if not found_line:
-                        raise ValueError(
-                            "No line found in catalog for {}".format(element["properties"]["electrical_catalog_name"])
-                        )
-                else:
-                    bad_lines.append(line.name)
-                line.wires = all_wires
+        for element in self.features_by_type.get("ElectricalConnector", []):
+            line = Line(model)
+            line.name = element["properties"]["id"]
+            if element["properties"]["startJunctionId"] in self.substations:
+                line.from_element = "source"
+            else:
+                line.from_element = element["properties"]["startJunctionId"]
+            if element["properties"]["endJunctionId"] in self.substations:
+                line.to_element = "source"
+            else:
+                line.to_element = element["properties"]["endJunctionId"]
+            line.length = element["properties"]["total_length"] * 0.3048  # ft to m
+            all_wires = []
+            if "electrical_catalog_name" in element["properties"]:
+                catalog_name = element["properties"]["electrical_catalog_name"]
+                # the catalog index holds the first line with this name in all zones
+                if catalog_name not in self.catalog.lines:
+                    raise ValueError(
+                        "No line found in catalog for {}".format(element["properties"]["electrical_catalog_name"])
+                    )
+                db_line = self.catalog.lines[catalog_name]
+                for db_wire in db_line["Line geometry"]:
+                    wire = Wire(model)
+                    wire_type = db_wire["wire"]
+                    wire.nameclass = wire_type.replace(" ", "_").replace("/", "-")
+                    wire.phase = db_wire["phase"]
+                    wire.X = db_wire["x (m)"]
+                    wire.Y = db_wire["height (m)"]
+                    self._assign_wire_properties(wire, wire_map[wire_type])
+                    if "OH" in wire_map[wire_type]["type"]:
+                        line.line_type = "overhead"
+                    elif "UG" in wire_map[wire_type]["type"]:
+                        line.line_type = "underground"
+
+                    all_wires.append(wire)
+            else:
+                bad_lines.append(line.name)
+            line.wires = all_wires
 
         if len(bad_lines) > 0:
             print("Following lines are missing wires:")
@@ -255,54 +438,31 @@ class Reader(AbstractReader):
         Returns:
             An integer. 1 for success, -1 for failure.
         """
-        # Assume one substation per feeder with a single junction
-        substation_map = {}
-        self.substations = set()
-
-        for element in self.geojson_content["features"]:
-            if "properties" in element and "DSId" in element["properties"] and "id" in element["properties"]:
-                e_ds_id = element["properties"]["DSId"]
-                if e_ds_id in substation_map:
-                    substation_map[e_ds_id].append(element["properties"]["id"])
-                else:
-                    substation_map[e_ds_id] = [element["properties"]["id"]]
-
-        for element in self.geojson_content["features"]:
-            if "properties" in element and "district_system_type" in element["properties"]:
-                sys_type = element["properties"]["district_system_type"]
-                if sys_type == "Electrical Substation" and element["properties"]["id"] in substation_map:
-                    for i in substation_map[element["properties"]["id"]]:
-                        self.substations.add(i)
-
+        # the substation junctions are collected when the features are indexed
         if len(self.substations) > 1:
             print("Warning - multiple power sources have been added")
-        for element in self.geojson_content["features"]:
-            if (
-                "properties" in element
-                and "type" in element["properties"]
-                and element["properties"]["type"] == "ElectricalJunction"
-            ):
-                node = Node(model)
-                node.name = element["properties"]["id"]
-                if node.name in self.substations:
-                    node.nominal_voltage = 13200  # placeholder voltage
-                    node.is_substation_connection = True
-                    node.setpoint = 1.0
-                    node.name = "source"
-                    meta = Feeder_metadata(model)
-                    meta.headnode = "source"
-                    meta.nominal_voltage = 13200  # placeholder voltage
-                    meta.name = "urbanopt-feeder"
-                    powersource = PowerSource(model)
-                    powersource.is_sourcebus = True
-                    powersource.name = "ps_source"
-                    powersource.nominal_voltage = 13200
-                    powersource.connecting_element = "source"
-                    powersource.per_unit = 1.0
-                position = Position(model)
-                position.lat = float(element["geometry"]["coordinates"][1])
-                position.long = float(element["geometry"]["coordinates"][0])
-                node.positions = [position]
+        for element in self.features_by_type.get("ElectricalJunction", []):
+            node = Node(model)
+            node.name = element["properties"]["id"]
+            if node.name in self.substations:
+                node.nominal_voltage = 13200  # placeholder voltage
+                node.is_substation_connection = True
+                node.setpoint = 1.0
+                node.name = "source"
+                meta = Feeder_metadata(model)
+                meta.headnode = "source"
+                meta.nominal_voltage = 13200  # placeholder voltage
+                meta.name = "urbanopt-feeder"
+                powersource = PowerSource(model)
+                powersource.is_sourcebus = True
+                powersource.name = "ps_source"
+                powersource.nominal_voltage = 13200
+                powersource.connecting_element = "source"
+                powersource.per_unit = 1.0
+            position = Position(model)
+            position.lat = float(element["geometry"]["coordinates"][1])
+            position.long = float(element["geometry"]["coordinates"][0])
+            node.positions = [position]
 
         return 1
 
@@ -316,54 +476,34 @@ class Reader(AbstractReader):
             An integer. 1 for success, -1 for failure.
         """
         # Assume that each transformer has one from node and one to node.
-        transformer_panel_map = {}
-        for element in self.geojson_content["features"]:
-            if "properties" in element and "DSId" in element["properties"] and "id" in element["properties"]:
-                e_id = element["properties"]["id"]
-                if element["properties"]["DSId"] in transformer_panel_map:
-                    transformer_panel_map[element["properties"]["DSId"]].append(e_id)
-                else:
-                    transformer_panel_map[element["properties"]["DSId"]] = [e_id]
+        transformer_panel_map = self.ds_junctions
 
         source_voltages = set()
-        for element in self.geojson_content["features"]:
-            if (
-                "properties" in element
-                and "district_system_type" in element["properties"]
-                and element["properties"]["district_system_type"] == "Transformer"
-            ):
-                tr_id = element["properties"]["id"]
-                transformer = PowerTransformer(model)
-                if tr_id in transformer_panel_map:
-                    if len(transformer_panel_map[tr_id]) < 2:
-                        print(f"No from and to elements found for transformer {tr_id}")
-                    if len(transformer_panel_map[tr_id]) > 2:
-                        print(
-                            f"Warning - the transformer {tr_id} should have a from and to "
-                            f"element - {len(transformer_panel_map[tr_id])} junctions on the transformer"
-                        )
-                    if len(transformer_panel_map[tr_id]) >= 2:
-                        found_transformer = False
-                        trans_cat_key = "SUBSTATIONS AND DISTRIBUTION TRANSFORMERS"
-                        catalog_name = element["properties"]["electrical_catalog_name"]
-                        for all_zone in self.equipment_data[trans_cat_key]:
-                            # TODO: Figure out why there duplicate zones
-                            for zone in all_zone:
-                                for db_transformer in all_zone[zone]:
-                                    if found_transformer:
-                                        break
-                                    if catalog_name == db_transformer["Name"]:
-                                        found_transformer = True
-                                        # NOTE: direction can be wrong
-                                        # Will be fixed in the consistency module
-                                        transformer.from_element = transformer_panel_map[tr_id][0]
-                                        transformer.to_element = transformer_panel_map[tr_id][1]
-                                        transformer.name = tr_id
-                                        self._assign_transformer_properties(transformer, db_transformer, element, model)
-                                        nv = db_transformer["Primary Voltage (kV)"]
-                                        source_voltages.add(float(nv) * 1000)
-                        if not found_transformer:
-                            raise ValueError(f"No transformer found in catalog for {catalog_name}")
+        for element in self.features_by_system_type.get("Transformer", []):
+            tr_id = element["properties"]["id"]
+            transformer = PowerTransformer(model)
+            if tr_id in transformer_panel_map:
+                if len(transformer_panel_map[tr_id]) < 2:
+                    print(f"No from and to elements found for transformer {tr_id}")
+                if len(transformer_panel_map[tr_id]) > 2:
+                    print(
+                        f"Warning - the transformer {tr_id} should have a from and to "
+                        f"element - {len(transformer_panel_map[tr_id])} junctions on the transformer"
+                    )
+                if len(transformer_panel_map[tr_id]) >= 2:
+                    catalog_name = element["properties"]["electrical_catalog_name"]
+                    # the catalog index holds the first transformer with this name in all zones
+                    if catalog_name not in self.catalog.transformers:
+                        raise ValueError(f"No transformer found in catalog for {catalog_name}")
+                    db_transformer = self.catalog.transformers[catalog_name]
+                    # NOTE: direction can be wrong
+                    # Will be fixed in the consistency module
+                    transformer.from_element = transformer_panel_map[tr_id][0]
+                    transformer.to_element = transformer_panel_map[tr_id][1]
+                    transformer.name = tr_id
+                    self._assign_transformer_properties(transformer, db_transformer, element, model)
+                    nv = db_transformer["Primary Voltage (kV)"]
+                    source_voltages.add(float(nv) * 1000)
 
         # Note that the source voltage is set to be the highest side of the transformer
         if len(source_voltages) == 1:
@@ -474,13 +614,11 @@ class Reader(AbstractReader):
             An integer. 1 for success, -1 for failure.
         """
         # set up the model and network
-        model.set_names()
-        network = Network()
-        network.build(model, source="source")
+        upstream_transformers = self._get_upstream_transformers(model)
 
         # get building elements and a map from buildings to the electrical junctions
-        building_map = self.create_building_map(self.geojson_content)
-        bldg_elements = self.collect_building_elements(self.geojson_content)
+        building_map = self.building_map
+        bldg_elements = self.features_by_type.get("Building", [])
 
         # loop through the buildings and parse their load profiles
         disconnected_loads = []
@@ -496,10 +634,9 @@ class Reader(AbstractReader):
             load.name = id_value
             load.connecting_element = connecting_element
             upstream_transformer_name = None
-            try:
-                upstream_transformer_name = network.get_upstream_transformer(model, connecting_element)
-            # FIXME: What exception should be caught here?
-            except Exception:  # caused by elements not being connected # noqa: BLE001
+            if connecting_element in upstream_transformers:
+                upstream_transformer_name = upstream_transformers[connecting_element]
+            else:  # the element is not connected to the source
                 disconnected_loads.append(element["properties"]["id"])
             if upstream_transformer_name is not None:
                 upstream_transformer = model[upstream_transformer_name]
@@ -510,32 +647,11 @@ class Reader(AbstractReader):
                 load.nominal_voltage = model["urbanopt-feeder"].nominal_voltage
 
             # load the power draw of the buildings from the energy sim results
-            load_path = os.path.join(self.load_folder, id_value, "feature_reports")
-            load_multiplier = 1000
-            if os.path.exists(load_path):  # We've found the load data
-                if self.use_reopt:
-                    rep_csv = os.path.join(load_path, "feature_optimization.csv")
-                    report_mtx = self._read_csv(rep_csv)
-                    header_row = report_mtx.pop(0)
-                    load_col_i = header_row.index("REopt:Electricity:Load:Total(kw)")
-                    load_column = [row[load_col_i] for row in report_mtx]
-                else:
-                    rep_csv = os.path.join(load_path, "default_feature_report.csv")
-                    report_mtx = self._read_csv(rep_csv)
-                    header_row = report_mtx.pop(0)
-                    try:
-                        load_col_i = header_row.index("Net Power(kW)")
-                    except ValueError:  # column has a different name
-                        try:
-                            load_col_i = header_row.index("Net Power(W)")
-                            load_multiplier = 1
-                        except ValueError:  # no load data was found
-                            raise ValueError(
-                                'Neither of the columns "Net Power(W)" or "Net Power'
-                                '(kW)" were found in default_feature_report.csv'
-                            )
-                load_column = [float(row[load_col_i]) for row in report_mtx]
-                max_load = max(load_column)
+            # (reports are read one at a time since a process pool reading batches of them was not faster)
+            load_report = self._read_load_report(id_value)
+            if load_report is not None:  # We've found the load data
+                timestamps, load_column, load_multiplier, rep_csv, load_col = load_report
+                max_load = float(load_column.max())
 
                 # get the phases of the load profile from the transformer
                 phases = []
@@ -560,31 +676,23 @@ class Reader(AbstractReader):
 
                 # assign the timeseries load profile
                 if self.is_timeseries:
-                    data = load_column
-                    data_pu = [d / max_load for d in data]
-                    ts_i = header_row.index("Datetime")
-                    timestamps = [row[ts_i] for row in report_mtx]
-                    dt_format = "%Y/%m/%d %H:%M:%S"
-                    delta = (
-                        datetime.strptime(timestamps[1], dt_format).astimezone()
-                        - datetime.strptime(timestamps[0], dt_format).astimezone()
-                    )
+                    data = load_column.tolist()
+                    data_pu = (load_column / max_load).tolist()
+                    if timestamps is None:
+                        raise ValueError(f'No "Datetime" column was found in the feature report of {id_value}')
+                    interval = self._check_timeline(f"load_{id_value}", timestamps)
                     ts_loc = self.timeseries_location
                     if ts_loc is not None:
                         if not os.path.exists(ts_loc):
                             os.makedirs(ts_loc)
-                        load_path = os.path.join(ts_loc, f"load_{id_value}.csv")
-                        pu_path = os.path.join(ts_loc, f"load_{id_value}_pu.csv")
-                        ts_path = os.path.join(ts_loc, "timestamps.csv")
-                        self._write_single_column_csv(data, load_path)
-                        self._write_single_column_csv(data_pu, pu_path)
-                        self._write_single_column_csv(timestamps, ts_path, "Datetime")
+                        rel_pu_path = self._write_profile(
+                            f"load_{id_value}", data, data_pu, rep_csv, load_col, load_multiplier
+                        )
                         timeseries = Timeseries(model)
                         timeseries.feeder_name = load.feeder_name
                         timeseries.substation_name = load.substation_name
-                        timeseries.interval = delta.seconds / 3600.0
+                        timeseries.interval = interval
                         timeseries.data_type = "float"
-                        rel_pu_path = os.path.join(self.relative_timeseries_location, f"load_{id_value}_pu.csv")
                         timeseries.data_location = rel_pu_path
                         timeseries.data_label = f"feature_{id_value}"
                         timeseries.scale_factor = 1
@@ -597,6 +705,107 @@ class Reader(AbstractReader):
             print("The following loads have connection problems:\n{}".format(",".join(disconnected_loads)))
         return 1
 
+    def _write_profile(self, profile_name, data, data_pu, source, column, multiplier):
+        """Write a timeseries profile into the timeseries_location.
+
+        The per-unit profile is written in the profile_format of the reader and the
+        profile in physical units is written as a CSV if write_kw_profiles is True.
+        Nothing is written if the profile manifest shows that the files of the
+        profile were already written from the same inputs. If deduplicate_profiles
+        is True and the per-unit profile is identical to one that was already
+        written, the file of that profile is used instead of writing a new one.
+
+        Args:
+            profile_name: Text for the name of the profile files (eg. load_1).
+            data: A list of the values of the profile in physical units.
+            data_pu: A list of the per-unit values of the profile.
+            source: Path to the report from which the profile was read.
+            column: Name of the column of the report that holds the profile.
+            multiplier: Number by which the profile was scaled (eg. to W or to per-unit).
+
+        Returns:
+            The path to the per-unit profile relative to the OpenDSS files.
+        """
+        ts_loc = self.timeseries_location
+        pu_file = f"{profile_name}_pu.{self.profile_format}"
+        files = [pu_file]
+        if self.deduplicate_profiles and profile_name not in self.timeline_mismatches:
+            pu_bytes = np.ascontiguousarray(data_pu, dtype="<f8").tobytes()
+            pu_hash = hashlib.sha256(pu_bytes).hexdigest()
+            if pu_hash in self.shared_profiles:  # use the file of the identical profile
+                pu_file = self.shared_profiles[pu_hash]
+                self.profile_aliases[profile_name] = pu_file
+                files = []
+            else:
+                self.shared_profiles[pu_hash] = pu_file
+        if self.write_kw_profiles:
+            files.append(f"{profile_name}.csv")
+        entry = self.profile_manifest.profile_entry(source, column, multiplier, self.profile_format, data, files)
+        if self.profile_manifest.is_current(profile_name, entry):
+            self.profile_manifest.reused += 1
+            return os.path.join(self.relative_timeseries_location, pu_file)
+
+        if self.write_kw_profiles:
+            self._write_single_column_csv(data, os.path.join(ts_loc, f"{profile_name}.csv"))
+        if profile_name in self.profile_aliases:
+            pass  # the per-unit profile is shared with another profile
+        elif self.profile_format == "sng":
+            np.asarray(data_pu, dtype="<f4").tofile(os.path.join(ts_loc, pu_file))
+        elif self.profile_format == "dbl":
+            np.asarray(data_pu, dtype="<f8").tofile(os.path.join(ts_loc, pu_file))
+        else:
+            self._write_single_column_csv(data_pu, os.path.join(ts_loc, pu_file))
+        self.profile_manifest.update(profile_name, entry)
+        return os.path.join(self.relative_timeseries_location, pu_file)
+
+    def _read_load_report(self, building_id):
+        """Read the load profile of a building from its feature report CSV.
+
+        Only the Datetime and power columns of the CSV are read.
+
+        Args:
+            building_id: The ID of the building to be read.
+
+        Returns:
+            None if the building has no feature_reports folder. Otherwise, a tuple
+            with five elements.
+
+            -   timestamps: A list of the timestamps of the load profile. None if
+                the report has no Datetime column.
+
+            -   load_column: A NumPy array of the load profile.
+
+            -   load_multiplier: Number to convert the load profile into W.
+
+            -   rep_csv: Path to the report CSV from which the profile was read.
+
+            -   load_col: Name of the column of the report CSV with the profile.
+        """
+        load_path = os.path.join(self.load_folder, building_id, "feature_reports")
+        if not os.path.exists(load_path):
+            return None
+        if self.use_reopt:
+            rep_csv = os.path.join(load_path, "feature_optimization.csv")
+            load_col = "REopt:Electricity:Load:Total(kw)"
+            columns = self._read_csv_columns(rep_csv, ("Datetime", load_col))
+            if load_col not in columns:
+                raise ValueError(f'The column "{load_col}" was not found in {rep_csv}')
+            load_multiplier = 1000
+        else:
+            rep_csv = os.path.join(load_path, "default_feature_report.csv")
+            columns = self._read_csv_columns(rep_csv, ("Datetime", "Net Power(kW)", "Net Power(W)"))
+            if "Net Power(kW)" in columns:
+                load_col, load_multiplier = "Net Power(kW)", 1000
+            elif "Net Power(W)" in columns:  # column has a different name
+                load_col, load_multiplier = "Net Power(W)", 1
+            else:  # no load data was found
+                raise ValueError(
+                    'Neither of the columns "Net Power(W)" or "Net Power'
+                    '(kW)" were found in default_feature_report.csv'
+                )
+        load_column = np.fromiter(map(float, columns[load_col]), dtype=float, count=len(columns[load_col]))
+        return columns.get("Datetime"), load_column, load_multiplier, rep_csv, load_col
+
     def parse_dg(self, model, **kwargs):
         """Parse the load profiles from the PV results from REopt.
 
@@ -609,13 +818,11 @@ class Reader(AbstractReader):
         # set up the model and network
         if not self.use_reopt:
             return 1
-        model.set_names()
-        network = Network()
-        network.build(model, source="source")
+        upstream_transformers = self._get_upstream_transformers(model)
 
         # get building elements and a map from buildings to the electrical junctions
-        building_map = self.create_building_map(self.geojson_content)
-        bldg_elements = self.collect_building_elements(self.geojson_content)
+        building_map = self.building_map
+        bldg_elements = self.features_by_type.get("Building", [])
 
         # loop through the buildings and parse any of their generated PV electricity
         for element in bldg_elements:
@@ -636,12 +843,12 @@ class Reader(AbstractReader):
             pv_kw = feature_data["distributed_generation"]["total_solar_pv_kw"]
 
             # determine the nominal voltage from the upstream transformer
-            upstream_transformer_name = network.get_upstream_transformer(model, connecting_element)
+            upstream_transformer_name = upstream_transformers.get(connecting_element)
             if upstream_transformer_name is not None:
                 upstream_transformer = model[upstream_transformer_name]
                 is_center_tap = upstream_transformer.is_center_tap
             else:
-                print(f"Warning - DG {upstream_transformer_name} is incorrectly connected", flush=True)
+                print(f"Warning - DG solar_{id_value} is incorrectly connected", flush=True)
 
             # if there is PV on the building, create an OpenDSS object for it
             if pv_kw > 0:
@@ -666,30 +873,23 @@ class Reader(AbstractReader):
                     ts_csv = os.path.join(re_folder, "feature_optimization.csv")
                     report_mtx = self._read_csv(ts_csv)
                     header_row = report_mtx.pop(0)
-                    load_i = header_row.index("REopt:ElectricityProduced:PV:Total(kw)")
+                    pv_col = "REopt:ElectricityProduced:PV:Total(kw)"
+                    load_i = header_row.index(pv_col)
                     load_data = [float(row[load_i]) for row in report_mtx]
                     ts_i = header_row.index("Datetime")
                     timestamps = [row[ts_i] for row in report_mtx]
-                    dt_format = "%Y/%m/%d %H:%M:%S"
-                    delta = (
-                        datetime.strptime(timestamps[1], dt_format).astimezone()
-                        - datetime.strptime(timestamps[0], dt_format).astimezone()
-                    )
+                    interval = self._check_timeline(f"pv_{id_value}", timestamps)
                     data_pu = [d / pv_kw for d in load_data]
                     ts_loc = self.timeseries_location
                     if ts_loc is not None:
                         if not os.path.exists(ts_loc):
                             os.makedirs(ts_loc)
-                        load_path = os.path.join(ts_loc, f"pv_{id_value}.csv")
-                        pu_path = os.path.join(ts_loc, f"pv_{id_value}_pu.csv")
-                        self._write_single_column_csv(load_data, load_path)
-                        self._write_single_column_csv(data_pu, pu_path)
+                        rel_pu_path = self._write_profile(f"pv_{id_value}", load_data, data_pu, ts_csv, pv_col, pv_kw)
                         timeseries = Timeseries(model)
                         timeseries.feeder_name = pv.feeder_name
                         timeseries.substation_name = pv.substation_name
-                        timeseries.interval = delta.seconds / 3600.0
+                        timeseries.interval = interval
                         timeseries.data_type = "float"
-                        rel_pu_path = os.path.join(self.relative_timeseries_location, f"pv_{id_value}_pu.csv")
                         timeseries.data_location = rel_pu_path
                         timeseries.data_label = f"pv_feature_{id_value}"
                         timeseries.scale_factor = 1
@@ -737,6 +937,30 @@ class Reader(AbstractReader):
                 mtx.append(row.split(","))
         return mtx
 
+    @staticmethod
+    def _read_csv_columns(csv_file_path, column_names):
+        """Load selected columns of a CSV file with a header row into lists of strings.
+
+        Each row is only split as far as the last of the requested columns.
+
+        Args:
+            csv_file_path: Full path to a valid CSV file.
+            column_names: A list of the names of the columns to be loaded.
+
+        Returns:
+            A dictionary mapping the names of the requested columns that are in the
+            header of the CSV to lists of their values. Requested columns that are
+            not in the header are excluded.
+        """
+        with open(csv_file_path) as csv_data_file:
+            header_row = csv_data_file.readline().rstrip("\r\n").split(",")
+            col_indices = {name: header_row.index(name) for name in column_names if name in header_row}
+            if len(col_indices) == 0:
+                return {}
+            max_split = max(col_indices.values()) + 1
+            rows = [row.split(",", max_split) for row in csv_data_file]
+        return {name: [row[i] for row in rows] for name, i in col_indices.items()}
+
     @staticmethod
     def _write_single_column_csv(value_list, csv_file_path, header=None):
         """Write a Python list into a single-columns CSV file.
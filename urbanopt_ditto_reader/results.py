@@ -0,0 +1,684 @@
+"""
+*****************************************************************************************
+URBANopt™, Copyright (c) 2019-2022, Alliance for Sustainable Energy, LLC, and other
+contributors. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright notice, this list
+of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright notice, this
+list of conditions and the following disclaimer in the documentation and/or other
+materials provided with the distribution.
+
+Neither the name of the copyright holder nor the names of its contributors may be
+used to endorse or promote products derived from this software without specific
+prior written permission.
+
+Redistribution of this software, without modification, must refer to the software
+by the same designation. Redistribution of a modified version of this software
+(i) may not refer to the modified version by the same designation, or by any
+confusingly similar designation, and (ii) must refer to the underlying software
+originally provided by Alliance as “URBANopt”. Except to comply with the foregoing,
+the term “URBANopt”, or any confusingly similar designation may not be used to
+refer to any modified version of this software or any modified version of the
+underlying software originally provided by Alliance without the prior written
+consent of Alliance.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+*****************************************************************************************
+"""
+
+import json
+import os
+
+import numpy as np
+
+
+class ResultStore:
+    """A store of time series results for a set of OpenDSS elements.
+
+    Results are held in preallocated NumPy arrays with one row for each element
+    and one column for each timestep. Values are stored as float32 after rounding
+    to 5 decimal places and each violation flag is stored as a bit-packed array.
+
+    Args:
+        element_names: A list of the names of the elements to be stored.
+        timestamps: A list of the timestamps (as strings) of the timesteps to be stored.
+        value_label: Text for the header of the value column (eg. "p.u. voltage").
+        flag_labels: A list of text for the headers of the violation flag columns
+            (eg. ["overvoltage", "undervoltage"]).
+        file_names: An optional list of file names (without extension) to be used
+            when writing a CSV for each element. If None, the element names will
+            be used. (Default: None).
+
+    Properties:
+        * element_names
+        * timestamps
+        * value_label
+        * flag_labels
+        * file_names
+        * values
+        * flags
+        * nbytes
+    """
+
+    def __init__(self, element_names, timestamps, value_label, flag_labels, file_names=None):
+        self.element_names = list(element_names)
+        self.timestamps = list(timestamps)
+        self.value_label = value_label
+        self.flag_labels = list(flag_labels)
+        self.file_names = self.element_names if file_names is None else list(file_names)
+
+        element_count, step_count = len(self.element_names), len(self.timestamps)
+        self.values = np.zeros((element_count, step_count), dtype=np.float32)
+        self.flags = np.zeros((len(self.flag_labels), element_count, (step_count + 7) // 8), dtype=np.uint8)
+
+    @property
+    def nbytes(self):
+        """Get the number of bytes used by the result arrays."""
+        return self.values.nbytes + self.flags.nbytes
+
+    def record(self, step, values, flags):
+        """Record the results of all elements for a timestep.
+
+        Args:
+            step: The index of the timestep in the timestamps of this store.
+            values: An array with a value for each element.
+            flags: A list with a boolean array for each flag label.
+        """
+        self.values[:, step] = np.round(values, 5)
+        bit = np.uint8(1 << (7 - step % 8))
+        for flag_array, flag_values in zip(self.flags, flags):
+            flag_array[np.asarray(flag_values, dtype=bool), step // 8] |= bit
+
+    def element_flags(self, element_index):
+        """Get a boolean array of the flags of an element with one row for each flag label.
+
+        Args:
+            element_index: The index of the element in the element_names of this store.
+        """
+        return np.unpackbits(self.flags[:, element_index], axis=1, count=len(self.timestamps)).astype(bool)
+
+    def write_csvs(self, folder, include_flags=True):
+        """Write a CSV file for each element in this store.
+
+        Args:
+            folder: Path to the folder into which the CSV files will be written.
+            include_flags: Boolean to note whether the CSV files should have a
+                column for each violation flag. (Default: True).
+
+        Returns:
+            A list of paths to the CSV files that were written.
+        """
+        os.makedirs(folder, exist_ok=True)
+        csv_paths = []
+        for i, file_name in enumerate(self.file_names):
+            csv_path = os.path.join(folder, f"{file_name}.csv")
+            flags = self.element_flags(i) if include_flags else []
+            with open(csv_path, "w") as csv_data_file:
+                csv_data_file.write(self.csv_header(include_flags))
+                csv_data_file.write(self.csv_rows(self.timestamps, self.values[i], flags))
+            csv_paths.append(csv_path)
+        return csv_paths
+
+    def summary(self, block_size=8192):
+        """Get a ResultSummary of all of the timesteps in this store.
+
+        Args:
+            block_size: The number of timesteps that are added to the summary at
+                a time, which limits the memory used to unpack the flags. This
+                must be a multiple of 8. (Default: 8192).
+        """
+        result_summary = ResultSummary(self.element_names, self.value_label, self.flag_labels, self.file_names)
+        for start in range(0, len(self.timestamps), block_size):
+            end = min(start + block_size, len(self.timestamps))
+            block_flags = self.flags[:, :, start // 8 : (end + 7) // 8]
+            result_summary.update(self.timestamps[start:end], self.values[:, start:end], block_flags)
+        return result_summary
+
+    def csv_header(self, include_flags=True):
+        """Get the header line of the CSV file of each element.
+
+        Args:
+            include_flags: Boolean to note whether the header should include the
+                violation flag columns. (Default: True).
+        """
+        flag_labels = self.flag_labels if include_flags else []
+        return ",".join(["Datetime", self.value_label, *flag_labels]) + "\n"
+
+    @staticmethod
+    def csv_rows(timestamps, values, flags):
+        """Get the lines of the CSV file of an element for several timesteps.
+
+        Args:
+            timestamps: A list of the timestamps of the timesteps.
+            values: An array of the value of the element at each timestep.
+            flags: A boolean array with one row for each flag label and one column
+                for each timestep. This can be empty to write no flag columns.
+        """
+        columns = [timestamps, [round(v, 5) for v in values.tolist()]]
+        columns.extend(flag.tolist() for flag in flags)
+        return "".join(",".join(str(v) for v in row) + "\n" for row in zip(*columns))
+
+    @classmethod
+    def concatenate(cls, stores):
+        """Create a ResultStore by joining several stores of the same elements along the time axis.
+
+        Args:
+            stores: A list of ResultStores with the same elements, in timestamp order.
+        """
+        first = stores[0]
+        timestamps = [t for store in stores for t in store.timestamps]
+        result = cls(first.element_names, timestamps, first.value_label, first.flag_labels, first.file_names)
+        result.values = np.concatenate([store.values for store in stores], axis=1)  # noqa: PD011
+        all_flags = [np.unpackbits(store.flags, axis=2, count=len(store.timestamps)) for store in stores]
+        result.flags = np.packbits(np.concatenate(all_flags, axis=2), axis=2)
+        return result
+
+    @classmethod
+    def merge(cls, stores):
+        """Create a ResultStore by joining several stores of different elements along the element axis.
+
+        Args:
+            stores: A list of ResultStores with the same timestamps and different elements.
+        """
+        first = stores[0]
+        element_names = [name for store in stores for name in store.element_names]
+        file_names = [name for store in stores for name in store.file_names]
+        result = cls(element_names, first.timestamps, first.value_label, first.flag_labels, file_names)
+        result.values = np.concatenate([store.values for store in stores], axis=0)  # noqa: PD011
+        result.flags = np.concatenate([store.flags for store in stores], axis=1)
+        return result
+
+    def to_arrays(self, prefix):
+        """Get a dictionary of NumPy arrays representing this store without its timestamps.
+
+        Args:
+            prefix: Text to be prepended to the keys of the dictionary.
+        """
+        return {
+            f"{prefix}_names": np.array(self.element_names, dtype=str),
+            f"{prefix}_file_names": np.array(self.file_names, dtype=str),
+            f"{prefix}_value_label": np.array(self.value_label, dtype=str),
+            f"{prefix}_flag_labels": np.array(self.flag_labels, dtype=str),
+            f"{prefix}_values": self.values,
+            f"{prefix}_flags": self.flags,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix, timestamps):
+        """Create a ResultStore from a dictionary of arrays.
+
+        Args:
+            arrays: A dictionary of arrays as returned by to_arrays.
+            prefix: The prefix of the keys that was used to create the dictionary.
+            timestamps: A list of the timestamps of the stored timesteps.
+        """
+        store = cls(
+            arrays[f"{prefix}_names"].tolist(),
+            timestamps,
+            str(arrays[f"{prefix}_value_label"]),
+            arrays[f"{prefix}_flag_labels"].tolist(),
+            arrays[f"{prefix}_file_names"].tolist(),
+        )
+        store.values = np.asarray(arrays[f"{prefix}_values"], dtype=np.float32)
+        store.flags = np.asarray(arrays[f"{prefix}_flags"], dtype=np.uint8)
+        return store
+
+
+class StreamingResultStore(ResultStore):
+    """A ResultStore that writes the results of each element to a CSV file in fixed-size chunks.
+
+    Only the results of the current chunk of timesteps are held in memory, so the
+    memory used does not depend on the number of timesteps. The CSV files are
+    created with their header when the store is created and the rows of each
+    chunk are appended to them once the chunk is full. The files are the same as
+    those written by ResultStore.write_csvs. The ResultSummary of the store is
+    also updated with each chunk. Timesteps must be recorded in order.
+
+    Args:
+        element_names: A list of the names of the elements to be stored.
+        timestamps: A list of the timestamps (as strings) of the timesteps to be stored.
+        value_label: Text for the header of the value column (eg. "p.u. voltage").
+        flag_labels: A list of text for the headers of the violation flag columns
+            (eg. ["overvoltage", "undervoltage"]).
+        folder: Path to the folder into which the CSV files will be written. If
+            None, no CSV files are written and only the summary of the results is kept.
+        file_names: An optional list of file names (without extension) to be used
+            for the CSV of each element. If None, the element names will be
+            used. (Default: None).
+        chunk_size: The number of timesteps held in memory before they are
+            written to the CSV files. (Default: 1000).
+        include_flags: Boolean to note whether the CSV files should have a
+            column for each violation flag. (Default: True).
+
+    Properties:
+        * folder
+        * chunk_size
+        * include_flags
+        * csv_paths
+        * flushed
+    """
+
+    def __init__(
+        self,
+        element_names,
+        timestamps,
+        value_label,
+        flag_labels,
+        folder,
+        file_names=None,
+        chunk_size=1000,
+        include_flags=True,
+    ):
+        # allocate the result arrays for a single chunk of timesteps
+        super().__init__(element_names, timestamps[:chunk_size], value_label, flag_labels, file_names)
+        self.timestamps = list(timestamps)
+        self.folder = folder
+        self.chunk_size = chunk_size
+        self.include_flags = include_flags
+        self.flushed = 0
+        self._recorded = 0
+        self._summary = ResultSummary(self.element_names, self.value_label, self.flag_labels, self.file_names)
+
+        self.csv_paths = []
+        if folder is not None:
+            os.makedirs(folder, exist_ok=True)
+            self.csv_paths = [os.path.join(folder, f"{file_name}.csv") for file_name in self.file_names]
+        for csv_path in self.csv_paths:
+            with open(csv_path, "w") as csv_data_file:
+                csv_data_file.write(self.csv_header(include_flags))
+
+    def record(self, step, values, flags):
+        """Record the results of all elements for a timestep.
+
+        The chunk is written to the CSV files once its last timestep is recorded.
+
+        Args:
+            step: The index of the timestep in the timestamps of this store.
+            values: An array with a value for each element.
+            flags: A list with a boolean array for each flag label.
+        """
+        super().record(step - self.flushed, values, flags)
+        self._recorded = step + 1
+        if self._recorded - self.flushed == self.values.shape[1]:
+            self.flush()
+
+    def element_flags(self, element_index):
+        """Get a boolean array of the flags of an element in the current chunk.
+
+        Args:
+            element_index: The index of the element in the element_names of this store.
+        """
+        count = self._recorded - self.flushed
+        return np.unpackbits(self.flags[:, element_index], axis=1, count=count).astype(bool)
+
+    def flush(self):
+        """Append the timesteps recorded in the current chunk to the CSV files and start a new chunk."""
+        count = self._recorded - self.flushed
+        if count == 0:
+            return
+        timestamps = self.timestamps[self.flushed : self._recorded]
+        self._summary.update(timestamps, self.values[:, :count], self.flags)
+        for i, csv_path in enumerate(self.csv_paths):
+            with open(csv_path, "a") as csv_data_file:
+                flags = self.element_flags(i) if self.include_flags else []
+                csv_data_file.write(self.csv_rows(timestamps, self.values[i, :count], flags))
+        self.flushed = self._recorded
+        self.values[:] = 0
+        self.flags[:] = 0
+
+    def write_csvs(self, folder=None, include_flags=None):
+        """Write the timesteps of the current chunk to the CSV files of the elements.
+
+        Args:
+            folder: Unused since the files are written to the folder of this store.
+            include_flags: Unused since the columns of the files are set when
+                the store is created.
+
+        Returns:
+            A list of paths to the CSV files.
+        """
+        self.flush()
+        return self.csv_paths
+
+    def summary(self):
+        """Get the ResultSummary of all of the timesteps recorded in this store."""
+        self.flush()
+        return self._summary
+
+
+class ResultSummary:
+    """Aggregates of the results of a set of elements that are updated as the timesteps are solved.
+
+    For each element, the summary holds the maximum and minimum values with the
+    timestamps at which they occurred and the number of timesteps for which
+    each violation flag was set. It also holds a log of the violation events,
+    which are the intervals of consecutive timesteps for which a flag was set.
+    An event that is still ongoing at the end of the timesteps that were added
+    so far is continued by the next update.
+
+    Args:
+        element_names: A list of the names of the elements to be summarized.
+        value_label: Text for the label of the values (eg. "p.u. voltage").
+        flag_labels: A list of text for the labels of the violation flags
+            (eg. ["overvoltage", "undervoltage"]).
+        file_names: An optional list of the file names (without extension) of
+            the elements. If None, the element names will be used. (Default: None).
+
+    Properties:
+        * element_names
+        * value_label
+        * flag_labels
+        * file_names
+        * step_count
+        * max_values
+        * max_timestamps
+        * min_values
+        * min_timestamps
+        * flag_counts
+    """
+
+    # flags that are set when the value is below a limit, for which the peak of
+    # a violation event is its minimum value rather than its maximum value
+    LOW_FLAGS = ("undervoltage",)
+
+    def __init__(self, element_names, value_label, flag_labels, file_names=None):
+        self.element_names = list(element_names)
+        self.value_label = value_label
+        self.flag_labels = list(flag_labels)
+        self.file_names = self.element_names if file_names is None else list(file_names)
+
+        element_count = len(self.element_names)
+        self.step_count = 0
+        self.max_values = np.full(element_count, -np.inf)
+        self.max_timestamps = [None] * element_count
+        self.min_values = np.full(element_count, np.inf)
+        self.min_timestamps = [None] * element_count
+        self.flag_counts = np.zeros((len(self.flag_labels), element_count), dtype=np.int64)
+        # closed events as (flag index, element index, start step, start, end, steps, peak)
+        self._events = []
+        # events that continue to the last added timestep for each flag, keyed by element index
+        self._open_events = [{} for _ in self.flag_labels]
+
+    def update(self, timestamps, values, flags):
+        """Add the results of several timesteps to the aggregates.
+
+        Args:
+            timestamps: A list of the timestamps of the timesteps.
+            values: An array with one row for each element and one column for each timestep.
+            flags: A bit-packed array of the flags with one item for each flag label
+                and element, as in ResultStore.flags. Any bits after the last
+                timestep must be zero.
+        """
+        if len(timestamps) == 0 or len(self.element_names) == 0:
+            return
+        flag_bits = np.unpackbits(flags, axis=2, count=len(timestamps)).astype(bool)
+        self.flag_counts += flag_bits.sum(axis=2)
+        for flag_index, bits in enumerate(flag_bits):
+            self._update_events(flag_index, timestamps, values, bits)
+        self.step_count += len(timestamps)
+        rows = np.arange(len(self.element_names))
+        max_steps = values.argmax(axis=1)
+        for i in np.flatnonzero(values[rows, max_steps] > self.max_values):
+            self.max_values[i] = values[i, max_steps[i]]
+            self.max_timestamps[i] = timestamps[max_steps[i]]
+        min_steps = values.argmin(axis=1)
+        for i in np.flatnonzero(values[rows, min_steps] < self.min_values):
+            self.min_values[i] = values[i, min_steps[i]]
+            self.min_timestamps[i] = timestamps[min_steps[i]]
+
+    def _update_events(self, flag_index, timestamps, values, bits):
+        """Update the violation events of a flag with several timesteps.
+
+        Args:
+            flag_index: The index of the flag in the flag_labels.
+            timestamps: A list of the timestamps of the timesteps.
+            values: An array with one row for each element and one column for each timestep.
+            bits: A boolean array of the flag with one row for each element and one
+                column for each timestep.
+        """
+        peak_func = np.min if self.flag_labels[flag_index] in self.LOW_FLAGS else np.max
+        open_events = self._open_events[flag_index]
+        step_count = len(timestamps)
+
+        # close the open events of elements without the flag at the first timestep
+        for i in [i for i in open_events if not bits[i, 0]]:
+            self._events.append((flag_index, i, *open_events.pop(i)))
+
+        # find the intervals of consecutive flagged timesteps of each element
+        padded = np.zeros((bits.shape[0], step_count + 2), dtype=np.int8)
+        padded[:, 1:-1] = bits
+        edges = np.diff(padded, axis=1)
+        starts, ends = np.nonzero(edges == 1), np.nonzero(edges == -1)
+        for i, start, end in zip(starts[0].tolist(), starts[1].tolist(), ends[1].tolist()):
+            peak = float(peak_func(values[i, start:end]))
+            if start == 0 and i in open_events:  # continuation of an event
+                start_step, start_time, _, steps, open_peak = open_events.pop(i)
+                event = [start_step, start_time, timestamps[end - 1], steps + end, peak_func([open_peak, peak])]
+            else:
+                event = [self.step_count + start, timestamps[start], timestamps[end - 1], end - start, peak]
+            if end == step_count:
+                open_events[i] = event
+            else:
+                self._events.append((flag_index, i, *event))
+
+    def violation_events(self):
+        """Get a list of all of the violation events, including those that are still ongoing.
+
+        Each event is a tuple with the flag index, the element index, the index of
+        the first timestep, the first timestamp, the last timestamp, the number of
+        timesteps and the peak value of the event. The events are sorted by element,
+        flag and start.
+        """
+        events = list(self._events)
+        for flag_index, open_events in enumerate(self._open_events):
+            events.extend((flag_index, i, *event) for i, event in open_events.items())
+        return sorted(events, key=lambda event: (event[1], event[0], event[2]))
+
+    def to_dict(self, hours_per_step):
+        """Get a dictionary of the summary of each element.
+
+        Args:
+            hours_per_step: The number of hours represented by each timestep,
+                which is used to convert the flag counts into hours.
+        """
+        elements = {}
+        for i, file_name in enumerate(self.file_names):
+            element = {
+                f"max {self.value_label}": round(float(self.max_values[i]), 5) if self.step_count else None,
+                "max timestamp": self.max_timestamps[i],
+                f"min {self.value_label}": round(float(self.min_values[i]), 5) if self.step_count else None,
+                "min timestamp": self.min_timestamps[i],
+            }
+            for label, counts in zip(self.flag_labels, self.flag_counts):
+                element[f"{label} hours"] = round(float(counts[i]) * hours_per_step, 5)
+            elements[file_name] = element
+        return elements
+
+
+def write_summary(results_folder, summaries, hours_per_step):
+    """Write the summaries of several result groups into a summary.json and a summary.csv.
+
+    Args:
+        results_folder: Path to the folder into which the summary files will be written.
+        summaries: A dictionary mapping the name of each result group (eg. "Features")
+            to a ResultSummary.
+        hours_per_step: The number of hours represented by each timestep.
+
+    Returns:
+        A list with the paths to the JSON and CSV files.
+    """
+    os.makedirs(results_folder, exist_ok=True)
+    summary_dict = {group: result_summary.to_dict(hours_per_step) for group, result_summary in summaries.items()}
+    json_path = os.path.join(results_folder, "summary.json")
+    with open(json_path, "w") as f:
+        json.dump(summary_dict, f, indent=2)
+
+    # write all groups into a single CSV with a column for each flag of any group
+    flag_labels = []
+    for result_summary in summaries.values():
+        flag_labels.extend(label for label in result_summary.flag_labels if label not in flag_labels)
+    header = ["group", "element", "value label", "max value", "max timestamp", "min value", "min timestamp"]
+    header.extend(f"{label} hours" for label in flag_labels)
+    csv_path = os.path.join(results_folder, "summary.csv")
+    with open(csv_path, "w") as csv_data_file:
+        csv_data_file.write(",".join(header) + "\n")
+        for group, result_summary in summaries.items():
+            label = result_summary.value_label
+            for element_name, element in summary_dict[group].items():
+                row = [group, element_name, label, element[f"max {label}"], element["max timestamp"]]
+                row.extend([element[f"min {label}"], element["min timestamp"]])
+                row.extend(element.get(f"{flag} hours", "") for flag in flag_labels)
+                csv_data_file.write(",".join("" if v is None else str(v) for v in row) + "\n")
+    return [json_path, csv_path]
+
+
+def write_violation_events(results_folder, summaries):
+    """Write the violation events of several result groups into a violations.csv.
+
+    Each row of the CSV is an interval of consecutive timesteps during which
+    an element violated a limit with the first and last timestamps of the
+    interval, its number of timesteps and the peak value during the interval.
+
+    Args:
+        results_folder: Path to the folder into which the CSV will be written.
+        summaries: A dictionary mapping the name of each result group (eg. "Features")
+            to a ResultSummary.
+
+    Returns:
+        The path to the CSV file.
+    """
+    os.makedirs(results_folder, exist_ok=True)
+    csv_path = os.path.join(results_folder, "violations.csv")
+    with open(csv_path, "w") as csv_data_file:
+        csv_data_file.write("group,element,violation,start timestamp,end timestamp,timesteps,peak value\n")
+        for group, result_summary in summaries.items():
+            for flag_index, i, _, start, end, steps, peak in result_summary.violation_events():
+                label = result_summary.flag_labels[flag_index]
+                row = [group, result_summary.file_names[i], label, start, end, steps, round(peak, 5)]
+                csv_data_file.write(",".join(str(v) for v in row) + "\n")
+    return csv_path
+
+
+def write_results_npz(npz_path, stores):
+    """Write several result stores with the same timestamps into a compressed NPZ file.
+
+    Args:
+        npz_path: Path to where the NPZ file will be written.
+        stores: A dictionary mapping the name of each result group (eg. "Features")
+            to a ResultStore.
+
+    Returns:
+        The path to the NPZ file.
+    """
+    timestamps = next(iter(stores.values())).timestamps if len(stores) > 0 else []
+    arrays = {"Datetime": np.array(timestamps, dtype=str), "groups": np.array(list(stores), dtype=str)}
+    for group, store in stores.items():
+        arrays.update(store.to_arrays(group))
+    np.savez_compressed(npz_path, **arrays)
+    return npz_path
+
+
+def read_results_npz(npz_path):
+    """Read a NPZ file written by write_results_npz into a dictionary of result stores.
+
+    Args:
+        npz_path: Path to a NPZ file of results.
+    """
+    with np.load(npz_path) as npz_data:
+        arrays = dict(npz_data.items())
+    timestamps = arrays["Datetime"].tolist()
+    return {group: ResultStore.from_arrays(arrays, group, timestamps) for group in arrays["groups"].tolist()}
+
+
+def write_checkpoint(checkpoint_path, stores, sim_steps, completed):
+    """Write the partial results of a simulation and its progress into a NPZ file.
+
+    The file is written under a temporary name and then renamed so that an
+    interruption while writing never leaves a corrupt checkpoint behind.
+
+    Args:
+        checkpoint_path: Path to where the NPZ file will be written.
+        stores: A dictionary mapping the name of each result group (eg. "Features")
+            to a ResultStore.
+        sim_steps: A list of the indices of the timesteps being simulated.
+        completed: The number of timesteps of sim_steps that have been recorded in the stores.
+
+    Returns:
+        The path to the NPZ file.
+    """
+    arrays = {"sim_steps": np.array(sim_steps, dtype=np.int64), "completed": np.array(completed)}
+    for group, store in stores.items():
+        arrays.update(store.to_arrays(group))
+    temp_path = f"{checkpoint_path}.tmp"
+    with open(temp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(temp_path, checkpoint_path)
+    return checkpoint_path
+
+
+def read_checkpoint(checkpoint_path, stores, sim_steps):
+    """Restore the partial results of a simulation from a NPZ file written by write_checkpoint.
+
+    The checkpoint is only used if it was written for the same timesteps and
+    the same elements as the input stores.
+
+    Args:
+        checkpoint_path: Path to a NPZ file written by write_checkpoint.
+        stores: A dictionary mapping the name of each result group (eg. "Features")
+            to a ResultStore into which the results of the checkpoint will be copied.
+        sim_steps: A list of the indices of the timesteps being simulated.
+
+    Returns:
+        The number of timesteps of sim_steps that were restored. This is zero
+        if the checkpoint does not exist or does not match the input.
+    """
+    try:
+        with np.load(checkpoint_path) as npz_data:
+            arrays = dict(npz_data.items())
+    except (OSError, ValueError):
+        return 0
+    if arrays["sim_steps"].tolist() != list(sim_steps):
+        return 0
+    for group, store in stores.items():
+        if f"{group}_names" not in arrays or arrays[f"{group}_names"].tolist() != store.element_names:
+            return 0
+    for group, store in stores.items():
+        store.values[:] = arrays[f"{group}_values"]  # noqa: PD011
+        store.flags[:] = arrays[f"{group}_flags"]
+    return int(arrays["completed"])
+
+
+def explode_results_npz(npz_path, results_folder=None):
+    """Write the per-element CSV files for all of the results in a NPZ file.
+
+    Each result group is written into a sub-folder with the name of the group,
+    matching the layout of the CSV results written by UrbanoptDittoReader.run.
+
+    Args:
+        npz_path: Path to a NPZ file written by write_results_npz.
+        results_folder: Path to the folder into which the results will be written.
+            If None, the folder containing the NPZ file will be used. (Default: None).
+
+    Returns:
+        A list of paths to the CSV files that were written.
+    """
+    if results_folder is None:
+        results_folder = os.path.dirname(os.path.abspath(npz_path))
+    csv_paths = []
+    for group, store in read_results_npz(npz_path).items():
+        csv_paths.extend(store.write_csvs(os.path.join(results_folder, group)))
+    return csv_paths
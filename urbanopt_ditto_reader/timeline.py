@@ -0,0 +1,121 @@
+"""
+*****************************************************************************************
+URBANopt™, Copyright (c) 2019-2022, Alliance for Sustainable Energy, LLC, and other
+contributors. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright notice, this list
+of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright notice, this
+list of conditions and the following disclaimer in the documentation and/or other
+materials provided with the distribution.
+
+Neither the name of the copyright holder nor the names of its contributors may be
+used to endorse or promote products derived from this software without specific
+prior written permission.
+
+Redistribution of this software, without modification, must refer to the software
+by the same designation. Redistribution of a modified version of this software
+(i) may not refer to the modified version by the same designation, or by any
+confusingly similar designation, and (ii) must refer to the underlying software
+originally provided by Alliance as “URBANopt”. Except to comply with the foregoing,
+the term “URBANopt”, or any confusingly similar designation may not be used to
+refer to any modified version of this software or any modified version of the
+underlying software originally provided by Alliance without the prior written
+consent of Alliance.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+*****************************************************************************************
+"""
+from datetime import datetime
+
+
+class Timeline:
+    """The common time axis shared by all of the load profiles of a simulation.
+
+    Args:
+        timestamps: A list of the timestamps (as strings in the format
+            "YYYY/MM/DD HH:MM:SS") of the time axis.
+
+    Properties:
+        * timestamps
+        * interval
+    """
+
+    DATETIME_FORMAT = "%Y/%m/%d %H:%M:%S"
+
+    def __init__(self, timestamps):
+        self.timestamps = list(timestamps)
+        self._indices = None
+        self._interval = None
+
+    @classmethod
+    def from_csv(cls, csv_file_path):
+        """Create a Timeline from a timestamps CSV with a Datetime header.
+
+        Args:
+            csv_file_path: Full path to a timestamps CSV file.
+        """
+        with open(csv_file_path) as csv_data_file:
+            timestamps = [row.strip() for row in csv_data_file]
+        return cls(timestamps[1:])
+
+    @property
+    def interval(self):
+        """The interval between the first two timestamps in hours."""
+        if self._interval is None:
+            delta = (
+                datetime.strptime(self.timestamps[1], self.DATETIME_FORMAT).astimezone()
+                - datetime.strptime(self.timestamps[0], self.DATETIME_FORMAT).astimezone()
+            )
+            self._interval = delta.seconds / 3600.0
+        return self._interval
+
+    def index(self, timestamp):
+        """Get the index of the first occurrence of a timestamp on the time axis.
+
+        Raises a ValueError if the timestamp is not on the time axis.
+
+        Args:
+            timestamp: A timestamp string.
+        """
+        if self._indices is None:
+            self._indices = {}
+            for i, t in enumerate(self.timestamps):
+                self._indices.setdefault(t, i)
+        try:
+            return self._indices[timestamp]
+        except KeyError:
+            raise ValueError(f"{timestamp} is not in the timeline")
+
+    def matches(self, timestamps):
+        """Check whether a list of timestamps is the same as the time axis.
+
+        Args:
+            timestamps: A list of timestamp strings.
+        """
+        return self.timestamps == list(timestamps)
+
+    def write_csv(self, csv_file_path):
+        """Write the time axis into a timestamps CSV with a Datetime header.
+
+        Args:
+            csv_file_path: Full path to where the CSV file will be written.
+        """
+        with open(csv_file_path, "w") as csv_data_file:
+            csv_data_file.write("Datetime\n")
+            for t in self.timestamps:
+                csv_data_file.write(f"{t}\n")
+        return csv_file_path
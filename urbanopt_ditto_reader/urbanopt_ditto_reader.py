@@ -40,13 +40,19 @@ OF THE POSSIBILITY OF SUCH DAMAGE.
 *****************************************************************************************
 """
 
+import hashlib
 import json
 import math
 import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import suppress
-from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import opendssdirect as dss
 from ditto.consistency.check_loads_connected import check_loads_connected
 from ditto.consistency.check_loops import check_loops
@@ -58,9 +64,21 @@ from ditto.consistency.fix_undersized_transformers import fix_undersized_transfo
 from ditto.readers.opendss import OpenDSSReader
 from ditto.store import Store
 from ditto.writers.json.write import Writer as JSONWriter
-from ditto.writers.opendss.write import Writer
 
+from urbanopt_ditto_reader.reader.geojson import iter_features
+from urbanopt_ditto_reader.reader.manifest import ProfileManifest
 from urbanopt_ditto_reader.reader.read import Reader
+from urbanopt_ditto_reader.results import (
+    ResultStore,
+    StreamingResultStore,
+    read_checkpoint,
+    write_checkpoint,
+    write_results_npz,
+    write_summary,
+    write_violation_events,
+)
+from urbanopt_ditto_reader.timeline import Timeline
+from urbanopt_ditto_reader.writer.write import Writer
 
 
 class UrbanoptDittoReader:
@@ -81,8 +99,52 @@ class UrbanoptDittoReader:
         * end_time
         * timestep
         * upgrade_transformers
+        * result_format
+        * workers
+        * engine
+        * screen_top_k
+        * screen_threshold
+        * profile_format
+        * write_kw_profiles
+        * deduplicate_profiles
+        * stream_geojson
+        * reuse_model
+        * export_json
+        * partition_feeders
+        * checkpoint_interval
+        * resume
+        * stream_results
+        * summary_only
+        * sparse_violations
+        * cache_catalog
+        * timeline
     """
 
+    # formats in which the results of the simulation can be written
+    RESULT_FORMATS = ("csv", "npz")
+    # engines that can be used to step through the timesteps of the simulation
+    ENGINES = ("loop", "monitors")
+    # formats in which the per-unit load profiles can be written
+    PROFILE_FORMATS = ("csv", "sng", "dbl")
+    # file in the opendss folder recording the inputs from which the DSS files were written
+    MODEL_FINGERPRINT_FILE = "model_fingerprint.json"
+    MODEL_FINGERPRINT_VERSION = 1
+    # properties of DSS commands that point to the data files of an object (eg. loadshape profiles)
+    DSS_DATA_FILE = re.compile(r"\b(?:file|sngfile|dblfile|csvfile)\s*=\s*(\"[^\"]*\"|'[^']*'|[^\s)]+)", re.IGNORECASE)
+    # properties of meters and controls that point to the circuit element that they act on with the
+    # class of the element when the property only has its name (eg. transformer=reg1 of a RegControl)
+    DSS_ELEMENT_REFERENCES = (
+        ("element", ""),
+        ("switchedobj", ""),
+        ("transformer", "transformer."),
+        ("capacitor", "capacitor."),
+    )
+    DSS_ELEMENT_REFERENCE = re.compile(
+        r"\b(element|switchedobj|transformer|capacitor)\s*=\s*(\"[^\"]*\"|'[^']*'|[^\s,)\]]+)", re.IGNORECASE
+    )
+    # commands that act on the circuit element named after them (eg. Edit Load.load_1 kw=5)
+    DSS_ELEMENT_VERBS = ("new", "edit", "enable", "disable", "open", "close")
+
     def __init__(self, config_data=None):
         # set the path to where this module is located
         self.module_path = Path(__file__).parent.parent
@@ -119,7 +181,95 @@ class UrbanoptDittoReader:
         if "upgrade_transformers" in config:
             self.upgrade_transformers = config["upgrade_transformers"]
 
+        self.result_format = "csv"
+        if "result_format" in config and config["result_format"] is not None:
+            self.result_format = config["result_format"]
+        if self.result_format not in self.RESULT_FORMATS:
+            raise ValueError(
+                f"Result format {self.result_format} is not recognized. Choose from {', '.join(self.RESULT_FORMATS)}"
+            )
+
+        self.workers = 1
+        if "workers" in config and config["workers"] is not None:
+            self.workers = int(config["workers"])
+        if self.workers < 1:
+            raise ValueError(f"The number of workers must be at least 1. Got {self.workers}")
+
+        self.engine = "loop"
+        if "engine" in config and config["engine"] is not None:
+            self.engine = config["engine"]
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"Engine {self.engine} is not recognized. Choose from {', '.join(self.ENGINES)}")
+
+        self.profile_format = "csv"
+        if "profile_format" in config and config["profile_format"] is not None:
+            self.profile_format = config["profile_format"]
+        if self.profile_format not in self.PROFILE_FORMATS:
+            raise ValueError(
+                f"Profile format {self.profile_format} is not recognized. "
+                f"Choose from {', '.join(self.PROFILE_FORMATS)}"
+            )
+        # by default, the profiles in physical units are only written with CSV profiles
+        self.write_kw_profiles = self.profile_format == "csv"
+        if "write_kw_profiles" in config and config["write_kw_profiles"] is not None:
+            self.write_kw_profiles = bool(config["write_kw_profiles"])
+        self.deduplicate_profiles = False
+        if "deduplicate_profiles" in config and config["deduplicate_profiles"] is not None:
+            self.deduplicate_profiles = bool(config["deduplicate_profiles"])
+        self.stream_geojson = False
+        if "stream_geojson" in config and config["stream_geojson"] is not None:
+            self.stream_geojson = bool(config["stream_geojson"])
+        self.reuse_model = False
+        if "reuse_model" in config and config["reuse_model"] is not None:
+            self.reuse_model = bool(config["reuse_model"])
+        self.export_json = True
+        if "export_json" in config and config["export_json"] is not None:
+            self.export_json = bool(config["export_json"])
+        self.cache_catalog = True
+        if "cache_catalog" in config and config["cache_catalog"] is not None:
+            self.cache_catalog = bool(config["cache_catalog"])
+        self.partition_feeders = False
+        if "partition_feeders" in config and config["partition_feeders"] is not None:
+            self.partition_feeders = bool(config["partition_feeders"])
+        self.checkpoint_interval = None
+        if "checkpoint_interval" in config and config["checkpoint_interval"] is not None:
+            self.checkpoint_interval = int(config["checkpoint_interval"])
+            if self.checkpoint_interval < 1:
+                raise ValueError(f"The checkpoint interval must be at least 1. Got {self.checkpoint_interval}")
+        self.resume = False
+        if "resume" in config and config["resume"] is not None:
+            self.resume = bool(config["resume"])
+        self.stream_results = False
+        if "stream_results" in config and config["stream_results"] is not None:
+            self.stream_results = bool(config["stream_results"])
+        self.summary_only = False
+        if "summary_only" in config and config["summary_only"] is not None:
+            self.summary_only = bool(config["summary_only"])
+        self.sparse_violations = False
+        if "sparse_violations" in config and config["sparse_violations"] is not None:
+            self.sparse_violations = bool(config["sparse_violations"])
+        if (self.stream_results or self.summary_only) and (
+            self.result_format != "csv"
+            or self.workers > 1
+            or self.partition_feeders
+            or self.checkpoint_interval is not None
+            or self.resume
+        ):
+            raise ValueError(
+                "Streaming results and summary_only can only be used with the csv result format and a single worker "
+                "without partition_feeders, checkpoint_interval or resume"
+            )
+
+        self.screen_top_k = None
+        if "screen_top_k" in config and config["screen_top_k"] is not None:
+            self.screen_top_k = int(config["screen_top_k"])
+        self.screen_threshold = None
+        if "screen_threshold" in config and config["screen_threshold"] is not None:
+            self.screen_threshold = float(config["screen_threshold"])
+
         self.timeseries_location = os.path.join(self.dss_analysis, "profiles")
+        # timestamps of the profiles, which are read from timestamps.csv if not set
+        self.timeline = None
 
     def default_config(self):
         """Get a dictionary for the default configuration variables."""
@@ -134,7 +284,31 @@ class UrbanoptDittoReader:
         Args:
             data: A dictionary of configuration variables.
         """
-        non_path_vars = ("use_reopt", "start_time", "end_time", "timestep", "upgrade_transformers")
+        non_path_vars = (
+            "use_reopt",
+            "start_time",
+            "end_time",
+            "timestep",
+            "upgrade_transformers",
+            "result_format",
+            "workers",
+            "engine",
+            "screen_top_k",
+            "screen_threshold",
+            "profile_format",
+            "write_kw_profiles",
+            "deduplicate_profiles",
+            "stream_geojson",
+            "reuse_model",
+            "export_json",
+            "partition_feeders",
+            "checkpoint_interval",
+            "resume",
+            "stream_results",
+            "summary_only",
+            "sparse_violations",
+            "cache_catalog",
+        )
         for k, v in data.items():
             if k in non_path_vars:
                 continue
@@ -143,25 +317,102 @@ class UrbanoptDittoReader:
         return data
 
     @staticmethod
-    def _get_all_voltages():
-        """Get a dictionary of over and under voltages for all buses."""
-        voltage_dict = {}
+    def _get_bus_node_index():
+        """Get the bus names of the circuit and the index of the bus for each node.
+
+        The node index follows the order of dss.Circuit.AllNodeNames() and is used
+        to reduce the circuit-wide node voltage arrays to a value for each bus.
+        This only needs to be computed once after the circuit has been loaded.
+        """
         bus_names = dss.Circuit.AllBusNames()
+        node_counts = []
         for b in bus_names:
             dss.Circuit.SetActiveBus(b)
-            vang = dss.Bus.puVmagAngle()
-            if len(vang[::2]) > 0:
-                vmag = sum(vang[::2]) / len(vang)
-            else:
-                vmag = 0
-            voltage_dict[b] = vmag * 2
+            node_counts.append(dss.Bus.NumNodes())
+        node_bus_index = np.repeat(np.arange(len(bus_names)), node_counts)
+        return bus_names, node_bus_index
+
+    @staticmethod
+    def _get_building_bus_index(bus_names, building_map):
+        """Get the buildings connected to the circuit and the index of the bus of each building.
+
+        The bus names are matched to the electrical junctions of the building_map
+        once after the circuit has been loaded so that the voltages of the buildings
+        can be taken from the array of all bus voltages at each timestep. If several
+        buses map to the same building, the last of them in bus_names is used.
+
+        Args:
+            bus_names: A list of the bus names in the circuit.
+            building_map: A dictionary mapping electrical junctions to buildings.
+
+        Returns:
+            A tuple with two items.
 
-        return voltage_dict
+            -   bldg_names: A list of the buildings in the order that they are
+                first found in bus_names.
+
+            -   bldg_bus_index: An array with the index in bus_names of the bus of
+                each building in bldg_names.
+        """
+        bldg_buses = {}
+        for b, element in enumerate(bus_names):
+            building = building_map.get(element.replace("_", "-"))
+            if building is not None:
+                bldg_buses[building] = b
+        return list(bldg_buses), np.array(list(bldg_buses.values()), dtype=np.intp)
+
+    @staticmethod
+    def _get_all_voltages(bus_names, node_bus_index):
+        """Get an array of the average per-unit voltage magnitude for all buses.
+
+        Args:
+            bus_names: A list of the bus names in the circuit.
+            node_bus_index: An array with the index of the bus for each node of
+                the circuit, as returned by _get_bus_node_index.
+        """
+        node_vmag = np.asarray(dss.Circuit.AllBusMagPu())
+        bus_count = len(bus_names)
+        vmag_sum = np.bincount(node_bus_index, weights=node_vmag, minlength=bus_count)
+        node_count = np.bincount(node_bus_index, minlength=bus_count)
+        # buses without any nodes get a voltage of zero
+        return np.divide(vmag_sum, node_count, out=np.zeros(bus_count), where=node_count > 0)
 
     @staticmethod
-    def _get_line_loading():
-        """Get a dictionary of loading for the Lines."""
-        line_overloads_dict = {}
+    def _get_pd_current_offsets():
+        """Get a dictionary of where the currents of each PD element are located.
+
+        The dictionary maps the lower-case name of each power delivery element to
+        a tuple with the index of its first conductor in the array returned by
+        _get_pd_current_magnitudes and the number of conductors across all of
+        its terminals.
+        """
+        pd_names = dss.PDElements.AllNames()
+        conductor_counts = np.asarray(dss.PDElements.AllNumTerminals()) * np.asarray(dss.PDElements.AllNumConductors())
+        starts = np.concatenate(([0], np.cumsum(conductor_counts)[:-1]))
+        return {
+            name.lower(): (int(start), int(count)) for name, start, count in zip(pd_names, starts, conductor_counts)
+        }
+
+    @staticmethod
+    def _get_pd_current_magnitudes():
+        """Get an array of the current magnitudes of all conductors of all PD elements."""
+        currents = np.asarray(dss.PDElements.AllCurrents())
+        return np.sqrt(currents[::2] ** 2 + currents[1::2] ** 2)
+
+    @classmethod
+    def _get_line_ratings(cls):
+        """Get the current indices and current limits of all Lines.
+
+        This only needs to be computed once after the circuit has been loaded.
+        The loading of a line uses the maximum current across all of its conductors.
+
+        Returns:
+            A tuple with the line names, an array of indices into the PD element
+            current magnitudes, an array of where each line starts in these
+            indices and an array of the line current limits.
+        """
+        current_offsets = cls._get_pd_current_offsets()
+        line_names, current_index, segment_starts, line_limits = [], [], [], []
         # Set the active class to be the lines
         dss.Circuit.SetActiveClass("Line")
 
@@ -169,53 +420,82 @@ class UrbanoptDittoReader:
         flag = dss.ActiveClass.First()
         while flag > 0:
             line_name = dss.CktElement.Name()
-            # Get the current limit
-            line_limit = dss.CktElement.NormalAmps()
-
-            # Compute the current through the line
-            dss_curr = dss.CktElement.Currents()
-            line_current = []
-            for ii in range(int(0.5 * len(dss_curr))):
-                current = math.sqrt(dss_curr[2 * (ii - 1) + 2] ** 2 + dss_curr[2 * ii + 1] ** 2)
-                line_current.append(current)
-
-            # The loading is the ratio of the two
-            line_overloads_dict[line_name] = max(line_current) / float(line_limit)
+            with suppress(KeyError):  # disabled elements carry no current
+                start, count = current_offsets[line_name.lower()]
+                line_names.append(line_name)
+                segment_starts.append(len(current_index))
+                current_index.extend(range(start, start + count))
+                line_limits.append(float(dss.CktElement.NormalAmps()))
 
             # Move on to the next line
             flag = dss.ActiveClass.Next()
-        return line_overloads_dict
+        return (
+            line_names,
+            np.array(current_index, dtype=int),
+            np.array(segment_starts, dtype=int),
+            np.array(line_limits),
+        )
 
-    @staticmethod
-    def _get_xfmr_overloads():
-        """Get a dictionary of Transformer current violations."""
-        transformer_violation_dict = {}
+    @classmethod
+    def _get_xfmr_ratings(cls):
+        """Get the current indices and current limits of all Transformers.
+
+        This only needs to be computed once after the circuit has been loaded.
+        The loading of a transformer uses the maximum current across the phases
+        of its high side winding.
+
+        Returns:
+            A tuple with the transformer names, an array of indices into the PD
+            element current magnitudes, an array of where each transformer starts
+            in these indices and an array of the transformer current limits per phase.
+        """
+        current_offsets = cls._get_pd_current_offsets()
+        transformer_names, current_index, segment_starts, transformer_limits = [], [], [], []
         dss.Circuit.SetActiveClass("Transformer")
         flag = dss.ActiveClass.First()
         while flag > 0:
             # Get the name of the Transformer
             transformer_name = dss.CktElement.Name()
-            transformer_current = []
-
-            hs_kv = float(dss.Properties.Value("kVs").split("[")[1].split(",")[0])
-            kva = float(dss.Properties.Value("kVA"))
-            n_phases = dss.CktElement.NumPhases()
-            if n_phases > 1:
-                transformer_limit_per_phase = kva / (hs_kv * math.sqrt(3))
-            else:
-                transformer_limit_per_phase = kva / hs_kv
-
-            currents = dss.CktElement.CurrentsMagAng()[: 2 * n_phases]
-            transformer_current = currents[::2]
-
-            # Compute the loading
-            ldg = max(transformer_current) / transformer_limit_per_phase
-            transformer_violation_dict[transformer_name] = ldg
+            with suppress(KeyError):  # disabled elements carry no current
+                start, _ = current_offsets[transformer_name.lower()]
+                hs_kv = float(dss.Properties.Value("kVs").split("[")[1].split(",")[0])
+                kva = float(dss.Properties.Value("kVA"))
+                n_phases = dss.CktElement.NumPhases()
+                if n_phases > 1:
+                    transformer_limit_per_phase = kva / (hs_kv * math.sqrt(3))
+                else:
+                    transformer_limit_per_phase = kva / hs_kv
+                transformer_names.append(transformer_name)
+                segment_starts.append(len(current_index))
+                current_index.extend(range(start, start + n_phases))
+                transformer_limits.append(transformer_limit_per_phase)
 
             # Move on to the next Transformer...
             flag = dss.ActiveClass.Next()
+        return (
+            transformer_names,
+            np.array(current_index, dtype=int),
+            np.array(segment_starts, dtype=int),
+            np.array(transformer_limits),
+        )
 
-        return transformer_violation_dict
+    @staticmethod
+    def _get_element_loading(current_mags, ratings):
+        """Get an array of the p.u. loading for Lines or Transformers.
+
+        The loading values follow the order of the element names in the ratings.
+
+        Args:
+            current_mags: An array of current magnitudes for all PD elements, as
+                returned by _get_pd_current_magnitudes.
+            ratings: A tuple of element ratings, as returned by _get_line_ratings
+                or _get_xfmr_ratings.
+        """
+        element_names, current_index, segment_starts, limits = ratings
+        if len(element_names) == 0:
+            return np.zeros(0)
+        max_current = np.maximum.reduceat(current_mags[current_index], segment_starts)
+        return max_current / limits
 
     @staticmethod
     def _load_json_content(json_file):
@@ -287,8 +567,9 @@ class UrbanoptDittoReader:
     def write_opendss_files(self, model):
         """Write out OpenDSS files from a DiTTo model.
 
-        This includes both the DSS files and the JSON representation of the files.
-        Files will be written using the dss_analysis property on this object instance.
+        This includes the DSS files and, if export_json is True, the JSON
+        representation of the model. Files will be written using the dss_analysis
+        property on this object instance.
 
         Args:
             model: A DiTTo model, which will be written to OpenDSS files.
@@ -298,13 +579,14 @@ class UrbanoptDittoReader:
             simulation.
         """
         dss_files_path = os.path.join(self.dss_analysis, "dss_files")
-        dss_json_path = os.path.join(self.dss_analysis, "json_files")
-        for out_dir in (dss_files_path, dss_json_path):
-            os.makedirs(out_dir, exist_ok=True)
+        os.makedirs(dss_files_path, exist_ok=True)
         writer = Writer(output_path=dss_files_path, split_feeders=False, split_substations=False)
         writer.write(model)
-        json_writer = JSONWriter(output_path=dss_json_path)
-        json_writer.write(model)
+        if self.export_json:
+            dss_json_path = os.path.join(self.dss_analysis, "json_files")
+            os.makedirs(dss_json_path, exist_ok=True)
+            json_writer = JSONWriter(output_path=dss_json_path)
+            json_writer.write(model)
         return os.path.join(self.dss_analysis, "dss_files", "Master.dss")
 
     def run(self, master_file):
@@ -318,37 +600,31 @@ class UrbanoptDittoReader:
             master_file: The path to the master DSS file to which the simulation
                 will be redirected for simulation.
         """
-        # set up the directories into which the results will be written
+        # set up the directory into which the results will be written
         results_path = os.path.join(self.dss_analysis, "results")
-        features_path = os.path.join(results_path, "Features")
-        trans_path = os.path.join(results_path, "Transformers")
-        lines_path = os.path.join(results_path, "Lines")
-        all_path = (features_path, trans_path, lines_path)
-        for out_dir in all_path:
-            os.makedirs(out_dir, exist_ok=True)
-
-        # read the timestamps and compute the simulation interval
+        os.makedirs(results_path, exist_ok=True)
+
+        # get the timestamps and compute the simulation interval
         timestamp_file = os.path.join(self.timeseries_location, "timestamps.csv")
-        ts = self._read_single_column_csv(timestamp_file)
-        ts.pop(0)  # remove the header
-        dt_format = "%Y/%m/%d %H:%M:%S"
-        delta = datetime.strptime(ts[1], dt_format).astimezone() - datetime.strptime(ts[0], dt_format).astimezone()
-        interval = delta.seconds / 3600.0
-        stepsize = 60 * interval
+        timeline = self.timeline if self.timeline is not None else Timeline.from_csv(timestamp_file)
+        ts = timeline.timestamps
+        stepsize = 60 * timeline.interval
 
         # get a map from the electrical junctions to buildings
         building_map = {}
         # first, look up the junctions and buildings in the feature GeoJSON
-        geojson_content = self._load_json_content(self.geojson_file)
-        if "features" in geojson_content:
-            for element in geojson_content["features"]:
-                if (
-                    "properties" in element
-                    and "type" in element["properties"]
-                    and element["properties"]["type"] == "ElectricalJunction"
-                    and "buildingId" in element["properties"]
-                ):
-                    building_map[element["properties"]["id"]] = element["properties"]["buildingId"]
+        if self.stream_geojson:
+            features = iter_features(self.geojson_file)
+        else:
+            features = self._load_json_content(self.geojson_file).get("features", [])
+        for element in features:
+            if (
+                "properties" in element
+                and "type" in element["properties"]
+                and element["properties"]["type"] == "ElectricalJunction"
+                and "buildingId" in element["properties"]
+            ):
+                building_map[element["properties"]["id"]] = element["properties"]["buildingId"]
         # if nothing is found, try looking for an RNM output GeoJSON
         if building_map == {} and os.path.isdir(self.rnm_results):
             rnm_parent = os.path.split(self.rnm_results)[0]
@@ -383,14 +659,14 @@ class UrbanoptDittoReader:
         start_time, end_time = ts[0], ts[end_index - 1]
         if self.start_time is not None:
             try:
-                start_index = ts.index(self.start_time)
+                start_index = timeline.index(self.start_time)
                 print(found_msg.format("start", self.start_time))
                 start_time = self.start_time
             except ValueError:
                 print(no_warn.format("start", self.start_time, timestamp_file, all_t))
         if self.end_time is not None:
             try:
-                end_index = ts.index(self.end_time) + 1
+                end_index = timeline.index(self.end_time) + 1
                 print(found_msg.format("end", self.end_time))
                 end_time = self.end_time
             except ValueError:
@@ -409,71 +685,842 @@ class UrbanoptDittoReader:
                 )
             print(f"Using timestep of {self.timestep} minutes")
 
-        # setup dictionaries to hold the results
-        voltage_df_dic = {}
-        line_df_dic = {}
-        transformer_df_dic = {}
-
         # begin running the simulation
         print("\nBEGINNING SIMULATION")
-        dss.run_command("Clear")
-        # redirect the simulation to the master file
         master_dss = os.path.join(self.dss_analysis, "dss_files", "Master.dss") if master_file is None else master_file
-        redirect_cmd = f"Redirect {master_dss}"
-        redirect_output = dss.run_command(redirect_cmd)
-        if redirect_output:
-            print(redirect_output)
+        sim_steps = list(range(start_index, end_index, int(self.timestep / stepsize)))
+        if self.screen_top_k is not None or self.screen_threshold is not None:
+            sim_steps = self._screen_timesteps(master_dss, ts, sim_steps, results_path)
+        engine = self._solve_engine(sim_steps)
+        solve_start = time.perf_counter()
+        if self.partition_feeders:
+            result_groups = self._solve_feeders_parallel(master_dss, ts, sim_steps, building_map, engine)
+        elif self.workers > 1 and len(sim_steps) > 1:
+            result_groups = self._solve_timesteps_parallel(master_dss, ts, sim_steps, building_map, engine)
+        else:
+            sim_times = [ts[i] for i in sim_steps]
+            result_groups = self._solve_timesteps(master_dss, sim_steps, sim_times, building_map, engine)
+        solve_seconds = time.perf_counter() - solve_start
+        print(f"Solved {len(sim_steps)} timesteps with the {engine} engine in {solve_seconds:.2f} seconds")
+        result_mb = sum(store.nbytes for store in result_groups.values()) / 1e6
+        print(f"Result buffers for {len(sim_steps)} timesteps use {result_mb:.2f} MB")
+
+        # write the collected results into CSV files or a single NPZ file
+        if self.summary_only:
+            pass  # only the summary of the results is written
+        elif self.result_format == "npz":
+            npz_path = write_results_npz(os.path.join(results_path, "results.npz"), result_groups)
+            print(f"Results written to {npz_path}")
+        else:
+            for group, store in result_groups.items():
+                store.write_csvs(os.path.join(results_path, group), include_flags=not self.sparse_violations)
+        summaries = {group: store.summary() for group, store in result_groups.items()}
+        summary_path = write_summary(results_path, summaries, self.timestep / 60)[0]
+        print(f"Summary of the results written to {summary_path}")
+        violations_path = write_violation_events(results_path, summaries)
+        print(f"Violation events written to {violations_path}")
+        peak_mb = self._peak_memory_mb()
+        if peak_mb is not None:
+            print(f"Peak memory used by the simulation: {peak_mb:.2f} MB")
+
+    def _solve_timesteps(self, master_dss, sim_steps, sim_times, building_map, engine):
+        """Solve the power flow of a master DSS file for several timesteps.
+
+        The master file is loaded into a freshly-cleared OpenDSS circuit so that
+        this method can be run in a separate process from other simulations.
+
+        Args:
+            master_dss: The path to the master DSS file to be simulated.
+            sim_steps: A list of the indices of the timesteps to be simulated.
+            sim_times: A list of the timestamps of the timesteps to be simulated.
+            building_map: A dictionary mapping electrical junctions to buildings.
+            engine: Text for the engine used to solve the timesteps, as returned
+                by _solve_engine for all of the timesteps of the simulation.
+
+        Returns:
+            A dictionary with a ResultStore for the Features, Lines and Transformers.
+        """
+        self._load_circuit(master_dss)
+        bus_names, node_bus_index = self._get_bus_node_index()
+        line_ratings = self._get_line_ratings()
+        xfmr_ratings = self._get_xfmr_ratings()
+
+        # set up the result stores for the buildings, lines and transformers
+        bldg_names, bldg_bus_index = self._get_building_bus_index(bus_names, building_map)
+        voltage_store = self._new_result_store(
+            "Features",
+            bldg_names,
+            sim_times,
+            "p.u. voltage",
+            ["overvoltage", "undervoltage"],
+            [e.replace("_", "-") for e in bldg_names],
+        )
+        line_store = self._new_result_store(
+            "Lines",
+            line_ratings[0],
+            sim_times,
+            "p.u. loading",
+            ["overloaded"],
+            [e.replace(":", "") for e in line_ratings[0]],
+        )
+        transformer_store = self._new_result_store(
+            "Transformers",
+            xfmr_ratings[0],
+            sim_times,
+            "p.u. loading",
+            ["overloaded"],
+            [e.replace(":", "") for e in xfmr_ratings[0]],
+        )
+
+        all_stores = (voltage_store, line_store, transformer_store)
+        result_groups = {"Features": voltage_store, "Lines": line_store, "Transformers": transformer_store}
+        if engine == "monitors" and len(sim_steps) > 0:
+            bldg_buses = [bus_names[b] for b in bldg_bus_index]
+            self._solve_with_monitors(sim_steps, sim_times, bldg_buses, line_ratings, xfmr_ratings, all_stores)
+            return result_groups
+
+        # restore the results of the timesteps that were solved before an interruption
+        checkpoint_path, first_step = None, 0
+        if self.checkpoint_interval is not None or self.resume:
+            checkpoint_path = self._checkpoint_path(master_dss, sim_steps)
+        if self.resume and os.path.isfile(checkpoint_path):
+            first_step = read_checkpoint(checkpoint_path, result_groups, sim_steps)
+            print(f"Resuming after {first_step} of {len(sim_steps)} timesteps from {checkpoint_path}")
+
         # set up the template of the command to solve for a timestep
         solve_cmd = "Solve mode=yearly stepsize={}m number=1 hour={} sec={}"
-        # setup the column in the result data frames
-        bldg_columns = ["Datetime", "p.u. voltage", "overvoltage", "undervoltage"]
-        line_columns = ["Datetime", "p.u. loading", "overloaded"]
-        trans_columns = ["Datetime", "p.u. loading", "overloaded"]
         # loop through the timesteps and compute power flow
-        for i in range(start_index, end_index, int(self.timestep / stepsize)):
+        for step, (i, timepoint) in enumerate(zip(sim_steps, sim_times)):
+            if step < first_step:
+                continue
             # simulate conditions at the time point
-            time = ts[i]
-            print("Timepoint:", time, flush=True)
-            hour = int(i / (1 / (self.timestep / 60.0)))
-            seconds = (i % (1 / (self.timestep / 60.0))) * 3600
+            print("Timepoint:", timepoint, flush=True)
+            hour, seconds = self._solve_time(i)
             output = dss.run_command(solve_cmd.format(self.timestep, hour, seconds))
             if output:
                 print(output)
-            voltages = self._get_all_voltages()
-            line_overloads = self._get_line_loading()
-            overloaded_xfmrs = self._get_xfmr_overloads()
-
-            # if this is the first timestep, setup the dictionaries to hold outputs
-            if i == start_index:
-                for element in voltages:
-                    with suppress(KeyError):  # element is not a building
-                        voltage_df_dic[building_map[element.replace("_", "-")]] = [bldg_columns]
-                for element in line_overloads:
-                    line_df_dic[element] = [line_columns]
-                for element in overloaded_xfmrs:
-                    transformer_df_dic[element] = [trans_columns]
-
-            # record the OpenDSS results in dictionaries
-            for element, volt_val in voltages.items():
-                with suppress(KeyError):  # element is not a building
-                    voltage_df_dic[building_map[element.replace("_", "-")]].append(
-                        [time, round(volt_val, 5), volt_val > 1.05, volt_val < 0.95]
+            voltages = self._get_all_voltages(bus_names, node_bus_index)
+            current_mags = self._get_pd_current_magnitudes()
+            line_overloads = self._get_element_loading(current_mags, line_ratings)
+            overloaded_xfmrs = self._get_element_loading(current_mags, xfmr_ratings)
+
+            # record the OpenDSS results in the result stores
+            bldg_voltages = voltages[bldg_bus_index]
+            self._record_results(step, all_stores, bldg_voltages, line_overloads, overloaded_xfmrs)
+            completed = step + 1
+            if (
+                self.checkpoint_interval is not None
+                and completed % self.checkpoint_interval == 0
+                and completed < len(sim_steps)
+            ):
+                write_checkpoint(checkpoint_path, result_groups, sim_steps, completed)
+
+        # the checkpoint is no longer needed once all of the timesteps are solved
+        if checkpoint_path is not None:
+            if os.path.isfile(checkpoint_path):
+                os.remove(checkpoint_path)
+            with suppress(OSError):  # other workers may still be using the folder
+                os.rmdir(os.path.dirname(checkpoint_path))
+        return result_groups
+
+    def _new_result_store(self, group, element_names, sim_times, value_label, flag_labels, file_names):
+        """Create a ResultStore for a group of results.
+
+        If stream_results is True, the store is a StreamingResultStore that writes
+        the results to the CSV files of the group as the timesteps are solved. If
+        summary_only is True, it is a StreamingResultStore that only keeps the
+        summary of the results.
+
+        Args:
+            group: The name of the result group (eg. "Features").
+            element_names: A list of the names of the elements to be stored.
+            sim_times: A list of the timestamps of the timesteps to be simulated.
+            value_label: Text for the header of the value column (eg. "p.u. voltage").
+            flag_labels: A list of text for the headers of the violation flag columns.
+            file_names: A list of the file names (without extension) of the elements.
+        """
+        if self.summary_only:
+            return StreamingResultStore(element_names, sim_times, value_label, flag_labels, None, file_names)
+        if self.stream_results:
+            folder = os.path.join(self.dss_analysis, "results", group)
+            return StreamingResultStore(
+                element_names,
+                sim_times,
+                value_label,
+                flag_labels,
+                folder,
+                file_names,
+                include_flags=not self.sparse_violations,
+            )
+        return ResultStore(element_names, sim_times, value_label, flag_labels, file_names)
+
+    def _checkpoint_path(self, master_dss, sim_steps):
+        """Get the path to the checkpoint file of a set of timesteps of a master DSS file.
+
+        Each set of timesteps (eg. the chunk of each worker) has its own checkpoint
+        in a checkpoints folder of the results, which is named with a hash of the
+        master file, the fingerprint of the loaded circuit, the timesteps and the
+        timestep size. So a checkpoint is not resumed once the model has changed.
+
+        Args:
+            master_dss: The path to the master DSS file being simulated.
+            sim_steps: A list of the indices of the timesteps being simulated.
+        """
+        checkpoint_folder = os.path.join(self.dss_analysis, "results", "checkpoints")
+        os.makedirs(checkpoint_folder, exist_ok=True)
+        circuit = self._circuit_fingerprint(self._read_dss_commands(master_dss))
+        key = json.dumps([os.path.abspath(master_dss), circuit, list(sim_steps), self.timestep])
+        return os.path.join(checkpoint_folder, f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}.npz")
+
+    @classmethod
+    def _circuit_fingerprint(cls, commands):
+        """Get a hash of the commands of a circuit and of the data files that they read.
+
+        The data files (eg. loadshape profiles) are identified by their path,
+        modification time and size. Files that do not exist are only identified
+        by the commands that point to them.
+
+        Args:
+            commands: A list of the commands of the circuit from _read_dss_commands.
+        """
+        digest = hashlib.sha256()
+        dss_folder = ""
+        for command in commands:
+            digest.update(f"{command}\n".encode())
+            if command.startswith('CD "'):
+                dss_folder = command[4:-1]
+                continue
+            for data_file in cls.DSS_DATA_FILE.findall(command):
+                data_path = os.path.join(dss_folder, data_file.strip("\"'").replace("\\", os.sep))
+                with suppress(OSError):
+                    file_stat = os.stat(data_path)
+                    digest.update(f"{data_path}|{file_stat.st_mtime_ns}|{file_stat.st_size}\n".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _load_circuit(master_dss):
+        """Load the circuit of a master DSS file into a freshly-cleared OpenDSS engine.
+
+        Args:
+            master_dss: The path to the master DSS file to be loaded.
+        """
+        dss.run_command("Clear")
+        # redirect the simulation to the master file
+        redirect_output = dss.run_command(f"Redirect {master_dss}")
+        if redirect_output:
+            print(redirect_output)
+
+    @staticmethod
+    def _read_dss_commands(dss_file):
+        """Read the commands of a DSS file into a list, including those of the files it redirects to.
+
+        The circuit is always loaded into OpenDSS by redirecting to its master file.
+        This list is only used to write the master files of the feeders of the
+        circuit and to identify the circuit of a checkpoint. Redirected files are
+        inlined between commands that set the OpenDSS working folder to their folder
+        so that relative paths in them (eg. to loadshape profiles) are resolved as if
+        they were redirected. Like OpenDSS, a redirected file that does not exist is
+        looked for again with a .dss extension (eg. "Redirect Loads" in the master
+        files of RNM). All other commands, including solves, are kept so that the
+        commands load the circuit in the same state as redirecting the file.
+
+        Args:
+            dss_file: Path to a DSS file (eg. Master.dss).
+        """
+        dss_file = os.path.abspath(dss_file)
+        dss_folder = os.path.dirname(dss_file)
+        commands = [f'CD "{dss_folder}"']
+        in_block_comment = False
+        with open(dss_file) as f:
+            for line in f:
+                command = line.strip()
+                if in_block_comment or command.startswith("/*"):
+                    in_block_comment = "*/" not in command
+                    continue
+                words = command.split(maxsplit=1)
+                if len(words) == 0 or command.startswith(("!", "//")):
+                    continue
+                verb = words[0].lower()
+                if verb in ("redirect", "compile") and len(words) == 2:
+                    redirect_file = words[1].split("!")[0].strip().strip("\"'()[]{}")
+                    redirect_path = os.path.join(dss_folder, redirect_file)
+                    if not os.path.isfile(redirect_path) and os.path.isfile(f"{redirect_path}.dss"):
+                        redirect_path = f"{redirect_path}.dss"
+                    commands.extend(UrbanoptDittoReader._read_dss_commands(redirect_path))
+                    if verb == "redirect":  # compiled files keep their folder as the working folder
+                        commands.append(f'CD "{dss_folder}"')
+                    continue
+                commands.append(command)
+        return commands
+
+    @staticmethod
+    def _record_results(step, stores, bldg_voltages, line_loading, xfmr_loading):
+        """Record the building voltages, line loading and transformer loading of a timestep.
+
+        Args:
+            step: The index of the timestep in the result stores.
+            stores: A tuple of the building, line and transformer ResultStores.
+            bldg_voltages: An array of the p.u. voltage of each building.
+            line_loading: An array of the p.u. loading of each line.
+            xfmr_loading: An array of the p.u. loading of each transformer.
+        """
+        voltage_store, line_store, transformer_store = stores
+        voltage_store.record(step, bldg_voltages, [bldg_voltages > 1.05, bldg_voltages < 0.95])
+        line_store.record(step, line_loading, [line_loading > 1.0])
+        transformer_store.record(step, xfmr_loading, [xfmr_loading > 1.0])
+
+    def _solve_time(self, i):
+        """Get the hour and seconds at which OpenDSS is set to solve a timestep.
+
+        Args:
+            i: The index of the timestep in the timeseries.
+        """
+        hour = int(i / (1 / (self.timestep / 60.0)))
+        seconds = (i % (1 / (self.timestep / 60.0))) * 3600
+        return hour, seconds
+
+    def _solve_engine(self, sim_steps):
+        """Get the engine that is used to solve several timesteps.
+
+        This is the engine of this object unless it is "monitors" and the times at
+        which the timesteps are solved are not evenly spaced (eg. after screening),
+        in which case the timesteps cannot be solved in a single OpenDSS solve and
+        the loop engine is used.
+
+        Args:
+            sim_steps: A list of the indices of the timesteps to be simulated.
+        """
+        if self.engine == "monitors" and self._monitor_stepsize(sim_steps) is None:
+            print(
+                "Warning - the timesteps are not evenly spaced so they cannot be solved "
+                "in a single OpenDSS solve. Using the loop engine..."
+            )
+            return "loop"
+        return self.engine
+
+    def _monitor_stepsize(self, sim_steps):
+        """Get the stepsize in seconds for solving several timesteps in a single OpenDSS solve.
+
+        Returns None if the times at which the timesteps are solved are not evenly
+        spaced. A single timestep is solved with the stepsize of the simulation.
+
+        Args:
+            sim_steps: A list of the indices of the timesteps to be simulated.
+        """
+        if len(sim_steps) < 2:
+            return self.timestep * 60
+        solve_seconds = [hour * 3600 + seconds for hour, seconds in (self._solve_time(i) for i in sim_steps)]
+        stepsizes = set(np.diff(solve_seconds).tolist())
+        if len(stepsizes) != 1 or stepsizes.pop() <= 0:
+            return None
+        return solve_seconds[1] - solve_seconds[0]
+
+    @staticmethod
+    def _add_monitor(monitor_name, element_name, terminal):
+        """Add a voltage and current monitor to an element terminal of the active circuit."""
+        dss.run_command(f'New Monitor.{monitor_name} element="{element_name}" terminal={terminal} mode=0')
+
+    @staticmethod
+    def _get_monitor_magnitudes(monitor_name):
+        """Get the voltage and current magnitudes of all samples of a monitor.
+
+        Returns:
+            A tuple with an array of voltage magnitudes and an array of current
+            magnitudes. Each array has one row per sample and one column per conductor.
+        """
+        dss.Monitors.Name(monitor_name)
+        # the first two columns are the hour and seconds of each sample
+        channels = np.asarray(dss.Monitors.AsMatrix(), dtype=float)[:, 2:]
+        magnitudes = channels[:, ::2]
+        conductor_count = magnitudes.shape[1] // 2
+        return magnitudes[:, :conductor_count], magnitudes[:, conductor_count:]
+
+    def _place_bus_voltage_monitors(self, bldg_buses):
+        """Place monitors that record the voltage of all nodes of several buses.
+
+        Each bus is monitored from the element terminal that is connected to the
+        most nodes of the bus.
+
+        Args:
+            bldg_buses: A list of the bus names to be monitored.
+
+        Returns:
+            A list with a tuple for each bus containing the name of the monitor,
+            the indices of the monitored conductors that are connected to nodes
+            of the bus and the base voltage of the bus in volts.
+        """
+        voltage_monitors = []
+        for k, bus in enumerate(bldg_buses):
+            dss.Circuit.SetActiveBus(bus)
+            bus_nodes = set(dss.Bus.Nodes())
+            base_volts = dss.Bus.kVBase() * 1000
+            candidates = [e for e in (*dss.Bus.AllPDEatBus(), *dss.Bus.AllPCEatBus()) if "." in e]
+            best = None
+            for element_name in candidates:
+                dss.Circuit.SetActiveElement(element_name)
+                conductor_count = dss.CktElement.NumConductors()
+                node_order = dss.CktElement.NodeOrder()
+                for t, terminal_bus in enumerate(dss.CktElement.BusNames()):
+                    if terminal_bus.split(".")[0].lower() != bus.lower():
+                        continue
+                    terminal_nodes = node_order[t * conductor_count : (t + 1) * conductor_count]
+                    conductors, covered = [], set()
+                    for c, node in enumerate(terminal_nodes):
+                        if node in bus_nodes and node not in covered:
+                            conductors.append(c)
+                            covered.add(node)
+                    if best is None or len(conductors) > len(best[2]):
+                        best = (element_name, t + 1, conductors)
+            if best is None or len(best[2]) == 0:
+                voltage_monitors.append((None, [], base_volts))
+                continue
+            monitor_name = f"uodr_bus_{k}"
+            self._add_monitor(monitor_name, best[0], best[1])
+            voltage_monitors.append((monitor_name, best[2], base_volts))
+        return voltage_monitors
+
+    def _solve_with_monitors(self, sim_steps, sim_times, bldg_buses, line_ratings, xfmr_ratings, stores):
+        """Solve all timesteps with a single OpenDSS yearly solve and record the results from monitors.
+
+        Monitors are placed on the building buses, on both terminals of each line
+        and on the high side of each transformer. The time loop then runs inside
+        OpenDSS and all of the monitor channels are read once after the solve.
+
+        Args:
+            sim_steps: A list of the indices of the timesteps to be simulated.
+            sim_times: A list of the timestamps of the timesteps to be simulated.
+            bldg_buses: A list of the bus names of the buildings in the order of the
+                building result store.
+            line_ratings: A tuple of line ratings as returned by _get_line_ratings.
+            xfmr_ratings: A tuple of transformer ratings as returned by _get_xfmr_ratings.
+            stores: A tuple of the building, line and transformer ResultStores.
+        """
+        # place monitors on all of the elements for which results are recorded
+        voltage_monitors = self._place_bus_voltage_monitors(bldg_buses)
+        for k, line_name in enumerate(line_ratings[0]):
+            self._add_monitor(f"uodr_line_{k}_1", line_name, 1)
+            self._add_monitor(f"uodr_line_{k}_2", line_name, 2)
+        xfmr_phases = []
+        for k, transformer_name in enumerate(xfmr_ratings[0]):
+            self._add_monitor(f"uodr_xfmr_{k}", transformer_name, 1)
+            dss.Circuit.SetActiveElement(transformer_name)
+            xfmr_phases.append(dss.CktElement.NumPhases())
+
+        # solve the first timestep as in the loop engine and let OpenDSS step through the others
+        print(f"Solving timepoints {sim_times[0]} to {sim_times[-1]} in a single OpenDSS solve", flush=True)
+        hour, seconds = self._solve_time(sim_steps[0])
+        solve_cmds = [f"Solve mode=yearly stepsize={self.timestep}m number=1 hour={hour} sec={seconds}"]
+        if len(sim_steps) > 1:
+            solve_cmds.append(f"Solve stepsize={self._monitor_stepsize(sim_steps)}s number={len(sim_steps) - 1}")
+        for solve_cmd in solve_cmds:
+            output = dss.run_command(solve_cmd)
+            if output:
+                print(output)
+
+        # read the monitors and compute the building voltages, line and transformer loading
+        step_count = len(sim_steps)
+        bldg_voltages = np.zeros((step_count, len(bldg_buses)))
+        for b, (monitor_name, conductors, base_volts) in enumerate(voltage_monitors):
+            if monitor_name is not None:
+                voltage_mags, _ = self._get_monitor_magnitudes(monitor_name)
+                bldg_voltages[:, b] = voltage_mags[:, conductors].mean(axis=1) / base_volts
+        line_currents = np.zeros((step_count, len(line_ratings[0])))
+        for k in range(len(line_ratings[0])):
+            for terminal in (1, 2):
+                _, current_mags = self._get_monitor_magnitudes(f"uodr_line_{k}_{terminal}")
+                line_currents[:, k] = np.maximum(line_currents[:, k], current_mags.max(axis=1))
+        xfmr_currents = np.zeros((step_count, len(xfmr_ratings[0])))
+        for k, n_phases in enumerate(xfmr_phases):
+            _, current_mags = self._get_monitor_magnitudes(f"uodr_xfmr_{k}")
+            xfmr_currents[:, k] = current_mags[:, :n_phases].max(axis=1)
+        line_loading = line_currents / line_ratings[3]
+        xfmr_loading = xfmr_currents / xfmr_ratings[3]
+        for step in range(step_count):
+            self._record_results(step, stores, bldg_voltages[step], line_loading[step], xfmr_loading[step])
+
+    @staticmethod
+    def _get_upstream_transformers():
+        """Get a dictionary mapping each bus to the name of the nearest transformer upstream of it.
+
+        The buses are labeled in a single breadth-first traversal of the power delivery
+        elements starting from the bus of the circuit source. Buses that are not
+        downstream of any transformer are mapped to None.
+        """
+        neighbors = {}
+        for element_name in dss.PDElements.AllNames():
+            dss.Circuit.SetActiveElement(element_name)
+            buses = [b.split(".")[0].lower() for b in dss.CktElement.BusNames()]
+            label = element_name if element_name.lower().startswith("transformer.") else None
+            for other_bus in buses[1:]:
+                neighbors.setdefault(buses[0], []).append((other_bus, label))
+                neighbors.setdefault(other_bus, []).append((buses[0], label))
+
+        dss.Vsources.First()
+        source_bus = dss.CktElement.BusNames()[0].split(".")[0].lower()
+        upstream = {source_bus: None}
+        queue = deque([source_bus])
+        while queue:
+            bus = queue.popleft()
+            for other_bus, label in neighbors.get(bus, []):
+                if other_bus not in upstream:
+                    upstream[other_bus] = label if label is not None else upstream[bus]
+                    queue.append(other_bus)
+        return upstream
+
+    @staticmethod
+    def _get_shape_multipliers(shape_name, solve_hours, shape_cache):
+        """Get the multipliers of a yearly loadshape at the hours when timesteps are solved.
+
+        Args:
+            shape_name: The name of the loadshape. If empty, the multipliers are all 1.
+            solve_hours: An array of the hours at which the timesteps are solved.
+            shape_cache: A dictionary of multipliers that have already been computed.
+        """
+        if not shape_name:
+            return np.ones(len(solve_hours))
+        if shape_name not in shape_cache:
+            dss.LoadShape.Name(shape_name)
+            mults = np.asarray(dss.LoadShape.PMult())
+            interval = dss.LoadShape.HrInterval()
+            if interval > 0 and len(mults) > 0:
+                # OpenDSS uses the 1-based point round(hour / interval) and wraps around the year
+                shape_cache[shape_name] = mults[(np.rint(solve_hours / interval).astype(int) - 1) % len(mults)]
+            else:  # loadshapes with variable intervals are assumed to be constant
+                shape_cache[shape_name] = np.ones(len(solve_hours))
+        return shape_cache[shape_name]
+
+    def _screen_timesteps(self, master_dss, ts, sim_steps, results_path):
+        """Select the critical timesteps to be simulated using estimates of transformer and feeder load.
+
+        The net load (loads minus PV) of each transformer and of the whole feeder is
+        aggregated from the yearly loadshapes of the circuit, which OpenDSS reads from
+        the profiles CSV files. Each timestep is scored by the highest of the estimated
+        transformer loadings (kW over kVA) and the feeder load relative to its peak.
+        Timesteps in the top screen_top_k scores or with a score of at least
+        screen_threshold are kept. A screening_report.csv states which timesteps
+        were skipped and why.
+
+        Args:
+            master_dss: The path to the master DSS file to be simulated.
+            ts: A list of all timestamps in the timeseries.
+            sim_steps: A list of the indices of the timesteps to be screened.
+            results_path: Path to the folder into which the screening report is written.
+
+        Returns:
+            A list of the indices of the timesteps that should be simulated.
+        """
+        print("\nSCREENING TIMESTEPS")
+        self._load_circuit(master_dss)
+        upstream = self._get_upstream_transformers()
+        solve_seconds = [
+            hour * 3600 + seconds + self.timestep * 60 for hour, seconds in map(self._solve_time, sim_steps)
+        ]
+        solve_hours = np.array(solve_seconds) / 3600
+
+        # aggregate the net load in kW of each transformer and of the whole feeder
+        xfmr_rows, xfmr_kva = {}, []
+        flag = dss.Transformers.First()
+        while flag > 0:
+            xfmr_rows[dss.CktElement.Name().lower()] = len(xfmr_kva)
+            xfmr_kva.append(dss.Transformers.kVA())
+            flag = dss.Transformers.Next()
+        xfmr_names = list(xfmr_rows)
+        net_load = np.zeros((len(xfmr_kva) + 1, len(sim_steps)))  # the last row is the feeder
+        shape_cache = {}
+        for element_class, sign in ((dss.Loads, 1), (dss.PVsystems, -1)):
+            flag = element_class.First()
+            while flag > 0:
+                if element_class is dss.Loads:
+                    kw, shape_name = dss.Loads.kW(), dss.Loads.Yearly()
+                else:
+                    kw, shape_name = dss.PVsystems.Pmpp(), dss.PVsystems.yearly()
+                profile = sign * kw * self._get_shape_multipliers(shape_name, solve_hours, shape_cache)
+                bus = dss.CktElement.BusNames()[0].split(".")[0].lower()
+                transformer = upstream.get(bus)
+                if transformer is not None:
+                    net_load[xfmr_rows[transformer.lower()]] += profile
+                net_load[-1] += profile
+                flag = element_class.Next()
+
+        # score the timesteps by the estimated loading of the transformers and feeder
+        feeder_load = np.abs(net_load[-1])
+        feeder_peak = feeder_load.max() if len(sim_steps) > 0 else 0
+        feeder_loading = feeder_load / feeder_peak if feeder_peak > 0 else np.zeros(len(sim_steps))
+        all_loading = np.vstack([np.abs(net_load[:-1]) / np.array(xfmr_kva).reshape(-1, 1), feeder_loading])
+        critical_rows = all_loading.argmax(axis=0)
+        scores = all_loading.max(axis=0)
+
+        # select the timesteps to be simulated and report the skipped ones
+        keep = np.zeros(len(sim_steps), dtype=bool)
+        if self.screen_top_k is not None:
+            keep[np.argsort(-scores, kind="stable")[: self.screen_top_k]] = True
+        if self.screen_threshold is not None:
+            keep |= scores >= self.screen_threshold
+        report = [["Datetime", "estimated loading", "critical element", "solved", "reason"]]
+        for step, i in enumerate(sim_steps):
+            reasons = []
+            if not keep[step]:
+                if self.screen_top_k is not None:
+                    reasons.append(f"not in the top {self.screen_top_k} estimated loadings")
+                if self.screen_threshold is not None:
+                    reasons.append(f"estimated loading below the threshold of {self.screen_threshold}")
+            critical = xfmr_names[critical_rows[step]] if critical_rows[step] < len(xfmr_names) else "feeder"
+            report.append([ts[i], round(float(scores[step]), 5), critical, bool(keep[step]), " and ".join(reasons)])
+        report_path = self._write_csv(report, os.path.join(results_path, "screening_report.csv"))
+        kept_steps = [i for i, k in zip(sim_steps, keep) if k]
+        print(f"Screening kept {len(kept_steps)} of {len(sim_steps)} timesteps")
+        print(f"Skipped timesteps are listed in {report_path}")
+        return kept_steps
+
+    def _solve_timesteps_parallel(self, master_dss, ts, sim_steps, building_map, engine):
+        """Solve the power flow for several timesteps across a pool of worker processes.
+
+        The timesteps are split into one contiguous chunk per worker and each worker
+        solves its chunk using an independent OpenDSS instance loaded from the same
+        master file. This assumes that each timestep only depends on the loadshapes
+        of the model and not on the solution of the previous timestep.
+
+        Args:
+            master_dss: The path to the master DSS file to be simulated.
+            ts: A list of all timestamps in the timeseries.
+            sim_steps: A list of the indices of the timesteps to be simulated.
+            building_map: A dictionary mapping electrical junctions to buildings.
+            engine: Text for the engine used to solve the timesteps, as returned by _solve_engine.
+
+        Returns:
+            A dictionary with a ResultStore for the Features, Lines and Transformers
+            containing the merged results of all workers in timestamp order.
+        """
+        chunk_count = min(self.workers, len(sim_steps))
+        chunks = [chunk.tolist() for chunk in np.array_split(np.array(sim_steps), chunk_count)]
+        print(f"Solving {len(sim_steps)} timesteps across {chunk_count} worker processes")
+        with ProcessPoolExecutor(max_workers=chunk_count) as executor:
+            futures = [
+                executor.submit(self._solve_timesteps, master_dss, chunk, [ts[i] for i in chunk], building_map, engine)
+                for chunk in chunks
+            ]
+            chunk_results = [future.result() for future in futures]
+        return {group: ResultStore.concatenate([res[group] for res in chunk_results]) for group in chunk_results[0]}
+
+    def _solve_feeders_parallel(self, master_dss, ts, sim_steps, building_map, engine):
+        """Solve the power flow of each feeder of the circuit in a separate worker process.
+
+        The feeders are the parts of the circuit that are connected to the bus of
+        the circuit source through different power delivery elements. A master
+        DSS file is written for each feeder with the elements of that feeder and
+        the objects shared by all of the feeders (eg. wire data and loadshapes).
+        Solving the feeders independently assumes that the voltage of the source
+        bus does not depend on the load of the other feeders. If workers is
+        greater than 1, the timesteps of each feeder are also split across workers.
+
+        Args:
+            master_dss: The path to the master DSS file to be simulated.
+            ts: A list of all timestamps in the timeseries.
+            sim_steps: A list of the indices of the timesteps to be simulated.
+            building_map: A dictionary mapping electrical junctions to buildings.
+            engine: Text for the engine used to solve the timesteps, as returned by _solve_engine.
+
+        Returns:
+            A dictionary with a ResultStore for the Features, Lines and Transformers
+            containing the merged results of all feeders.
+        """
+        self._load_circuit(master_dss)
+        feeder_heads, element_feeders = self._get_feeder_partitions()
+        if len(feeder_heads) < 2:
+            print("Warning - the circuit has a single feeder. Solving it without partitioning...")
+            if self.workers > 1 and len(sim_steps) > 1:
+                return self._solve_timesteps_parallel(master_dss, ts, sim_steps, building_map, engine)
+            return self._solve_timesteps(master_dss, sim_steps, [ts[i] for i in sim_steps], building_map, engine)
+
+        feeders_folder = os.path.join(self.dss_analysis, "dss_files", "feeders")
+        feeder_masters = self._write_feeder_masters(
+            self._read_dss_commands(master_dss), element_feeders, len(feeder_heads), feeders_folder
+        )
+        for feeder_master, feeder_head in zip(feeder_masters, feeder_heads):
+            print(f"Feeder {os.path.basename(feeder_master)} starts at {feeder_head}")
+        chunk_count = min(self.workers, len(sim_steps))
+        chunks = [chunk.tolist() for chunk in np.array_split(np.array(sim_steps), chunk_count)]
+        process_count = min(len(feeder_masters) * chunk_count, os.cpu_count() or 1)
+        print(f"Solving {len(feeder_masters)} feeders across {process_count} worker processes")
+        with ProcessPoolExecutor(max_workers=process_count) as executor:
+            futures = [
+                [
+                    executor.submit(
+                        self._solve_timesteps, feeder_master, chunk, [ts[i] for i in chunk], building_map, engine
                     )
-            for element, line_load_val in line_overloads.items():
-                line_df_dic[element].append([time, round(line_load_val, 5), line_load_val > 1.0])
-            for element, xfrm_load_val in overloaded_xfmrs.items():
-                transformer_df_dic[element].append([time, round(xfrm_load_val, 5), xfrm_load_val > 1.0])
-
-        # write the collected results into CSV files
-        for element, result_values in voltage_df_dic.items():
-            res_path = os.path.join(features_path, "%s.csv" % element.replace("_", "-"))
-            self._write_csv(result_values, res_path)
-        for element, result_values in line_df_dic.items():
-            res_path = os.path.join(lines_path, "%s.csv" % element.replace(":", ""))
-            self._write_csv(result_values, res_path)
-        for element, result_values in transformer_df_dic.items():
-            res_path = os.path.join(trans_path, "%s.csv" % element.replace(":", ""))
-            self._write_csv(result_values, res_path)
+                    for chunk in chunks
+                ]
+                for feeder_master in feeder_masters
+            ]
+            feeder_results = [[future.result() for future in chunk_futures] for chunk_futures in futures]
+        return {
+            group: ResultStore.merge(
+                [ResultStore.concatenate([res[group] for res in chunk_results]) for chunk_results in feeder_results]
+            )
+            for group in feeder_results[0][0]
+        }
+
+    @staticmethod
+    def _get_feeder_partitions():
+        """Get the feeders of the circuit that is loaded in OpenDSS and the elements on each of them.
+
+        Each bus is labeled with a feeder in a breadth-first traversal of the power
+        delivery elements that starts from each element connected to the bus of the
+        circuit source. Circuit elements are assigned to the feeder of their buses
+        and elements that are only connected to the source bus are assigned to the
+        first feeder. Meters and controls (eg. EnergyMeters, Monitors and RegControls)
+        are assigned to the feeder of the element that they act on.
+
+        Returns:
+            A tuple with two items.
+
+            -   feeder_heads: A list with the name of the element at the head of each feeder.
+
+            -   element_feeders: A dictionary mapping the lowercase names of circuit
+                elements to the index of their feeder in feeder_heads.
+        """
+        neighbors = {}
+        for element_name in dss.PDElements.AllNames():
+            dss.Circuit.SetActiveElement(element_name)
+            buses = [b.split(".")[0].lower() for b in dss.CktElement.BusNames()]
+            for other_bus in buses[1:]:
+                neighbors.setdefault(buses[0], []).append((other_bus, element_name))
+                neighbors.setdefault(other_bus, []).append((buses[0], element_name))
+
+        dss.Vsources.First()
+        source_bus = dss.CktElement.BusNames()[0].split(".")[0].lower()
+        feeder_heads, bus_feeders = [], {source_bus: None}
+        for head_bus, head_element in neighbors.get(source_bus, []):
+            if head_bus in bus_feeders:
+                continue
+            bus_feeders[head_bus] = len(feeder_heads)
+            queue = deque([head_bus])
+            while queue:
+                bus = queue.popleft()
+                for other_bus, _ in neighbors.get(bus, []):
+                    if other_bus not in bus_feeders:
+                        bus_feeders[other_bus] = len(feeder_heads)
+                        queue.append(other_bus)
+            feeder_heads.append(head_element)
+
+        element_feeders = {}
+        for element_name in dss.Circuit.AllElementNames():
+            if element_name.lower().startswith("vsource."):
+                continue
+            dss.Circuit.SetActiveElement(element_name)
+            buses = [b.split(".")[0].lower() for b in dss.CktElement.BusNames()]
+            feeders = [bus_feeders[b] for b in buses if bus_feeders.get(b) is not None]
+            if len(feeders) > 0:
+                element_feeders[element_name.lower()] = feeders[0]
+            elif len(buses) > 0 and len(feeder_heads) > 0:
+                element_feeders[element_name.lower()] = 0
+
+        # move the meters and controls to the feeder of the element that they act on
+        for element_name in dss.Circuit.AllElementNames():
+            dss.Circuit.SetActiveElement(element_name)
+            property_names = [p.lower() for p in dss.Element.AllPropertyNames()]
+            for property_name, element_class in UrbanoptDittoReader.DSS_ELEMENT_REFERENCES:
+                if property_name not in property_names:
+                    continue
+                reference = UrbanoptDittoReader._element_reference(dss.Properties.Value(property_name), element_class)
+                if reference in element_feeders:
+                    element_feeders[element_name.lower()] = element_feeders[reference]
+                    break
+        return feeder_heads, element_feeders
+
+    @staticmethod
+    def _element_reference(value, element_class):
+        """Get the lowercase full name of a circuit element from the value of a property that points to it.
+
+        Args:
+            value: Text for the value of the property (eg. "Line.line_1" or "reg1").
+            element_class: Text for the lowercase class of the element followed by a
+                period if the value only has the name of the element (eg. "transformer.").
+                Otherwise, an empty string.
+        """
+        reference = value.strip("\"'").lower()
+        if element_class and not reference.startswith(element_class):
+            reference = element_class + reference
+        return reference
+
+    @classmethod
+    def _command_elements(cls, command):
+        """Get the lowercase full names of all circuit elements that a DSS command refers to.
+
+        This includes the element named after the command verb (eg. New Load.load_1
+        or Edit Load.load_1), the element of a property assignment (eg.
+        Load.load_1.kw=5) and the elements that meters and controls act on
+        (eg. element=Line.line_1).
+
+        Args:
+            command: Text for a DSS command, including any continuation lines.
+        """
+        element_names = []
+        words = command.split(maxsplit=2)
+        if words[0].lower() in cls.DSS_ELEMENT_VERBS and len(words) > 1:
+            object_name = words[1].lower()
+            if object_name.startswith("object="):
+                object_name = object_name[len("object=") :]
+            element_names.append(object_name.strip("\"'"))
+        elif "=" in words[0] and words[0].split("=")[0].count(".") >= 2:
+            element_names.append(words[0].split("=")[0].rsplit(".", 1)[0].lower())
+        element_classes = dict(cls.DSS_ELEMENT_REFERENCES)
+        for property_name, value in cls.DSS_ELEMENT_REFERENCE.findall(command):
+            element_names.append(cls._element_reference(value, element_classes[property_name.lower()]))
+        return element_names
+
+    @staticmethod
+    def _write_feeder_masters(commands, element_feeders, feeder_count, feeders_folder):
+        """Write a master DSS file for each feeder of a circuit.
+
+        Each master file contains all of the commands of the circuit except those
+        that refer to circuit elements on other feeders, which includes the
+        commands defining or editing these elements and the meters and controls
+        that act on them. Objects that are not circuit elements (eg. wire data,
+        line geometries and loadshapes) are in every master.
+
+        Args:
+            commands: A list of the commands of the circuit from _read_dss_commands.
+            element_feeders: A dictionary mapping the lowercase names of circuit
+                elements to the index of their feeder.
+            feeder_count: The number of feeders of the circuit.
+            feeders_folder: Path to the folder into which the master files are written.
+
+        Returns:
+            A list of the paths to the master file of each feeder.
+        """
+        os.makedirs(feeders_folder, exist_ok=True)
+        # group each command with its continuation lines so that they are kept or dropped together
+        command_groups = []
+        for command in commands:
+            if len(command_groups) > 0 and (command.startswith("~") or command.split()[0].lower() == "more"):
+                command_groups[-1].append(command)
+            else:
+                command_groups.append([command])
+        group_elements = [UrbanoptDittoReader._command_elements(" ".join(group)) for group in command_groups]
+
+        feeder_masters = []
+        for feeder in range(feeder_count):
+            feeder_commands = []
+            for group, element_names in zip(command_groups, group_elements):
+                if all(element_feeders.get(name, feeder) == feeder for name in element_names):
+                    feeder_commands.extend(group)
+            feeder_master = os.path.join(feeders_folder, f"feeder_{feeder + 1}.dss")
+            with open(feeder_master, "w") as f:
+                f.write("\n".join(feeder_commands) + "\n")
+            feeder_masters.append(feeder_master)
+        return feeder_masters
+
+    @staticmethod
+    def _peak_memory_mb():
+        """Get the peak resident memory of this process in MB or None if it is unavailable."""
+        try:
+            import resource
+        except ImportError:  # the resource module is not available on Windows
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
 
     @staticmethod
     def _read_single_column_csv(csv_file_path):
@@ -538,13 +1585,12 @@ class UrbanoptDittoReader:
         report_mtx = self._read_csv(rep_csv)
         header_row = report_mtx.pop(0)
         ts_i = header_row.index("Datetime")
-        timestamps = [row[ts_i] for row in report_mtx]
+        self.timeline = Timeline([row[ts_i] for row in report_mtx])
         ts_loc = self.timeseries_location
         if ts_loc is not None:
             if not os.path.exists(ts_loc):
                 os.makedirs(ts_loc)
-            ts_path = os.path.join(ts_loc, "timestamps.csv")
-            self._write_single_column_csv(timestamps, ts_path, "Datetime")
+            self.timeline.write_csv(os.path.join(ts_loc, "timestamps.csv"))
 
         # build a model from the raw OpenDSS files output by RNM
         model = Store()
@@ -554,10 +1600,11 @@ class UrbanoptDittoReader:
         reader = OpenDSSReader(master_file=master_file, buscoordinates_file=buscoordinates_file)
         reader.parse(model)
 
-        dss_json_path = os.path.join(self.dss_analysis, "json_files")
-        os.makedirs(dss_json_path, exist_ok=True)
-        json_writer = JSONWriter(output_path=dss_json_path)
-        json_writer.write(model)
+        if self.export_json:
+            dss_json_path = os.path.join(self.dss_analysis, "json_files")
+            os.makedirs(dss_json_path, exist_ok=True)
+            json_writer = JSONWriter(output_path=dss_json_path)
+            json_writer.write(model)
 
         # run the model through OpenDSS
         self.run(master_file)
@@ -565,6 +1612,19 @@ class UrbanoptDittoReader:
     def run_urbanopt_geojson(self):
         """Run OpenDSS assuming that the GeoJSON contains detailed OpenDSS objects."""
         # load the OpenDSS model from the URBANopt files
+        fingerprint = self._model_fingerprint()
+        if self.reuse_model:
+            master_file = self._get_reusable_master_file(fingerprint)
+            if master_file is not None:
+                print("\nREUSING MODEL")
+                print(f"The inputs of the model are unchanged since it was written to {master_file}")
+                self.run(master_file)
+                return
+        # remove any fingerprint of the files that are about to be rewritten in case the model fails to be written
+        fingerprint_file = os.path.join(self.dss_analysis, self.MODEL_FINGERPRINT_FILE)
+        if os.path.isfile(fingerprint_file):
+            os.remove(fingerprint_file)
+
         print("\nRE-SERIALIZING MODEL")
         model = Store()
         reader = Reader(
@@ -575,12 +1635,82 @@ class UrbanoptDittoReader:
             is_timeseries=True,
             timeseries_location=self.timeseries_location,
             relative_timeseries_location=os.path.join("..", "profiles"),
+            profile_format=self.profile_format,
+            write_kw_profiles=self.write_kw_profiles,
+            deduplicate_profiles=self.deduplicate_profiles,
+            stream_geojson=self.stream_geojson,
+            cache_catalog=self.cache_catalog,
         )
         reader.parse(model)
+        self.timeline = reader.timeline
 
         # check the model and run it through OpenDSS
         self.check_model(model)
         if self.upgrade_transformers:
             self.upgrade_model_transformers(model)
         master_file = self.write_opendss_files(model)
+        with open(fingerprint_file, "w") as f:
+            json.dump({"version": self.MODEL_FINGERPRINT_VERSION, "fingerprint": fingerprint}, f, indent=2)
         self.run(master_file)
+
+    def _model_fingerprint(self):
+        """Get a hash of all of the inputs from which the OpenDSS files of the model are written.
+
+        This includes the modification time and size of the GeoJSON, the equipment
+        file and every file in the feature_reports folders of the scenario along
+        with the configuration variables that change the DSS files or profiles.
+        """
+
+        def file_key(path):
+            file_stat = os.stat(path)
+            return [path, file_stat.st_mtime_ns, file_stat.st_size]
+
+        feature_reports = []
+        if os.path.isdir(self.urbanopt_scenario):
+            for feature_dir in sorted(os.listdir(self.urbanopt_scenario)):
+                report_dir = os.path.join(self.urbanopt_scenario, feature_dir, "feature_reports")
+                if os.path.isdir(report_dir):
+                    for report in sorted(os.listdir(report_dir)):
+                        feature_reports.append(file_key(os.path.join(report_dir, report)))
+        model_inputs = {
+            "geojson_file": file_key(self.geojson_file),
+            "equipment_file": file_key(self.equipment_file),
+            "feature_reports": feature_reports,
+            "use_reopt": self.use_reopt,
+            "upgrade_transformers": self.upgrade_transformers,
+            "profile_format": self.profile_format,
+            "write_kw_profiles": self.write_kw_profiles,
+            "deduplicate_profiles": self.deduplicate_profiles,
+            "timeseries_location": self.timeseries_location,
+        }
+        return hashlib.sha256(json.dumps(model_inputs, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _get_reusable_master_file(self, fingerprint):
+        """Get the master DSS file of a previous run if it was written from the same inputs.
+
+        Args:
+            fingerprint: Text for the hash of the current model inputs from _model_fingerprint.
+
+        Returns:
+            The path to the master DSS file or None if the model must be written again
+            because the inputs changed or any of the DSS files or profiles are missing.
+        """
+        fingerprint_file = os.path.join(self.dss_analysis, self.MODEL_FINGERPRINT_FILE)
+        try:
+            with open(fingerprint_file) as f:
+                recorded = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(recorded, dict) or recorded.get("version") != self.MODEL_FINGERPRINT_VERSION:
+            return None
+        if recorded.get("fingerprint") != fingerprint:
+            return None
+        master_file = os.path.join(self.dss_analysis, "dss_files", "Master.dss")
+        timestamp_file = os.path.join(self.timeseries_location, "timestamps.csv")
+        if not os.path.isfile(master_file) or not os.path.isfile(timestamp_file):
+            return None
+        manifest = ProfileManifest(self.timeseries_location)
+        for entry in manifest.entries.values():
+            if not all(os.path.isfile(os.path.join(self.timeseries_location, f)) for f in entry["files"]):
+                return None
+        return master_file
@@ -0,0 +1,166 @@
+"""
+*****************************************************************************************
+URBANopt™, Copyright (c) 2019-2022, Alliance for Sustainable Energy, LLC, and other
+contributors. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright notice, this list
+of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright notice, this
+list of conditions and the following disclaimer in the documentation and/or other
+materials provided with the distribution.
+
+Neither the name of the copyright holder nor the names of its contributors may be
+used to endorse or promote products derived from this software without specific
+prior written permission.
+
+Redistribution of this software, without modification, must refer to the software
+by the same designation. Redistribution of a modified version of this software
+(i) may not refer to the modified version by the same designation, or by any
+confusingly similar designation, and (ii) must refer to the underlying software
+originally provided by Alliance as “URBANopt”. Except to comply with the foregoing,
+the term “URBANopt”, or any confusingly similar designation may not be used to
+refer to any modified version of this software or any modified version of the
+underlying software originally provided by Alliance without the prior written
+consent of Alliance.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED
+OF THE POSSIBILITY OF SUCH DAMAGE.
+*****************************************************************************************
+"""
+import os
+from types import SimpleNamespace
+
+from ditto.models.timeseries import Timeseries
+from ditto.writers.opendss.write import Writer as OpenDSSWriter
+
+
+class Writer(OpenDSSWriter):
+    """DiTTo OpenDSS writer that also supports loadshapes stored in binary files.
+
+    Timeseries with a data_location ending in .sng (float32) or .dbl (float64)
+    are written as OpenDSS sngfile or dblfile loadshapes. The number of points of
+    these loadshapes is taken from the size of the file instead of parsing it as
+    a CSV. All other Timeseries are written by the DiTTo OpenDSS writer.
+
+    Binary loadshapes are written into a single LoadShapes.dss file, so models
+    with binary Timeseries cannot be written with separate feeders or substations.
+    """
+
+    # extension, OpenDSS loadshape property and number of bytes per value of binary files
+    BINARY_FILES = ((".sng", "sngfile", 4), (".dbl", "dblfile", 8))
+
+    def write(self, model, separate_feeders=False, separate_substations=False, **kwargs):
+        """Write a DiTTo model into OpenDSS files.
+
+        Args:
+            model: A DiTTo model.
+            separate_feeders: Boolean to note whether each feeder should be written
+                into a separate folder. (Default: False).
+            separate_substations: Boolean to note whether each substation should be
+                written into a separate folder. (Default: False).
+            kwargs: Other keyword arguments of the DiTTo OpenDSS writer.
+        """
+        if (separate_feeders or separate_substations) and any(
+            isinstance(i, Timeseries) and self._binary_file_type(i) is not None for i in model.models
+        ):
+            raise ValueError("Models with binary loadshapes cannot be written with separate feeders or substations.")
+        return super().write(
+            model, separate_feeders=separate_feeders, separate_substations=separate_substations, **kwargs
+        )
+
+    def write_timeseries(self, model):
+        """Write the LoadShapes.dss file that links the Timeseries of a model to their data.
+
+        Args:
+            model: A DiTTo model.
+        """
+        binary_series = [i for i in model.models if isinstance(i, Timeseries) and self._binary_file_type(i) is not None]
+        if len(binary_series) == 0:
+            return super().write_timeseries(model)
+
+        # write the other Timeseries and then add the binary loadshapes to the same file
+        binary_ids = {id(i) for i in binary_series}
+        super().write_timeseries(SimpleNamespace(models=[i for i in model.models if id(i) not in binary_ids]))
+        self.has_timeseries = True
+        datasets = self.timeseries_datasets.setdefault("DEFAULT_DEFAULT", {})
+        txt = ""
+        for i in binary_series:
+            if i.data_location not in datasets:
+                txt += self._binary_loadshape_text(i)
+                if not self.remove_loadshapes:
+                    datasets[i.data_location] = i.data_label
+
+        if txt != "":
+            loadshapes_file = self.output_filenames["loadshapes"]
+            if loadshapes_file in self.files_to_redirect:  # append to the text loadshapes
+                with open(os.path.join(self.output_path, loadshapes_file), "a") as fp:
+                    fp.write(txt)
+            else:
+                os.makedirs(self.output_path, exist_ok=True)
+                with open(os.path.join(self.output_path, loadshapes_file), "w") as fp:
+                    fp.write(txt)
+                self.files_to_redirect.append(loadshapes_file)
+        return None
+
+    def _binary_loadshape_text(self, timeseries):
+        """Get the OpenDSS definition of a loadshape stored in a binary file.
+
+        This also records the number of points and format of the loadshape on
+        the writer in the same way as the DiTTo OpenDSS writer.
+
+        Args:
+            timeseries: A DiTTo Timeseries object stored in a binary file.
+        """
+        if timeseries.data_label is None or (timeseries.scale_factor is not None and timeseries.scale_factor != 1):
+            raise ValueError(f"Binary loadshape {timeseries.data_location} must have a data_label and no scale_factor.")
+        file_type, value_size = self._binary_file_type(timeseries)
+        npoints = os.path.getsize(os.path.join(self.output_path, timeseries.data_location)) // value_size
+        if self.timeseries_iternumber is None:
+            self.timeseries_iternumber = npoints
+        else:
+            self.timeseries_iternumber = min(self.timeseries_iternumber, npoints)
+        # hourly, minute or second resolution data for exactly one day is daily
+        if npoints in (24, 24 * 60, 24 * 60 * 60):
+            self.timeseries_format[timeseries.data_label] = "daily"
+            if self.timeseries_solve_format is None:
+                self.timeseries_solve_format = "daily"
+        else:
+            self.timeseries_format[timeseries.data_label] = "yearly"
+            self.timeseries_solve_format = "yearly"
+        if self.remove_loadshapes:
+            return ""
+        interval = timeseries.interval if timeseries.interval is not None else 1
+        return (
+            f"New Loadshape.{timeseries.data_label} npts= {npoints} interval={interval} "
+            f"mult = ({file_type}={timeseries.data_location})\n\n"
+        )
+
+    @classmethod
+    def _binary_file_type(cls, timeseries):
+        """Get the OpenDSS file property and value size of a binary Timeseries.
+
+        Args:
+            timeseries: A DiTTo Timeseries object.
+
+        Returns:
+            A tuple of the OpenDSS loadshape property (eg. sngfile) and the number
+            of bytes per value. None if the Timeseries is not stored in a binary file.
+        """
+        if timeseries.data_location is not None:
+            extension = os.path.splitext(timeseries.data_location)[1].lower()
+            for binary_extension, file_type, value_size in cls.BINARY_FILES:
+                if extension == binary_extension:
+                    return file_type, value_size
+        return None